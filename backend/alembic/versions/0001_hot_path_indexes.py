@@ -0,0 +1,55 @@
+"""Indexes for the hot list and filter queries
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-17
+
+Tables are created by the API on startup (Base.metadata.create_all), which
+also creates these indexes on new databases; this revision adds them to
+existing ones. On PostgreSQL they are built CONCURRENTLY so the tables stay
+writable.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0001"
+down_revision = None
+branch_labels = None
+depends_on = None
+
+OPEN = sa.text("status = 'PREVISTO'")
+
+# (name, table, columns, partial index predicate)
+INDEXES = [
+    ("ix_accounts_payable_due_date", "accounts_payable", ["due_date", "id"], None),
+    ("ix_accounts_payable_open_due_date", "accounts_payable", ["due_date", "id"], OPEN),
+    ("ix_cash_flow_flow_date", "cash_flow", ["flow_date", "id"], None),
+    ("ix_cash_flow_type_flow_date", "cash_flow", ["flow_type", "flow_date", "id"], None),
+    ("ix_cash_flow_open_flow_date", "cash_flow", ["flow_date", "id"], OPEN),
+    ("ix_cash_flow_reference", "cash_flow", ["reference_id", "reference_type"], None),
+    ("ix_financial_documents_reference", "financial_documents", ["reference_id", "uploaded_at"], None),
+    ("ix_crm_contacts_company_name", "crm_contacts", ["company_name", "id"], None),
+    ("ix_crm_contacts_status_company_name", "crm_contacts", ["status", "company_name", "id"], None),
+    ("ix_crm_contacts_assigned_company_name", "crm_contacts", ["assigned_to", "company_name", "id"], None),
+    ("ix_crm_interactions_contact_date", "crm_interactions", ["contact_id", "interaction_date"], None),
+    ("ix_commercial_proposals_created_at", "commercial_proposals", ["created_at", "id"], None),
+    ("ix_commercial_proposals_contact_created_at", "commercial_proposals", ["contact_id", "created_at", "id"], None),
+    ("ix_commercial_proposals_status_created_at", "commercial_proposals", ["status", "created_at", "id"], None),
+]
+
+def upgrade():
+    concurrently = op.get_context().dialect.name == "postgresql"
+    with op.get_context().autocommit_block():
+        for name, table, columns, where in INDEXES:
+            op.create_index(
+                name, table, columns, if_not_exists=True,
+                postgresql_where=where, sqlite_where=where, postgresql_concurrently=concurrently
+            )
+        for table in sorted({table for _, table, _, _ in INDEXES}):
+            op.execute(f"ANALYZE {table}")
+
+def downgrade():
+    concurrently = op.get_context().dialect.name == "postgresql"
+    with op.get_context().autocommit_block():
+        for name, table, _, _ in reversed(INDEXES):
+            op.drop_index(name, table_name=table, if_exists=True, postgresql_concurrently=concurrently)
@@ -0,0 +1,36 @@
+"""Exchange rate table
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-17
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+revision = "0002"
+down_revision = "0001"
+branch_labels = None
+depends_on = None
+
+# The currencycode type already exists for the financial tables
+CURRENCY = sa.Enum("BRL", "USD", "EUR", "ARS", name="currencycode").with_variant(
+    postgresql.ENUM("BRL", "USD", "EUR", "ARS", name="currencycode", create_type=False), "postgresql"
+)
+
+def upgrade():
+    # The API creates missing tables on startup, so it may already exist
+    if not op.get_context().as_sql and sa.inspect(op.get_bind()).has_table("exchange_rates"):
+        return
+    op.create_table(
+        "exchange_rates",
+        sa.Column("currency", CURRENCY, primary_key=True),
+        sa.Column("rate_date", sa.Date(), primary_key=True),
+        sa.Column("rate", sa.Numeric(12, 6), nullable=False),
+        sa.Column("source", sa.String()),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+        sa.Column("updated_at", sa.DateTime(timezone=True))
+    )
+
+def downgrade():
+    op.drop_table("exchange_rates")
@@ -0,0 +1,56 @@
+"""ACC contracts
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-17
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+revision = "0003"
+down_revision = "0002"
+branch_labels = None
+depends_on = None
+
+ACC_STATUS = sa.Enum("ABERTO", "LIQUIDADO", "VENCIDO", "CANCELADO", name="accstatus")
+
+def upgrade():
+    # The API creates missing tables on startup, so it may already exist
+    if not op.get_context().as_sql and sa.inspect(op.get_bind()).has_table("acc_contracts"):
+        return
+    op.create_table(
+        "acc_contracts",
+        sa.Column("id", postgresql.UUID(as_uuid=True), primary_key=True),
+        sa.Column("contract_number", sa.String(), nullable=False, unique=True),
+        sa.Column("bank_name", sa.String(), nullable=False),
+        sa.Column("bank_code", sa.String()),
+        sa.Column("contract_date", sa.Date(), nullable=False),
+        sa.Column("maturity_date", sa.Date(), nullable=False),
+        sa.Column("amount_usd", sa.Numeric(15, 2), nullable=False),
+        sa.Column("exchange_rate", sa.Numeric(10, 6), nullable=False),
+        sa.Column("amount_brl", sa.Numeric(15, 2), sa.Computed("amount_usd * exchange_rate", persisted=True)),
+        sa.Column("advance_percentage", sa.Numeric(5, 2), nullable=False),
+        sa.Column(
+            "advance_amount_usd", sa.Numeric(15, 2),
+            sa.Computed("amount_usd * advance_percentage / 100", persisted=True)
+        ),
+        sa.Column("interest_rate", sa.Numeric(8, 4), nullable=False),
+        sa.Column("iof_rate", sa.Numeric(6, 4), nullable=False),
+        sa.Column("total_cost", sa.Numeric(15, 2)),
+        sa.Column("status", ACC_STATUS, nullable=False),
+        sa.Column("expedition_id", postgresql.UUID(as_uuid=True), sa.ForeignKey("expeditions.id")),
+        sa.Column("producer_id", postgresql.UUID(as_uuid=True), sa.ForeignKey("producers.id")),
+        sa.Column("liquidation_date", sa.Date()),
+        sa.Column("liquidation_rate", sa.Numeric(10, 6)),
+        sa.Column("notes", sa.Text()),
+        sa.Column("created_by", postgresql.UUID(as_uuid=True), sa.ForeignKey("users.id")),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+        sa.Column("updated_at", sa.DateTime(timezone=True))
+    )
+    op.create_index("ix_acc_contracts_maturity_date", "acc_contracts", ["maturity_date"])
+    op.create_index("ix_acc_contracts_status_maturity_date", "acc_contracts", ["status", "maturity_date"])
+
+def downgrade():
+    op.drop_table("acc_contracts")
+    ACC_STATUS.drop(op.get_bind(), checkfirst=True)
@@ -0,0 +1,90 @@
+"""Sales funnel change log and daily snapshots
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-17
+
+Fill the new tables from existing opportunities with:
+    python -m app.services.funnel_service backfill
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+revision = "0004"
+down_revision = "0003"
+branch_labels = None
+depends_on = None
+
+STAGES = ("CONTATO_INICIAL", "QUALIFICADO", "PROPOSTA_ENVIADA", "NEGOCIACAO", "FECHADO_GANHOU", "FECHADO_PERDEU")
+
+# The funnelstage type already exists for crm_opportunities
+FUNNEL_STAGE = sa.Enum(*STAGES, name="funnelstage").with_variant(
+    postgresql.ENUM(*STAGES, name="funnelstage", create_type=False), "postgresql"
+)
+
+def _missing(table: str) -> bool:
+    # The API creates missing tables on startup, so they may already exist
+    return op.get_context().as_sql or not sa.inspect(op.get_bind()).has_table(table)
+
+def upgrade():
+    op.create_index(
+        "ix_crm_opportunities_created_at", "crm_opportunities", ["created_at", "id"], if_not_exists=True
+    )
+    op.create_index(
+        "ix_crm_opportunities_contact_created_at", "crm_opportunities",
+        ["contact_id", "created_at", "id"], if_not_exists=True
+    )
+    
+    if _missing("crm_opportunity_stage_changes"):
+        op.create_table(
+            "crm_opportunity_stage_changes",
+            sa.Column("id", postgresql.UUID(as_uuid=True), primary_key=True),
+            sa.Column(
+                "opportunity_id", postgresql.UUID(as_uuid=True),
+                sa.ForeignKey("crm_opportunities.id"), nullable=False
+            ),
+            sa.Column("changed_at", sa.DateTime(timezone=True), nullable=False),
+            sa.Column("from_stage", FUNNEL_STAGE),
+            sa.Column("to_stage", FUNNEL_STAGE, nullable=False),
+            sa.Column("estimated_value", sa.Numeric(15, 2)),
+            sa.Column("currency", sa.String()),
+            sa.Column("probability", sa.Integer()),
+            sa.Column("expected_close_date", sa.Date()),
+            sa.Column("changed_by", postgresql.UUID(as_uuid=True), sa.ForeignKey("users.id"))
+        )
+        op.create_index(
+            "ix_crm_opportunity_stage_changes_opportunity", "crm_opportunity_stage_changes",
+            ["opportunity_id", "changed_at"]
+        )
+        op.create_index(
+            "ix_crm_opportunity_stage_changes_changed_at", "crm_opportunity_stage_changes", ["changed_at", "id"]
+        )
+    
+    if _missing("crm_funnel_snapshots"):
+        op.create_table(
+            "crm_funnel_snapshots",
+            sa.Column("snapshot_date", sa.Date(), primary_key=True),
+            sa.Column("stage", FUNNEL_STAGE, primary_key=True),
+            sa.Column("close_month", sa.Date(), primary_key=True),
+            sa.Column("currency", sa.String(), primary_key=True),
+            sa.Column("opportunity_count", sa.Integer(), nullable=False),
+            sa.Column("total_value", sa.Numeric(17, 2), nullable=False),
+            sa.Column("weighted_value", sa.Numeric(17, 2), nullable=False),
+            sa.Column("updated_at", sa.DateTime(timezone=True), server_default=sa.func.now())
+        )
+    
+    if _missing("crm_funnel_stage_entries"):
+        op.create_table(
+            "crm_funnel_stage_entries",
+            sa.Column("entry_date", sa.Date(), primary_key=True),
+            sa.Column("stage", FUNNEL_STAGE, primary_key=True),
+            sa.Column("entry_count", sa.Integer(), nullable=False)
+        )
+
+def downgrade():
+    op.drop_table("crm_funnel_stage_entries")
+    op.drop_table("crm_funnel_snapshots")
+    op.drop_table("crm_opportunity_stage_changes")
+    op.drop_index("ix_crm_opportunities_contact_created_at", table_name="crm_opportunities")
+    op.drop_index("ix_crm_opportunities_created_at", table_name="crm_opportunities")
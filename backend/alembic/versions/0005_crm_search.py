@@ -0,0 +1,54 @@
+"""CRM full-text and trigram search indexes
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-17
+
+PostgreSQL only; other databases use the in-process index of
+app.services.search_service. The expressions must stay identical to the
+search vectors in app.models.crm, or the planner will not use the indexes.
+Built CONCURRENTLY so the tables stay writable.
+"""
+from alembic import op
+
+revision = "0005"
+down_revision = "0004"
+branch_labels = None
+depends_on = None
+
+def _document(*columns: str) -> str:
+    document = f"coalesce({columns[0]}, '')"
+    for column in columns[1:]:
+        document = f"({document} || ' ') || coalesce({column}, '')"
+    return f"to_tsvector('simple', {document})"
+
+# (name, table, expression, operator class)
+INDEXES = [
+    (
+        "ix_crm_contacts_search", "crm_contacts",
+        _document("company_name", "contact_name", "city", "general_notes"), None
+    ),
+    ("ix_crm_contacts_company_name_trgm", "crm_contacts", "company_name", "gin_trgm_ops"),
+    ("ix_crm_contacts_contact_name_trgm", "crm_contacts", "contact_name", "gin_trgm_ops"),
+    ("ix_crm_interactions_search", "crm_interactions", _document("feedback"), None),
+    ("ix_commercial_proposals_search", "commercial_proposals", _document("product_name"), None),
+    ("ix_commercial_proposals_product_name_trgm", "commercial_proposals", "product_name", "gin_trgm_ops"),
+]
+
+def upgrade():
+    if op.get_context().dialect.name != "postgresql":
+        return
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    with op.get_context().autocommit_block():
+        for name, table, expression, opclass in INDEXES:
+            column = f"{expression} {opclass}" if opclass else expression
+            op.execute(f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {name} ON {table} USING gin ({column})")
+        for table in sorted({table for _, table, _, _ in INDEXES}):
+            op.execute(f"ANALYZE {table}")
+
+def downgrade():
+    if op.get_context().dialect.name != "postgresql":
+        return
+    with op.get_context().autocommit_block():
+        for name, table, _, _ in reversed(INDEXES):
+            op.drop_index(name, table_name=table, if_exists=True, postgresql_concurrently=True)
@@ -0,0 +1,72 @@
+"""Contact activity summary columns, pipeline and timeline
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2026-10-17
+
+Fill the summaries and the timeline from existing rows with:
+    python -m app.services.contact_activity_service rebuild
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+revision = "0006"
+down_revision = "0005"
+branch_labels = None
+depends_on = None
+
+CONTACT_EVENT_TYPE = sa.Enum("INTERACAO", "PROPOSTA_CRIADA", "PROPOSTA_STATUS", name="contacteventtype")
+
+SUMMARY_COLUMNS = [
+    sa.Column("last_interaction_at", sa.DateTime(timezone=True)),
+    sa.Column("next_action_date", sa.Date()),
+    sa.Column("open_proposal_count", sa.Integer(), nullable=False, server_default="0"),
+]
+
+def _missing(table: str) -> bool:
+    # The API creates missing tables on startup, so they may already exist
+    return op.get_context().as_sql or not sa.inspect(op.get_bind()).has_table(table)
+
+def upgrade():
+    existing = set()
+    if not op.get_context().as_sql:
+        existing = {column["name"] for column in sa.inspect(op.get_bind()).get_columns("crm_contacts")}
+    for column in SUMMARY_COLUMNS:
+        if column.name not in existing:
+            op.add_column("crm_contacts", column)
+    
+    if _missing("crm_contact_pipeline"):
+        op.create_table(
+            "crm_contact_pipeline",
+            sa.Column(
+                "contact_id", postgresql.UUID(as_uuid=True), sa.ForeignKey("crm_contacts.id"), primary_key=True
+            ),
+            sa.Column("currency", sa.String(), primary_key=True),
+            sa.Column("open_proposal_count", sa.Integer(), nullable=False),
+            sa.Column("open_value", sa.Numeric(17, 2), nullable=False)
+        )
+    
+    if _missing("crm_contact_events"):
+        op.create_table(
+            "crm_contact_events",
+            sa.Column("id", postgresql.UUID(as_uuid=True), primary_key=True),
+            sa.Column("contact_id", postgresql.UUID(as_uuid=True), sa.ForeignKey("crm_contacts.id"), nullable=False),
+            sa.Column("occurred_at", sa.DateTime(timezone=True), nullable=False),
+            sa.Column("event_type", CONTACT_EVENT_TYPE, nullable=False),
+            sa.Column("reference_id", postgresql.UUID(as_uuid=True), nullable=False),
+            sa.Column("title", sa.String(), nullable=False),
+            sa.Column("description", sa.Text()),
+            sa.Column("created_by", postgresql.UUID(as_uuid=True), sa.ForeignKey("users.id"))
+        )
+        op.create_index(
+            "ix_crm_contact_events_contact_occurred_at", "crm_contact_events", ["contact_id", "occurred_at", "id"]
+        )
+        op.create_index("ix_crm_contact_events_reference", "crm_contact_events", ["reference_id"])
+
+def downgrade():
+    op.drop_table("crm_contact_events")
+    CONTACT_EVENT_TYPE.drop(op.get_bind(), checkfirst=True)
+    op.drop_table("crm_contact_pipeline")
+    for column in reversed(SUMMARY_COLUMNS):
+        op.drop_column("crm_contacts", column.name)
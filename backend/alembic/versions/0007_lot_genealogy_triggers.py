@@ -0,0 +1,61 @@
+"""Keep the lot genealogy index current with triggers
+
+Revision ID: 0007
+Revises: 0006
+Create Date: 2026-10-17
+
+The frontend writes expeditions, their items and consolidated lots
+directly, so no API code path can maintain lot_genealogy. On PostgreSQL
+this installs the triggers from app.models.expedition and rebuilds the
+index once; elsewhere run genealogy_service rebuild after lot changes.
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+from app.models.expedition import GENEALOGY_FUNCTIONS, GENEALOGY_TRIGGER_DDL, GENEALOGY_TRIGGERS
+
+revision = "0007"
+down_revision = "0006"
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    if op.get_context().dialect.name != "postgresql":
+        return
+    # The API creates missing tables on startup, so it may already exist
+    if op.get_context().as_sql or not sa.inspect(op.get_bind()).has_table("lot_genealogy"):
+        op.create_table(
+            "lot_genealogy",
+            sa.Column(
+                "expedition_item_id", postgresql.UUID(as_uuid=True),
+                sa.ForeignKey("expedition_items.id", ondelete="CASCADE"), primary_key=True
+            ),
+            sa.Column("reception_id", postgresql.UUID(as_uuid=True), sa.ForeignKey("receptions.id"), primary_key=True),
+            sa.Column("producer_id", postgresql.UUID(as_uuid=True), sa.ForeignKey("producers.id"), nullable=False),
+            sa.Column(
+                "expedition_id", postgresql.UUID(as_uuid=True),
+                sa.ForeignKey("expeditions.id", ondelete="CASCADE"), nullable=False
+            ),
+            sa.Column("consolidated_lot_id", postgresql.UUID(as_uuid=True), sa.ForeignKey("consolidated_lots.id")),
+            sa.Column("expedition_date", sa.Date(), nullable=False),
+            sa.Column("quantity_kg", sa.Numeric(12, 2), nullable=False)
+        )
+        op.create_index(
+            "ix_lot_genealogy_producer", "lot_genealogy", ["producer_id", "expedition_date", "expedition_id"]
+        )
+        op.create_index("ix_lot_genealogy_expedition", "lot_genealogy", ["expedition_id", "producer_id"])
+        op.create_index("ix_lot_genealogy_reception", "lot_genealogy", ["reception_id"])
+    
+    for statement in GENEALOGY_TRIGGER_DDL:
+        op.execute(statement)
+    # Catch up with everything written since the last manual rebuild
+    op.execute("DELETE FROM lot_genealogy")
+    op.execute("SELECT lot_genealogy_index_expedition(id) FROM expeditions")
+
+def downgrade():
+    if op.get_context().dialect.name != "postgresql":
+        return
+    for trigger, table in GENEALOGY_TRIGGERS.items():
+        op.execute(f"DROP TRIGGER IF EXISTS {trigger} ON {table}")
+    for function in GENEALOGY_FUNCTIONS:
+        op.execute(f"DROP FUNCTION IF EXISTS {function}")
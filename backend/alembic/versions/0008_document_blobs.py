@@ -0,0 +1,57 @@
+"""Content-addressed document blobs
+
+Revision ID: 0008
+Revises: 0007
+Create Date: 2026-10-17
+
+Existing financial and expedition documents keep their own objects and
+a NULL blob_sha256; only new uploads are deduplicated.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0008"
+down_revision = "0007"
+branch_labels = None
+depends_on = None
+
+DOCUMENT_TABLES = ("financial_documents", "expedition_documents")
+
+def _missing(table: str) -> bool:
+    # The API creates missing tables on startup, so they may already exist
+    return op.get_context().as_sql or not sa.inspect(op.get_bind()).has_table(table)
+
+def _needs_column(table: str, column: str) -> bool:
+    # Tables the API has not created yet get the column from the model
+    if op.get_context().as_sql:
+        return True
+    inspector = sa.inspect(op.get_bind())
+    return inspector.has_table(table) and column not in {c["name"] for c in inspector.get_columns(table)}
+
+def upgrade():
+    if _missing("stored_blobs"):
+        op.create_table(
+            "stored_blobs",
+            sa.Column("sha256", sa.String(64), primary_key=True),
+            sa.Column("object_name", sa.String(), nullable=False),
+            sa.Column("size", sa.BigInteger(), nullable=False),
+            sa.Column("content_type", sa.String()),
+            sa.Column("ref_count", sa.Integer(), nullable=False),
+            sa.Column("orphaned_at", sa.DateTime(timezone=True)),
+            sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now())
+        )
+    
+    for table in DOCUMENT_TABLES:
+        if not _needs_column(table, "blob_sha256"):
+            continue
+        # Batch mode so the foreign key can also be added on SQLite
+        with op.batch_alter_table(table) as batch_op:
+            batch_op.add_column(sa.Column("blob_sha256", sa.String(64)))
+            batch_op.create_foreign_key(f"fk_{table}_blob_sha256", "stored_blobs", ["blob_sha256"], ["sha256"])
+            batch_op.create_index(f"ix_{table}_blob_sha256", ["blob_sha256"])
+
+def downgrade():
+    # Dropping the column takes its index and foreign key with it, whichever created them
+    for table in reversed(DOCUMENT_TABLES):
+        op.drop_column(table, "blob_sha256")
+    op.drop_table("stored_blobs")
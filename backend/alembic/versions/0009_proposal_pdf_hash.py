@@ -0,0 +1,26 @@
+"""Proposal PDF content hash
+
+Revision ID: 0009
+Revises: 0008
+Create Date: 2026-10-17
+
+Existing proposals start with no hash, so render-stale renders them once:
+    python -m app.services.proposal_pdf_service render-stale
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0009"
+down_revision = "0008"
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    existing = set()
+    if not op.get_context().as_sql:
+        existing = {column["name"] for column in sa.inspect(op.get_bind()).get_columns("commercial_proposals")}
+    if "pdf_content_hash" not in existing:
+        op.add_column("commercial_proposals", sa.Column("pdf_content_hash", sa.String(64)))
+
+def downgrade():
+    op.drop_column("commercial_proposals", "pdf_content_hash")
@@ -1,41 +1,70 @@
-
 from fastapi import APIRouter, Depends, HTTPException, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select
 from datetime import timedelta
-from app.core.database import get_db
-from app.core.security import verify_password, get_password_hash, create_access_token, verify_token
+from uuid import UUID
+from app.core.database import get_async_db
+from app.core.loading import eager_load_options
+from app.core.principal_cache import principal_cache
+from app.core.security import (
+    get_password_hash_async, verify_and_update_password, create_access_token, verify_token
+)
 from app.core.config import settings
-from app.models.user import User, Profile
+from app.models.user import User, Profile, UserRole
 from app.schemas.auth import UserCreate, UserLogin, UserResponse, Token, ProfileResponse
 
 router = APIRouter(prefix="/auth", tags=["Authentication"])
 security = HTTPBearer()
 
-def get_current_user(
+def _user_query():
+    return select(User).options(*eager_load_options(User, UserResponse))
+
+async def get_current_user(
     credentials: HTTPAuthorizationCredentials = Depends(security),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     user_id = verify_token(credentials.credentials)
-    user = db.query(User).filter(User.id == user_id).first()
-    if not user:
-        raise HTTPException(status_code=404, detail="User not found")
-    return user
+    try:
+        user_id = UUID(user_id)
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Could not validate credentials"
+        )
+    
+    principal = await principal_cache.get(user_id)
+    if principal is None:
+        result = await db.execute(_user_query().where(User.id == user_id))
+        user = result.scalars().first()
+        if not user:
+            raise HTTPException(status_code=404, detail="User not found")
+        principal = UserResponse.from_orm(user)
+        await principal_cache.set(user_id, principal)
+    
+    if not principal.is_active:
+        raise HTTPException(status_code=400, detail="Inactive user")
+    return principal
+
+def require_admin(current_user: UserResponse = Depends(get_current_user)):
+    if not current_user.profile or current_user.profile.role != UserRole.ADMIN:
+        raise HTTPException(status_code=403, detail="Not enough permissions")
+    return current_user
 
 @router.post("/register", response_model=Token)
-async def register(user_data: UserCreate, db: Session = Depends(get_db)):
+async def register(user_data: UserCreate, db: AsyncSession = Depends(get_async_db)):
     # Check if user exists
-    existing_user = db.query(User).filter(User.email == user_data.email).first()
-    if existing_user:
+    result = await db.execute(select(User).where(User.email == user_data.email))
+    if result.scalars().first():
         raise HTTPException(status_code=400, detail="Email already registered")
     
     # Create user
     user = User(
         email=user_data.email,
-        hashed_password=get_password_hash(user_data.password)
+        hashed_password=await get_password_hash_async(user_data.password)
     )
     db.add(user)
-    db.flush()
+    await db.flush()
     
     # Create profile
     profile = Profile(
@@ -44,8 +73,9 @@ async def register(user_data: UserCreate, db: Session = Depends(get_db)):
         role=user_data.role
     )
     db.add(profile)
-    db.commit()
-    db.refresh(user)
+    await db.commit()
+    await db.refresh(user)
+    await db.refresh(user, ["profile"])
     
     # Create token
     access_token = create_access_token(data={"sub": str(user.id)})
@@ -57,10 +87,15 @@ async def register(user_data: UserCreate, db: Session = Depends(get_db)):
     }
 
 @router.post("/login", response_model=Token)
-async def login(credentials: UserLogin, db: Session = Depends(get_db)):
-    user = db.query(User).filter(User.email == credentials.email).first()
+async def login(credentials: UserLogin, db: AsyncSession = Depends(get_async_db)):
+    result = await db.execute(_user_query().where(User.email == credentials.email))
+    user = result.scalars().first()
+    
+    valid, new_hash = False, None
+    if user:
+        valid, new_hash = await verify_and_update_password(credentials.password, user.hashed_password)
     
-    if not user or not verify_password(credentials.password, user.hashed_password):
+    if not valid:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect email or password"
@@ -69,6 +104,11 @@ async def login(credentials: UserLogin, db: Session = Depends(get_db)):
     if not user.is_active:
         raise HTTPException(status_code=400, detail="Inactive user")
     
+    # Transparently move the stored hash to the current cost policy
+    if new_hash:
+        user.hashed_password = new_hash
+        await db.commit()
+    
     access_token = create_access_token(data={"sub": str(user.id)})
     
     return {
@@ -78,5 +118,41 @@ async def login(credentials: UserLogin, db: Session = Depends(get_db)):
     }
 
 @router.get("/me", response_model=UserResponse)
-async def get_current_user_info(current_user: User = Depends(get_current_user)):
-    return UserResponse.from_orm(current_user)
+async def get_current_user_info(current_user: UserResponse = Depends(get_current_user)):
+    return current_user
+
+@router.put("/users/{user_id}/active", response_model=UserResponse)
+async def set_user_active(
+    user_id: UUID,
+    is_active: bool,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: UserResponse = Depends(require_admin)
+):
+    result = await db.execute(_user_query().where(User.id == user_id))
+    user = result.scalars().first()
+    if not user:
+        raise HTTPException(status_code=404, detail="User not found")
+    
+    user.is_active = is_active
+    await db.commit()
+    await principal_cache.invalidate(user_id)
+    
+    return UserResponse.from_orm(user)
+
+@router.put("/users/{user_id}/role", response_model=UserResponse)
+async def set_user_role(
+    user_id: UUID,
+    role: UserRole,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: UserResponse = Depends(require_admin)
+):
+    result = await db.execute(_user_query().where(User.id == user_id))
+    user = result.scalars().first()
+    if not user or not user.profile:
+        raise HTTPException(status_code=404, detail="User not found")
+    
+    user.profile.role = role
+    await db.commit()
+    await principal_cache.invalidate(user_id)
+    
+    return UserResponse.from_orm(user)
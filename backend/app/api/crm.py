@@ -1,38 +1,85 @@
-
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
-from typing import List
-from datetime import datetime, timedelta
-from app.core.database import get_db
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from pydantic import TypeAdapter
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select
+from typing import List, Optional
+from uuid import UUID
+from datetime import date, datetime, timedelta
+from app.core.cache import CONTACTS_TAG, OPPORTUNITIES_TAG, response_cache
+from app.core.database import get_async_db
+from app.core.loading import eager_load_options
+from app.core.pagination import (
+    DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, keyset_order, paginate, stream_ndjson
+)
 from app.api.auth import get_current_user
-from app.models.user import User
-from app.models.crm import CrmContact, CrmInteraction, CommercialProposal, ProposalStatus
+from app.schemas.auth import UserResponse
+from app.models.crm import (
+    CrmContact, CrmContactEvent, CrmInteraction, CrmOpportunity, CommercialProposal,
+    ContactStatus, BusinessSegment, FunnelStage, ProposalStatus
+)
 from app.schemas.crm import (
-    CrmContactCreate, CrmContactResponse,
+    ContactEventResponse, CrmContactCreate, CrmContactResponse,
+    CrmOpportunityCreate, CrmOpportunityResponse, CrmOpportunityUpdate, FunnelResponse,
     CommercialProposalCreate, CommercialProposalResponse,
-    InteractionCreate, InteractionResponse
+    InteractionCreate, InteractionResponse, SearchResult
 )
+from app.services.contact_activity_service import proposal_status, record_interaction, record_proposal_change
+from app.services.funnel_service import CLOSED_STAGES, funnel_state, get_funnel, record_opportunity_change
+from app.services.proposal_pdf_service import proposal_pdf_worker
 from app.services.proposal_service import generate_proposal_number
+from app.services.search_service import SEARCH_TYPES, search
 
 router = APIRouter(prefix="/crm", tags=["CRM"])
 
+CONTACT_LIST = TypeAdapter(List[CrmContactResponse])
+OPPORTUNITY_LIST = TypeAdapter(List[CrmOpportunityResponse])
+FUNNEL = TypeAdapter(FunnelResponse)
+
 @router.get("/contacts", response_model=List[CrmContactResponse])
 async def get_contacts(
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    request: Request,
+    response: Response,
+    status: Optional[ContactStatus] = None,
+    segment: Optional[BusinessSegment] = None,
+    country: Optional[str] = None,
+    assigned_to: Optional[UUID] = None,
+    cursor: Optional[str] = None,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    stream: bool = False,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: UserResponse = Depends(get_current_user)
 ):
-    contacts = db.query(CrmContact).order_by(CrmContact.company_name).all()
-    return contacts
+    stmt = select(CrmContact).options(
+        *eager_load_options(CrmContact, CrmContactResponse)
+    )
+    
+    if status:
+        stmt = stmt.where(CrmContact.status == status)
+    if segment:
+        stmt = stmt.where(CrmContact.segment == segment)
+    if country:
+        stmt = stmt.where(CrmContact.country == country)
+    if assigned_to:
+        stmt = stmt.where(CrmContact.assigned_to == assigned_to)
+    
+    if stream:
+        stmt = keyset_order(stmt, CrmContact.company_name, CrmContact.id, cursor)
+        return stream_ndjson(db, stmt, CrmContactResponse)
+    
+    async def build():
+        return await paginate(db, stmt, CrmContact.company_name, CrmContact.id, response, cursor, limit)
+    
+    return await response_cache.serve(request, response, [CONTACTS_TAG], CONTACT_LIST, build)
 
 @router.post("/contacts", response_model=CrmContactResponse)
 async def create_contact(
     contact_data: CrmContactCreate,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    db: AsyncSession = Depends(get_async_db),
+    current_user: UserResponse = Depends(get_current_user)
 ):
     # Check if contact exists
-    existing = db.query(CrmContact).filter(CrmContact.email == contact_data.email).first()
-    if existing:
+    result = await db.execute(select(CrmContact).where(CrmContact.email == contact_data.email))
+    if result.scalars().first():
         raise HTTPException(status_code=400, detail="Contact with this email already exists")
     
     contact = CrmContact(
@@ -42,29 +89,206 @@ async def create_contact(
     )
     
     db.add(contact)
-    db.commit()
-    db.refresh(contact)
+    await db.commit()
+    await db.refresh(contact)
+    await response_cache.invalidate(CONTACTS_TAG)
     
     return contact
 
+@router.get("/contacts/{contact_id}/timeline", response_model=List[ContactEventResponse])
+async def get_contact_timeline(
+    contact_id: UUID,
+    response: Response,
+    cursor: Optional[str] = None,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: UserResponse = Depends(get_current_user)
+):
+    """Interactions, new proposals and proposal status changes of a contact, newest first"""
+    if not await db.get(CrmContact, contact_id):
+        raise HTTPException(status_code=404, detail="Contact not found")
+    
+    stmt = select(CrmContactEvent).where(CrmContactEvent.contact_id == contact_id)
+    return await paginate(
+        db, stmt, CrmContactEvent.occurred_at, CrmContactEvent.id, response, cursor, limit, descending=True
+    )
+
+@router.get("/opportunities", response_model=List[CrmOpportunityResponse])
+async def get_opportunities(
+    request: Request,
+    response: Response,
+    stage: Optional[FunnelStage] = None,
+    contact_id: Optional[UUID] = None,
+    assigned_to: Optional[UUID] = None,
+    cursor: Optional[str] = None,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: UserResponse = Depends(get_current_user)
+):
+    stmt = select(CrmOpportunity)
+    
+    if stage:
+        stmt = stmt.where(CrmOpportunity.stage == stage)
+    if contact_id:
+        stmt = stmt.where(CrmOpportunity.contact_id == contact_id)
+    if assigned_to:
+        stmt = stmt.where(CrmOpportunity.assigned_to == assigned_to)
+    
+    async def build():
+        return await paginate(
+            db, stmt, CrmOpportunity.created_at, CrmOpportunity.id, response,
+            cursor, limit, descending=True
+        )
+    
+    return await response_cache.serve(request, response, [OPPORTUNITIES_TAG], OPPORTUNITY_LIST, build)
+
+@router.post("/opportunities", response_model=CrmOpportunityResponse)
+async def create_opportunity(
+    opportunity_data: CrmOpportunityCreate,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: UserResponse = Depends(get_current_user)
+):
+    if not await db.get(CrmContact, opportunity_data.contact_id):
+        raise HTTPException(status_code=404, detail="Contact not found")
+    
+    opportunity = CrmOpportunity(
+        **opportunity_data.dict(),
+        created_by=current_user.id,
+        assigned_to=current_user.id
+    )
+    if opportunity.stage in CLOSED_STAGES:
+        opportunity.actual_close_date = date.today()
+    
+    db.add(opportunity)
+    # Funnel snapshot and change log are written in the same transaction
+    await db.run_sync(record_opportunity_change, opportunity, None, current_user.id)
+    await db.commit()
+    await db.refresh(opportunity)
+    await response_cache.invalidate(OPPORTUNITIES_TAG)
+    
+    return opportunity
+
+@router.put("/opportunities/{opportunity_id}", response_model=CrmOpportunityResponse)
+async def update_opportunity(
+    opportunity_id: UUID,
+    opportunity_data: CrmOpportunityUpdate,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: UserResponse = Depends(get_current_user)
+):
+    # Locked so concurrent updates move the snapshot from the state each one saw
+    opportunity = await db.get(CrmOpportunity, opportunity_id, with_for_update=True)
+    
+    if not opportunity:
+        raise HTTPException(status_code=404, detail="Opportunity not found")
+    
+    previous = funnel_state(opportunity)
+    for field, value in opportunity_data.dict(exclude_unset=True).items():
+        setattr(opportunity, field, value)
+    
+    if opportunity.stage != previous["stage"]:
+        opportunity.actual_close_date = date.today() if opportunity.stage in CLOSED_STAGES else None
+    
+    await db.run_sync(record_opportunity_change, opportunity, previous, current_user.id)
+    await db.commit()
+    await db.refresh(opportunity)
+    await response_cache.invalidate(OPPORTUNITIES_TAG)
+    
+    return opportunity
+
+@router.get("/funnel", response_model=FunnelResponse)
+async def get_sales_funnel(
+    request: Request,
+    response: Response,
+    as_of: Optional[date] = None,
+    conversion_days: int = Query(90, ge=1, le=3650),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: UserResponse = Depends(get_current_user)
+):
+    """
+    Stage counts, weighted pipeline per expected close month and stage
+    conversion over the last conversion_days, read from the daily funnel
+    snapshots instead of the opportunities table
+    """
+    as_of = as_of or date.today()
+    
+    async def build():
+        funnel = await db.run_sync(get_funnel, as_of, as_of - timedelta(days=conversion_days - 1))
+        return FunnelResponse(**funnel)
+    
+    return await response_cache.serve(
+        request, response, [OPPORTUNITIES_TAG], FUNNEL, build, vary=[as_of.isoformat()]
+    )
+
+@router.get("/search", response_model=List[SearchResult])
+async def search_crm(
+    q: str = Query(..., min_length=1, max_length=200),
+    types: Optional[List[str]] = Query(None),
+    limit: int = Query(20, ge=1, le=100),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: UserResponse = Depends(get_current_user)
+):
+    """
+    Contacts, interactions and proposals matching every word of q as a
+    prefix, with typo-tolerant matching on names, best matches first
+    """
+    types = types or list(SEARCH_TYPES)
+    unknown = set(types) - set(SEARCH_TYPES)
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown search types: {', '.join(sorted(unknown))}")
+    
+    return await db.run_sync(search, q, types, limit)
+
 @router.get("/proposals", response_model=List[CommercialProposalResponse])
 async def get_proposals(
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    response: Response,
+    status: Optional[ProposalStatus] = None,
+    contact_id: Optional[UUID] = None,
+    currency: Optional[str] = None,
+    created_from: Optional[datetime] = None,
+    created_to: Optional[datetime] = None,
+    cursor: Optional[str] = None,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    stream: bool = False,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: UserResponse = Depends(get_current_user)
 ):
-    proposals = db.query(CommercialProposal).order_by(
-        CommercialProposal.created_at.desc()
-    ).all()
-    return proposals
+    stmt = select(CommercialProposal).options(
+        *eager_load_options(CommercialProposal, CommercialProposalResponse)
+    )
+    
+    if status:
+        stmt = stmt.where(CommercialProposal.status == status)
+    if contact_id:
+        stmt = stmt.where(CommercialProposal.contact_id == contact_id)
+    if currency:
+        stmt = stmt.where(CommercialProposal.currency == currency)
+    if created_from:
+        stmt = stmt.where(CommercialProposal.created_at >= created_from)
+    if created_to:
+        stmt = stmt.where(CommercialProposal.created_at <= created_to)
+    
+    if stream:
+        stmt = keyset_order(
+            stmt, CommercialProposal.created_at, CommercialProposal.id, cursor, descending=True
+        )
+        return stream_ndjson(db, stmt, CommercialProposalResponse)
+    
+    return await paginate(
+        db, stmt, CommercialProposal.created_at, CommercialProposal.id, response,
+        cursor, limit, descending=True
+    )
 
 @router.post("/proposals", response_model=CommercialProposalResponse)
 async def create_proposal(
     proposal_data: CommercialProposalCreate,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    db: AsyncSession = Depends(get_async_db),
+    current_user: UserResponse = Depends(get_current_user)
 ):
+    if not await db.get(CrmContact, proposal_data.contact_id):
+        raise HTTPException(status_code=404, detail="Contact not found")
+    
     # Generate proposal number
-    proposal_number = generate_proposal_number()
+    proposal_number = await generate_proposal_number()
     
     # Calculate expiry date
     expires_at = datetime.utcnow() + timedelta(days=proposal_data.validity_days)
@@ -77,25 +301,44 @@ async def create_proposal(
     )
     
     db.add(proposal)
-    db.commit()
-    db.refresh(proposal)
+    # Contact summary and timeline are written in the same transaction
+    await db.run_sync(record_proposal_change, proposal, None, current_user.id)
+    await db.commit()
+    await db.refresh(proposal)
+    await db.refresh(proposal, ["contact"])
+    await response_cache.invalidate(CONTACTS_TAG)
+    proposal_pdf_worker.enqueue(proposal.id)
     
     return proposal
 
+@router.post("/proposals/{proposal_id}/pdf", status_code=202)
+async def render_proposal_pdf(
+    proposal_id: UUID,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: UserResponse = Depends(get_current_user)
+):
+    """Queue PDF rendering; a no-op when the proposal content is unchanged"""
+    if not await db.get(CommercialProposal, proposal_id):
+        raise HTTPException(status_code=404, detail="Proposal not found")
+    
+    proposal_pdf_worker.enqueue(proposal_id)
+    
+    return {"message": "PDF rendering queued"}
+
 @router.put("/proposals/{proposal_id}/status")
 async def update_proposal_status(
-    proposal_id: str,
+    proposal_id: UUID,
     status: ProposalStatus,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    db: AsyncSession = Depends(get_async_db),
+    current_user: UserResponse = Depends(get_current_user)
 ):
-    proposal = db.query(CommercialProposal).filter(
-        CommercialProposal.id == proposal_id
-    ).first()
+    # Locked so concurrent status changes cannot both count the proposal out of the pipeline
+    proposal = await db.get(CommercialProposal, proposal_id, with_for_update=True)
     
     if not proposal:
         raise HTTPException(status_code=404, detail="Proposal not found")
     
+    previous_status = proposal_status(proposal)
     proposal.status = status
     
     if status == ProposalStatus.ENVIADA:
@@ -103,23 +346,31 @@ async def update_proposal_status(
     elif status == ProposalStatus.ACEITA:
         proposal.accepted_at = datetime.utcnow()
     
-    db.commit()
+    await db.run_sync(record_proposal_change, proposal, previous_status, current_user.id)
+    await db.commit()
+    await response_cache.invalidate(CONTACTS_TAG)
     
     return {"message": "Status updated successfully"}
 
 @router.post("/interactions", response_model=InteractionResponse)
 async def create_interaction(
     interaction_data: InteractionCreate,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    db: AsyncSession = Depends(get_async_db),
+    current_user: UserResponse = Depends(get_current_user)
 ):
+    if not await db.get(CrmContact, interaction_data.contact_id):
+        raise HTTPException(status_code=404, detail="Contact not found")
+    
     interaction = CrmInteraction(
         **interaction_data.dict(),
         created_by=current_user.id
     )
     
     db.add(interaction)
-    db.commit()
-    db.refresh(interaction)
+    # Contact summary and timeline are written in the same transaction
+    await db.run_sync(record_interaction, interaction, current_user.id)
+    await db.commit()
+    await db.refresh(interaction)
+    await response_cache.invalidate(CONTACTS_TAG)
     
     return interaction
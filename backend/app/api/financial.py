@@ -1,149 +1,571 @@
-
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
-from sqlalchemy import and_
-from typing import List
-from datetime import date, timedelta
+import tempfile
+from fastapi import APIRouter, Depends, File, Form, HTTPException, Query, Request, Response, UploadFile
+from starlette.concurrency import run_in_threadpool
+from pydantic import TypeAdapter
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import and_, select
+from typing import List, Optional
+from uuid import UUID
+from datetime import date
 from decimal import Decimal
-from app.core.database import get_db
-from app.api.auth import get_current_user
-from app.models.user import User
-from app.models.financial import AccountsPayable, CashFlow, CashFlowType
+from app.core.cache import (
+    ACC_TAG, ACCOUNTS_PAYABLE_TAG, CASH_FLOW_TAG, OPPORTUNITIES_TAG, response_cache
+)
+from app.core.database import SessionLocal, get_async_db
+from app.core.loading import eager_load_options
+from app.core.pagination import (
+    DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, keyset_order, paginate, stream_ndjson
+)
+from app.api.auth import get_current_user, require_admin
+from app.schemas.auth import UserResponse
+from app.models.financial import (
+    AccContract, AccStatus, AccountsPayable, CashFlow, CashFlowType, CurrencyCode, ExchangeRate,
+    FinancialDocument, TransactionStatus
+)
 from app.schemas.financial import (
-    AccountsPayableCreate, AccountsPayableResponse,
+    AccContractCreate, AccContractLiquidate, AccContractResponse, AccExposureBucket, AccValuationItem,
+    AccountsPayableCreate, AccountsPayableResponse, BulkImportResult,
     CashFlowCreate, CashFlowResponse,
-    CashFlowProjectionItem
+    CashFlowProjectionItem, ExchangeRateCreate, ExchangeRateResponse, FinancialDocumentResponse
+)
+from app.services.acc_service import (
+    LADDER_BUCKETS, exposure_ladder, refresh_open_book, value_contracts, value_open_book
+)
+from app.services.accounts_payable_service import (
+    import_payable_csv, import_payable_rows, payable_amount_brl, payable_cash_flow_values, payable_rate_key
+)
+from app.services.cash_flow_service import (
+    apply_cash_flow_to_rollup, delete_cash_flow, project_cash_flow, update_cash_flow_status
 )
+from app.services.document_store import acquire_blob, release_blob
+from app.services.fx_service import MissingRateError, get_rate, rate_cache, to_brl, upsert_rates
+from app.services.storage_service import StorageService, get_storage_service
 
 router = APIRouter(prefix="/financial", tags=["Financial"])
 
+# Bulk CSV bodies larger than this spill from memory to a temp file
+BULK_SPOOL_MAX_SIZE = 8 * 1024 * 1024
+
+ACCOUNTS_PAYABLE_LIST = TypeAdapter(List[AccountsPayableResponse])
+CASH_FLOW_LIST = TypeAdapter(List[CashFlowResponse])
+PROJECTION_LIST = TypeAdapter(List[CashFlowProjectionItem])
+ACC_CONTRACT_LIST = TypeAdapter(List[AccContractResponse])
+ACC_VALUATION_LIST = TypeAdapter(List[AccValuationItem])
+ACC_EXPOSURE_LIST = TypeAdapter(List[AccExposureBucket])
+
+async def resolve_exchange_rate(db: AsyncSession, contracted: Optional[Decimal], currency, on_date: date) -> Decimal:
+    """The contracted rate if given, else the rate table's rate for the date"""
+    if contracted is not None:
+        return contracted
+    try:
+        return await db.run_sync(get_rate, currency or CurrencyCode.BRL, on_date)
+    except MissingRateError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
 @router.get("/accounts-payable", response_model=List[AccountsPayableResponse])
 async def get_accounts_payable(
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    request: Request,
+    response: Response,
+    status: Optional[TransactionStatus] = None,
+    currency: Optional[CurrencyCode] = None,
+    supplier_name: Optional[str] = None,
+    due_from: Optional[date] = None,
+    due_to: Optional[date] = None,
+    cursor: Optional[str] = None,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    stream: bool = False,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: UserResponse = Depends(get_current_user)
 ):
-    payables = db.query(AccountsPayable).order_by(AccountsPayable.due_date).all()
-    return payables
+    stmt = select(AccountsPayable).options(
+        *eager_load_options(AccountsPayable, AccountsPayableResponse)
+    )
+    
+    if status:
+        stmt = stmt.where(AccountsPayable.status == status)
+    if currency:
+        stmt = stmt.where(AccountsPayable.currency == currency)
+    if supplier_name:
+        stmt = stmt.where(AccountsPayable.supplier_name.ilike(f"%{supplier_name}%"))
+    if due_from:
+        stmt = stmt.where(AccountsPayable.due_date >= due_from)
+    if due_to:
+        stmt = stmt.where(AccountsPayable.due_date <= due_to)
+    
+    if stream:
+        stmt = keyset_order(stmt, AccountsPayable.due_date, AccountsPayable.id, cursor)
+        return stream_ndjson(db, stmt, AccountsPayableResponse)
+    
+    async def build():
+        return await paginate(
+            db, stmt, AccountsPayable.due_date, AccountsPayable.id, response, cursor, limit
+        )
+    
+    return await response_cache.serve(
+        request, response, [ACCOUNTS_PAYABLE_TAG], ACCOUNTS_PAYABLE_LIST, build
+    )
 
 @router.post("/accounts-payable", response_model=AccountsPayableResponse)
 async def create_accounts_payable(
     payable_data: AccountsPayableCreate,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    db: AsyncSession = Depends(get_async_db),
+    current_user: UserResponse = Depends(get_current_user)
 ):
     # Calculate amount in BRL
-    amount_brl = payable_data.amount * (payable_data.exchange_rate or Decimal("1.0"))
+    exchange_rate = await resolve_exchange_rate(db, payable_data.exchange_rate, *payable_rate_key(payable_data))
+    amount_brl = payable_amount_brl(payable_data.amount, exchange_rate)
     
     payable = AccountsPayable(
-        **payable_data.dict(),
+        **payable_data.dict(exclude={"exchange_rate"}),
+        exchange_rate=exchange_rate,
         amount_brl=amount_brl,
         created_by=current_user.id
     )
     
     db.add(payable)
-    db.commit()
-    db.refresh(payable)
+    await db.flush()
     
-    # Create corresponding cash flow entry
+    # Create corresponding cash flow entry in the same transaction
     cash_flow = CashFlow(
-        flow_date=payable.due_date,
-        flow_type=CashFlowType.SAIDA,
-        origin="fornecedores",
-        amount=payable.amount,
-        currency=payable.currency,
-        exchange_rate=payable.exchange_rate,
-        amount_brl=amount_brl,
-        description=f"Pagamento para {payable.supplier_name}",
-        reference_id=payable.id,
-        reference_type="accounts_payable",
-        created_by=current_user.id
+        **payable_cash_flow_values(payable.id, payable_data, exchange_rate, amount_brl, current_user.id)
     )
     
     db.add(cash_flow)
-    db.commit()
+    await db.run_sync(apply_cash_flow_to_rollup, cash_flow)
+    await db.commit()
+    await db.refresh(payable)
+    await response_cache.invalidate(ACCOUNTS_PAYABLE_TAG, CASH_FLOW_TAG)
     
     return payable
 
+def _import_in_session(importer, source, created_by, atomic: bool) -> BulkImportResult:
+    # Validation and row building are CPU-bound: keep them off the event loop
+    with SessionLocal() as db:
+        return importer(db, source, created_by, atomic=atomic)
+
+@router.post("/accounts-payable/bulk", response_model=BulkImportResult)
+async def bulk_import_accounts_payable(
+    request: Request,
+    atomic: bool = False,
+    current_user: UserResponse = Depends(get_current_user)
+):
+    """
+    Import payables from a JSON array, a multipart CSV file or a raw text/csv body.
+    Valid rows are inserted with their cash flow entries in one transaction;
+    with atomic=true any invalid row aborts the whole import.
+    """
+    content_type = request.headers.get("content-type", "")
+    
+    if content_type.startswith("application/json"):
+        rows = await request.json()
+        if not isinstance(rows, list):
+            raise HTTPException(status_code=400, detail="Expected a JSON array of payables")
+        result = await run_in_threadpool(_import_in_session, import_payable_rows, rows, current_user.id, atomic)
+    elif content_type.startswith("multipart/form-data"):
+        form = await request.form()
+        upload = form.get("file")
+        if upload is None or isinstance(upload, str):
+            raise HTTPException(status_code=400, detail="Missing CSV file")
+        result = await run_in_threadpool(_import_in_session, import_payable_csv, upload.file, current_user.id, atomic)
+    elif content_type.startswith("text/csv"):
+        # Spool the streamed body so large uploads never sit fully in memory
+        with tempfile.SpooledTemporaryFile(max_size=BULK_SPOOL_MAX_SIZE) as spool:
+            async for chunk in request.stream():
+                spool.write(chunk)
+            spool.seek(0)
+            result = await run_in_threadpool(_import_in_session, import_payable_csv, spool, current_user.id, atomic)
+    else:
+        raise HTTPException(status_code=415, detail="Use application/json, text/csv or multipart/form-data")
+    
+    if result.inserted:
+        await response_cache.invalidate(ACCOUNTS_PAYABLE_TAG, CASH_FLOW_TAG)
+    
+    return result
+
 @router.get("/cash-flow", response_model=List[CashFlowResponse])
 async def get_cash_flow(
+    request: Request,
+    response: Response,
     start_date: date = None,
     end_date: date = None,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    flow_type: Optional[CashFlowType] = None,
+    status: Optional[TransactionStatus] = None,
+    currency: Optional[CurrencyCode] = None,
+    reference_type: Optional[str] = None,
+    cursor: Optional[str] = None,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    stream: bool = False,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: UserResponse = Depends(get_current_user)
 ):
-    query = db.query(CashFlow)
+    stmt = select(CashFlow).options(
+        *eager_load_options(CashFlow, CashFlowResponse)
+    )
     
     if start_date:
-        query = query.filter(CashFlow.flow_date >= start_date)
+        stmt = stmt.where(CashFlow.flow_date >= start_date)
     if end_date:
-        query = query.filter(CashFlow.flow_date <= end_date)
+        stmt = stmt.where(CashFlow.flow_date <= end_date)
+    if flow_type:
+        stmt = stmt.where(CashFlow.flow_type == flow_type)
+    if status:
+        stmt = stmt.where(CashFlow.status == status)
+    if currency:
+        stmt = stmt.where(CashFlow.currency == currency)
+    if reference_type:
+        stmt = stmt.where(CashFlow.reference_type == reference_type)
+    
+    if stream:
+        stmt = keyset_order(stmt, CashFlow.flow_date, CashFlow.id, cursor)
+        return stream_ndjson(db, stmt, CashFlowResponse)
     
-    flows = query.order_by(CashFlow.flow_date).all()
-    return flows
+    async def build():
+        return await paginate(db, stmt, CashFlow.flow_date, CashFlow.id, response, cursor, limit)
+    
+    return await response_cache.serve(request, response, [CASH_FLOW_TAG], CASH_FLOW_LIST, build)
 
 @router.post("/cash-flow", response_model=CashFlowResponse)
 async def create_cash_flow(
     flow_data: CashFlowCreate,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    db: AsyncSession = Depends(get_async_db),
+    current_user: UserResponse = Depends(get_current_user)
 ):
     # Calculate amount in BRL
-    amount_brl = flow_data.amount * Decimal("1.0")  # Simplified for now
+    exchange_rate = await resolve_exchange_rate(db, flow_data.exchange_rate, flow_data.currency, flow_data.flow_date)
+    amount_brl = to_brl(flow_data.amount, exchange_rate)
     
     cash_flow = CashFlow(
-        **flow_data.dict(),
+        **flow_data.dict(exclude={"exchange_rate"}),
+        exchange_rate=exchange_rate,
         amount_brl=amount_brl,
         created_by=current_user.id
     )
     
     db.add(cash_flow)
-    db.commit()
-    db.refresh(cash_flow)
+    await db.run_sync(apply_cash_flow_to_rollup, cash_flow)
+    await db.commit()
+    await db.refresh(cash_flow)
+    await response_cache.invalidate(CASH_FLOW_TAG)
     
     return cash_flow
 
+@router.put("/cash-flow/{flow_id}/status")
+async def update_cash_flow_entry_status(
+    flow_id: UUID,
+    status: TransactionStatus,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: UserResponse = Depends(get_current_user)
+):
+    cash_flow = await db.get(CashFlow, flow_id)
+    
+    if not cash_flow:
+        raise HTTPException(status_code=404, detail="Cash flow entry not found")
+    
+    await db.run_sync(update_cash_flow_status, cash_flow, status)
+    await db.commit()
+    await response_cache.invalidate(CASH_FLOW_TAG)
+    
+    return {"message": "Status updated successfully"}
+
+@router.delete("/cash-flow/{flow_id}")
+async def delete_cash_flow_entry(
+    flow_id: UUID,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: UserResponse = Depends(get_current_user)
+):
+    cash_flow = await db.get(CashFlow, flow_id)
+    
+    if not cash_flow:
+        raise HTTPException(status_code=404, detail="Cash flow entry not found")
+    
+    await db.run_sync(delete_cash_flow, cash_flow)
+    await db.commit()
+    await response_cache.invalidate(CASH_FLOW_TAG)
+    
+    return {"message": "Cash flow entry deleted successfully"}
+
 @router.get("/cash-flow-projection", response_model=List[CashFlowProjectionItem])
 async def get_cash_flow_projection(
-    days_ahead: int = 60,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    request: Request,
+    response: Response,
+    days_ahead: int = Query(60, ge=1, le=3650),
+    start_date: Optional[date] = None,
+    include_opening_balance: bool = True,
+    revalue: bool = False,
+    include_acc: bool = False,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: UserResponse = Depends(get_current_user)
 ):
     """
-    Generate cash flow projection for the specified number of days
+    Generate cash flow projection for the specified number of days;
+    with revalue, foreign currency flows are converted at today's rates,
+    and with include_acc, open ACC contracts are outflows at maturity
     """
-    projection_data = []
-    start_date = date.today()
-    accumulated_balance = Decimal("0.0")
-    
-    for i in range(days_ahead):
-        current_date = start_date + timedelta(days=i)
-        
-        # Get flows for this date
-        daily_flows = db.query(CashFlow).filter(
-            CashFlow.flow_date == current_date
-        ).all()
-        
-        total_inflow = sum(
-            flow.amount_brl or Decimal("0.0") 
-            for flow in daily_flows 
-            if flow.flow_type == CashFlowType.ENTRADA
-        )
-        
-        total_outflow = sum(
-            flow.amount_brl or Decimal("0.0") 
-            for flow in daily_flows 
-            if flow.flow_type == CashFlowType.SAIDA
-        )
-        
-        net_flow = total_inflow - total_outflow
-        accumulated_balance += net_flow
-        
-        projection_data.append(CashFlowProjectionItem(
-            projection_date=current_date.isoformat(),
-            total_inflow=total_inflow,
-            total_outflow=total_outflow,
-            net_flow=net_flow,
-            accumulated_balance=accumulated_balance
-        ))
-    
-    return projection_data
+    start_date = start_date or date.today()
+    revalue_at = date.today() if revalue else None
+    acc_rate_date = date.today() if include_acc else None
+    
+    async def build():
+        try:
+            return await db.run_sync(
+                project_cash_flow,
+                start_date,
+                days_ahead,
+                include_opening_balance=include_opening_balance,
+                revalue_at=revalue_at,
+                acc_rate_date=acc_rate_date
+            )
+        except MissingRateError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+    
+    # The implicit start and rate dates move daily, so they are part of the key
+    return await response_cache.serve(
+        request, response, [CASH_FLOW_TAG, ACC_TAG], PROJECTION_LIST, build,
+        vary=[start_date.isoformat(), date.today().isoformat()]
+    )
+
+@router.get("/exchange-rates", response_model=List[ExchangeRateResponse])
+async def get_exchange_rates(
+    currency: Optional[CurrencyCode] = None,
+    date_from: Optional[date] = None,
+    date_to: Optional[date] = None,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: UserResponse = Depends(get_current_user)
+):
+    stmt = select(ExchangeRate)
+    
+    if currency:
+        stmt = stmt.where(ExchangeRate.currency == currency)
+    if date_from:
+        stmt = stmt.where(ExchangeRate.rate_date >= date_from)
+    if date_to:
+        stmt = stmt.where(ExchangeRate.rate_date <= date_to)
+    
+    result = await db.execute(stmt.order_by(ExchangeRate.currency, ExchangeRate.rate_date))
+    return result.scalars().all()
+
+@router.put("/exchange-rates")
+async def put_exchange_rates(
+    rates: List[ExchangeRateCreate],
+    db: AsyncSession = Depends(get_async_db),
+    current_user: UserResponse = Depends(require_admin)
+):
+    """Insert or replace rates; revalued projections and the ACC book pick them up at once"""
+    count = await db.run_sync(upsert_rates, [rate.dict() for rate in rates])
+    if any(rate.currency == CurrencyCode.USD for rate in rates):
+        try:
+            await db.run_sync(refresh_open_book, date.today())
+        except MissingRateError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+    await db.commit()
+    # Rates first, so responses rebuilt under the new cache versions use the new rates
+    await rate_cache.invalidate()
+    await response_cache.invalidate(CASH_FLOW_TAG, ACC_TAG, OPPORTUNITIES_TAG)
+    
+    return {"message": f"{count} exchange rates saved"}
+
+@router.get("/acc-contracts", response_model=List[AccContractResponse])
+async def get_acc_contracts(
+    request: Request,
+    response: Response,
+    status: Optional[AccStatus] = None,
+    bank_name: Optional[str] = None,
+    maturity_from: Optional[date] = None,
+    maturity_to: Optional[date] = None,
+    cursor: Optional[str] = None,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: UserResponse = Depends(get_current_user)
+):
+    stmt = select(AccContract)
+    
+    if status:
+        stmt = stmt.where(AccContract.status == status)
+    if bank_name:
+        stmt = stmt.where(AccContract.bank_name.ilike(f"%{bank_name}%"))
+    if maturity_from:
+        stmt = stmt.where(AccContract.maturity_date >= maturity_from)
+    if maturity_to:
+        stmt = stmt.where(AccContract.maturity_date <= maturity_to)
+    
+    async def build():
+        return await paginate(db, stmt, AccContract.maturity_date, AccContract.id, response, cursor, limit)
+    
+    return await response_cache.serve(request, response, [ACC_TAG], ACC_CONTRACT_LIST, build)
+
+@router.post("/acc-contracts", response_model=AccContractResponse)
+async def create_acc_contract(
+    contract_data: AccContractCreate,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: UserResponse = Depends(get_current_user)
+):
+    existing = await db.execute(
+        select(AccContract.id).where(AccContract.contract_number == contract_data.contract_number)
+    )
+    if existing.first():
+        raise HTTPException(status_code=400, detail="Contract with this number already exists")
+    
+    if contract_data.maturity_date <= contract_data.contract_date:
+        raise HTTPException(status_code=400, detail="Maturity date must be after the contract date")
+    
+    exchange_rate = await resolve_exchange_rate(
+        db, contract_data.exchange_rate, CurrencyCode.USD, contract_data.contract_date
+    )
+    
+    contract = AccContract(
+        **contract_data.dict(exclude={"exchange_rate"}),
+        exchange_rate=exchange_rate,
+        created_by=current_user.id
+    )
+    
+    db.add(contract)
+    await db.flush()
+    # Load the generated advance amount, then cost the contract at its own rate
+    await db.refresh(contract)
+    valuation = value_contracts([contract], contract.contract_date, exchange_rate)[0]
+    contract.total_cost = valuation["total_cost_brl"]
+    await db.commit()
+    await db.refresh(contract)
+    await response_cache.invalidate(ACC_TAG)
+    
+    return contract
+
+@router.get("/acc-contracts/valuation", response_model=List[AccValuationItem])
+async def get_acc_valuation(
+    request: Request,
+    response: Response,
+    as_of: Optional[date] = None,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: UserResponse = Depends(get_current_user)
+):
+    """Accrued interest, IOF and liquidation P&L of the open book at the USD rate of as_of"""
+    as_of = as_of or date.today()
+    
+    async def build():
+        try:
+            valuations = await db.run_sync(value_open_book, as_of)
+        except MissingRateError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        return ACC_VALUATION_LIST.validate_python(valuations)
+    
+    return await response_cache.serve(
+        request, response, [ACC_TAG], ACC_VALUATION_LIST, build, vary=[as_of.isoformat()]
+    )
+
+@router.get("/acc-contracts/exposure", response_model=List[AccExposureBucket])
+async def get_acc_exposure(
+    request: Request,
+    response: Response,
+    bucket: str = "month",
+    db: AsyncSession = Depends(get_async_db),
+    current_user: UserResponse = Depends(get_current_user)
+):
+    """USD exposure of the open book by maturity bucket, valued at today's rate"""
+    if bucket not in LADDER_BUCKETS:
+        raise HTTPException(status_code=400, detail=f"bucket must be one of {', '.join(LADDER_BUCKETS)}")
+    as_of = date.today()
+    
+    async def build():
+        try:
+            valuations = await db.run_sync(value_open_book, as_of)
+        except MissingRateError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        return ACC_EXPOSURE_LIST.validate_python(exposure_ladder(valuations, as_of, bucket))
+    
+    return await response_cache.serve(
+        request, response, [ACC_TAG], ACC_EXPOSURE_LIST, build, vary=[as_of.isoformat()]
+    )
+
+@router.put("/acc-contracts/{contract_id}/liquidate", response_model=AccValuationItem)
+async def liquidate_acc_contract(
+    contract_id: UUID,
+    liquidation: AccContractLiquidate,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: UserResponse = Depends(get_current_user)
+):
+    """Settle a contract and return its realized result"""
+    contract = await db.get(AccContract, contract_id)
+    
+    if not contract:
+        raise HTTPException(status_code=404, detail="ACC contract not found")
+    if contract.status not in (AccStatus.ABERTO, AccStatus.VENCIDO):
+        raise HTTPException(status_code=400, detail="Only open contracts can be liquidated")
+    
+    liquidation_rate = await resolve_exchange_rate(
+        db, liquidation.liquidation_rate, CurrencyCode.USD, liquidation.liquidation_date
+    )
+    result = value_contracts([contract], liquidation.liquidation_date, liquidation_rate, settle=True)[0]
+    
+    contract.status = AccStatus.LIQUIDADO
+    contract.liquidation_date = liquidation.liquidation_date
+    contract.liquidation_rate = liquidation_rate
+    contract.total_cost = result["total_cost_brl"]
+    await db.commit()
+    await response_cache.invalidate(ACC_TAG)
+    
+    return {**result, "status": AccStatus.LIQUIDADO}
+
+@router.get("/documents", response_model=List[FinancialDocumentResponse])
+async def get_documents(
+    reference_id: UUID,
+    reference_type: Optional[str] = None,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: UserResponse = Depends(get_current_user)
+):
+    stmt = select(FinancialDocument).where(FinancialDocument.reference_id == reference_id)
+    if reference_type:
+        stmt = stmt.where(FinancialDocument.reference_type == reference_type)
+    
+    result = await db.execute(stmt.order_by(FinancialDocument.uploaded_at))
+    return result.scalars().all()
+
+@router.post("/documents", response_model=FinancialDocumentResponse)
+async def upload_document(
+    reference_id: UUID = Form(...),
+    reference_type: str = Form(...),
+    document_type: str = Form(...),
+    document_number: Optional[str] = Form(None),
+    file: UploadFile = File(...),
+    db: AsyncSession = Depends(get_async_db),
+    storage: StorageService = Depends(get_storage_service),
+    current_user: UserResponse = Depends(get_current_user)
+):
+    # Identical files attached elsewhere share one stored blob
+    blob = await acquire_blob(db, storage, file)
+    
+    document = FinancialDocument(
+        document_type=document_type,
+        document_number=document_number,
+        file_name=file.filename or blob.sha256,
+        file_path=blob.object_name,
+        file_size=str(blob.size),  # the column is a string in the original schema
+        mime_type=file.content_type,
+        blob_sha256=blob.sha256,
+        reference_id=reference_id,
+        reference_type=reference_type,
+        uploaded_by=current_user.id
+    )
+    
+    db.add(document)
+    await db.commit()
+    await db.refresh(document)
+    
+    return document
+
+@router.delete("/documents/{document_id}")
+async def delete_document(
+    document_id: UUID,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: UserResponse = Depends(get_current_user)
+):
+    document = await db.get(FinancialDocument, document_id)
+    
+    if not document:
+        raise HTTPException(status_code=404, detail="Document not found")
+    
+    if document.blob_sha256:
+        await release_blob(db, document.blob_sha256)
+    await db.delete(document)
+    await db.commit()
+    
+    return {"message": "Document deleted successfully"}
@@ -0,0 +1,76 @@
+from tempfile import SpooledTemporaryFile
+from fastapi import APIRouter, Depends, HTTPException
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+from starlette.concurrency import run_in_threadpool
+from app.core.database import get_async_db
+from app.api.auth import get_current_user
+from app.schemas.auth import UserResponse
+from app.models.reception import Reception
+from app.schemas.label import LabelBatchCreate, LabelBatchResponse, LabelPrintRequest
+from app.services.label_service import create_label_batch, label_sheet_rows, render_labels_pdf
+
+router = APIRouter(prefix="/labels", tags=["Labels"])
+
+# Rendered sheets larger than this spill to disk before streaming
+PDF_SPOOL_MAX_SIZE = 8 * 1024 * 1024
+PDF_CHUNK_SIZE = 64 * 1024
+
+@router.post("/batch", response_model=LabelBatchResponse)
+async def create_labels(
+    batch: LabelBatchCreate,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: UserResponse = Depends(get_current_user)
+):
+    reception = await db.get(Reception, batch.reception_id)
+    if not reception:
+        raise HTTPException(status_code=404, detail="Reception not found")
+    
+    first_code, last_code = await db.run_sync(
+        lambda session: create_label_batch(session, reception, batch.count)
+    )
+    await db.commit()
+    
+    return {
+        "reception_id": reception.id,
+        "count": batch.count,
+        "first_label_code": first_code,
+        "last_label_code": last_code
+    }
+
+@router.post("/print")
+async def print_labels(
+    print_data: LabelPrintRequest,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: UserResponse = Depends(get_current_user)
+):
+    """Printable label sheets for a reception (optionally a code range) as one PDF"""
+    labels = await db.run_sync(
+        label_sheet_rows, print_data.reception_id, print_data.first_label_code,
+        print_data.last_label_code, current_user.id
+    )
+    if not labels:
+        raise HTTPException(status_code=404, detail="No labels found")
+    
+    out = SpooledTemporaryFile(max_size=PDF_SPOOL_MAX_SIZE)
+    try:
+        await run_in_threadpool(render_labels_pdf, labels, out)
+    except Exception:
+        out.close()
+        raise
+    await db.commit()
+    out.seek(0)
+    
+    def iter_pdf():
+        try:
+            while chunk := out.read(PDF_CHUNK_SIZE):
+                yield chunk
+        finally:
+            out.close()
+    
+    filename = f"etiquetas-{labels[0]['reception_code']}.pdf"
+    return StreamingResponse(
+        iter_pdf(),
+        media_type="application/pdf",
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'}
+    )
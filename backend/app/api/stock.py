@@ -0,0 +1,68 @@
+from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List, Optional
+from uuid import UUID
+from datetime import datetime
+from decimal import Decimal
+from app.core.database import get_async_db
+from app.api.auth import get_current_user, require_admin
+from app.schemas.auth import UserResponse
+from app.models.storage import StockMovement
+from app.schemas.stock import (
+    AreaPosition, StockBalance, StockMovementCreate, StockMovementResponse, StockSnapshotResponse
+)
+from app.services.stock_ledger import get_balances, movement_deltas, record_movement, take_snapshot
+
+router = APIRouter(prefix="/stock", tags=["Stock"])
+
+@router.post("/movements", response_model=StockMovementResponse)
+async def create_movement(
+    movement_data: StockMovementCreate,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: UserResponse = Depends(get_current_user)
+):
+    values = movement_data.dict(exclude_none=True)
+    movement = StockMovement(**values, executed_by=current_user.id)
+    
+    if not movement_deltas(movement):
+        raise HTTPException(status_code=400, detail="Movement does not affect any storage area")
+    
+    await db.run_sync(record_movement, movement)
+    await db.commit()
+    await db.refresh(movement)
+    
+    return movement
+
+@router.get("/balances", response_model=List[StockBalance])
+async def get_stock_balances(
+    storage_area_id: Optional[UUID] = None,
+    reception_id: Optional[UUID] = None,
+    as_of: Optional[datetime] = None,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: UserResponse = Depends(get_current_user)
+):
+    """Per-area/per-lot balances; with as_of, replayed from the nearest snapshot"""
+    return await db.run_sync(get_balances, storage_area_id, reception_id, as_of)
+
+@router.get("/areas/{storage_area_id}/position", response_model=AreaPosition)
+async def get_area_position(
+    storage_area_id: UUID,
+    as_of: Optional[datetime] = None,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: UserResponse = Depends(get_current_user)
+):
+    balances = await db.run_sync(get_balances, storage_area_id, None, as_of)
+    
+    return {
+        "storage_area_id": storage_area_id,
+        "quantity_kg": sum((balance["quantity_kg"] for balance in balances), Decimal("0")),
+        "as_of": as_of
+    }
+
+@router.post("/snapshots", response_model=StockSnapshotResponse)
+async def create_snapshot(
+    as_of: Optional[datetime] = None,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: UserResponse = Depends(require_admin)
+):
+    return await db.run_sync(take_snapshot, as_of)
@@ -0,0 +1,135 @@
+from fastapi import APIRouter, Depends, File, Form, HTTPException, Request, UploadFile
+from fastapi.responses import Response, StreamingResponse
+from starlette.concurrency import run_in_threadpool
+from typing import List, Optional, Tuple
+from app.api.auth import get_current_user
+from app.schemas.auth import UserResponse
+from app.schemas.storage import PresignedUrl, PresignedUrlRequest
+from app.services.storage_service import BLOB_BUCKET, BUCKETS, StorageService, get_storage_service
+
+router = APIRouter(prefix="/storage", tags=["Storage"])
+
+def _check_bucket(bucket: str, write: bool = False):
+    if bucket not in BUCKETS:
+        raise HTTPException(status_code=404, detail="Bucket not found")
+    # Deduplicated document blobs are written only through acquire_blob
+    if write and bucket == BLOB_BUCKET:
+        raise HTTPException(status_code=403, detail="Bucket is read-only")
+
+def _parse_range(header: str, size: int) -> Optional[Tuple[int, int]]:
+    """
+    Parse a single "bytes=" range into inclusive (start, end) offsets.
+    Returns None for headers we serve in full (multi-range or other units).
+    """
+    unit, _, spec = header.partition("=")
+    if unit.strip() != "bytes" or "," in spec:
+        return None
+    
+    first, _, last = spec.strip().partition("-")
+    try:
+        if first:
+            start = int(first)
+            end = int(last) if last else size - 1
+        else:
+            # Suffix range: the final N bytes
+            start = max(size - int(last), 0)
+            end = size - 1
+    except ValueError:
+        start, end = size, -1
+    
+    if start > end or start >= size:
+        raise HTTPException(
+            status_code=416,
+            detail="Requested range not satisfiable",
+            headers={"Content-Range": f"bytes */{size}"}
+        )
+    return start, min(end, size - 1)
+
+def _content_length(request: Request) -> int:
+    """Declared body size, or -1 for chunked bodies, which are uploaded in parts"""
+    header = request.headers.get("content-length")
+    if header is None:
+        return -1
+    try:
+        length = int(header)
+    except ValueError:
+        length = -1
+    if length < 0:
+        raise HTTPException(status_code=400, detail="Invalid Content-Length header")
+    return length
+
+@router.post("/urls", response_model=List[PresignedUrl])
+async def get_presigned_urls(
+    url_request: PresignedUrlRequest,
+    storage: StorageService = Depends(get_storage_service),
+    current_user: UserResponse = Depends(get_current_user)
+):
+    """Sign download URLs for many objects at once, in request order"""
+    for ref in url_request.objects:
+        _check_bucket(ref.bucket)
+    
+    return await storage.get_file_urls(
+        [(ref.bucket, ref.object_name) for ref in url_request.objects],
+        url_request.expires_in_seconds
+    )
+
+@router.post("/{bucket}/upload")
+async def upload_file(
+    bucket: str,
+    file: UploadFile = File(...),
+    folder: str = Form(""),
+    storage: StorageService = Depends(get_storage_service),
+    current_user: UserResponse = Depends(get_current_user)
+):
+    _check_bucket(bucket, write=True)
+    return await storage.upload_file_async(bucket, file, folder)
+
+@router.put("/{bucket}/objects/{object_name:path}")
+async def put_object(
+    bucket: str,
+    object_name: str,
+    request: Request,
+    storage: StorageService = Depends(get_storage_service),
+    current_user: UserResponse = Depends(get_current_user)
+):
+    """Stream the raw request body to storage as it is received"""
+    _check_bucket(bucket, write=True)
+    return await storage.upload_body(
+        bucket, object_name, request.stream(), _content_length(request), request.headers.get("content-type")
+    )
+
+@router.get("/{bucket}/objects/{object_name:path}")
+async def download_object(
+    bucket: str,
+    object_name: str,
+    request: Request,
+    storage: StorageService = Depends(get_storage_service),
+    current_user: UserResponse = Depends(get_current_user)
+):
+    _check_bucket(bucket)
+    info = await run_in_threadpool(storage.get_file_info, bucket, object_name)
+    if info is None:
+        raise HTTPException(status_code=404, detail="File not found")
+    
+    headers = {"Accept-Ranges": "bytes", "ETag": f'"{info.etag}"'}
+    byte_range = None
+    if "range" in request.headers and request.headers.get("if-range", headers["ETag"]) == headers["ETag"]:
+        byte_range = _parse_range(request.headers["range"], info.size)
+    
+    if info.size == 0:
+        return Response(content=b"", media_type=info.content_type, headers=headers)
+    
+    if byte_range is None:
+        start, end, status_code = 0, info.size - 1, 200
+    else:
+        start, end = byte_range
+        status_code = 206
+        headers["Content-Range"] = f"bytes {start}-{end}/{info.size}"
+    headers["Content-Length"] = str(end - start + 1)
+    
+    return StreamingResponse(
+        storage.iter_file(bucket, object_name, offset=start, length=end - start + 1),
+        status_code=status_code,
+        media_type=info.content_type,
+        headers=headers
+    )
@@ -0,0 +1,100 @@
+from fastapi import APIRouter, Depends, File, Form, HTTPException, UploadFile
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List, Optional
+from uuid import UUID
+from datetime import date
+from app.core.database import get_async_db
+from app.api.auth import get_current_user
+from app.schemas.auth import UserResponse
+from app.models.expedition import ExpeditionDocument
+from app.schemas.traceability import ExpeditionDocumentResponse, ExpeditionProducer, ProducerExpedition
+from app.services.document_store import acquire_blob, release_blob
+from app.services.storage_service import StorageService, get_storage_service
+from app.services.genealogy_service import expeditions_for_producer, producers_for_expedition
+
+router = APIRouter(prefix="/traceability", tags=["Traceability"])
+
+@router.get("/producers/{producer_id}/expeditions", response_model=List[ProducerExpedition])
+async def get_producer_expeditions(
+    producer_id: UUID,
+    date_from: Optional[date] = None,
+    date_to: Optional[date] = None,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: UserResponse = Depends(get_current_user)
+):
+    """Forward trace: expeditions that contain a producer's lots"""
+    result = await db.execute(expeditions_for_producer(producer_id, date_from, date_to))
+    return result.mappings().all()
+
+@router.get("/expeditions/{expedition_id}/producers", response_model=List[ExpeditionProducer])
+async def get_expedition_producers(
+    expedition_id: UUID,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: UserResponse = Depends(get_current_user)
+):
+    """Backward trace: producers whose lots fed an expedition"""
+    result = await db.execute(producers_for_expedition(expedition_id))
+    return result.mappings().all()
+
+@router.get("/expeditions/{expedition_code}/documents", response_model=List[ExpeditionDocumentResponse])
+async def get_expedition_documents(
+    expedition_code: str,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: UserResponse = Depends(get_current_user)
+):
+    result = await db.execute(
+        select(ExpeditionDocument)
+        .where(ExpeditionDocument.expedition_code == expedition_code)
+        .order_by(ExpeditionDocument.upload_date)
+    )
+    return result.scalars().all()
+
+@router.post("/expeditions/{expedition_code}/documents", response_model=ExpeditionDocumentResponse)
+async def upload_expedition_document(
+    expedition_code: str,
+    type: str = Form(...),
+    name: Optional[str] = Form(None),
+    file: UploadFile = File(...),
+    db: AsyncSession = Depends(get_async_db),
+    storage: StorageService = Depends(get_storage_service),
+    current_user: UserResponse = Depends(get_current_user)
+):
+    # Identical files attached elsewhere share one stored blob
+    blob = await acquire_blob(db, storage, file)
+    
+    document = ExpeditionDocument(
+        expedition_code=expedition_code,
+        name=name or file.filename or blob.sha256,
+        type=type,
+        file_path=blob.object_name,
+        file_size=blob.size,
+        mime_type=file.content_type,
+        blob_sha256=blob.sha256,
+        uploaded_by=current_user.id
+    )
+    
+    db.add(document)
+    await db.commit()
+    await db.refresh(document)
+    
+    return document
+
+@router.delete("/expedition-documents/{document_id}")
+async def delete_expedition_document(
+    document_id: UUID,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: UserResponse = Depends(get_current_user)
+):
+    document = await db.get(ExpeditionDocument, document_id)
+    
+    if not document:
+        raise HTTPException(status_code=404, detail="Document not found")
+    
+    if document.blob_sha256:
+        await release_blob(db, document.blob_sha256)
+    await db.delete(document)
+    await db.commit()
+    
+    return {"message": "Document deleted successfully"}
+
@@ -0,0 +1,159 @@
+import hashlib
+import json
+import logging
+import time
+from collections import OrderedDict
+from typing import Awaitable, Callable, Iterable, List, Optional
+from fastapi import Request, Response
+from pydantic import TypeAdapter
+from redis.exceptions import RedisError
+from app.core.config import settings
+from app.core.redis import get_redis
+
+logger = logging.getLogger(__name__)
+
+# Response headers that are part of the cached representation
+CACHED_HEADERS = ("x-next-cursor",)
+
+# Tags shared by the routers that serve and invalidate these responses
+CONTACTS_TAG = "contacts"
+OPPORTUNITIES_TAG = "opportunities"
+CASH_FLOW_TAG = "cash_flow"
+ACCOUNTS_PAYABLE_TAG = "accounts_payable"
+ACC_TAG = "acc_contracts"
+
+class InMemoryCacheBackend:
+    """Process-local LRU backend, used in tests and single-worker setups"""
+    def __init__(self, max_entries: int = 1024):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+    
+    async def get(self, key: str) -> Optional[str]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if expires_at is not None and expires_at < time.monotonic():
+            self._entries.pop(key, None)
+            return None
+        self._entries.move_to_end(key)
+        return value
+    
+    async def mget(self, keys: List[str]) -> List[Optional[str]]:
+        return [await self.get(key) for key in keys]
+    
+    async def set(self, key: str, value: str, ttl: Optional[int] = None):
+        expires_at = time.monotonic() + ttl if ttl else None
+        self._entries[key] = (expires_at, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+    
+    async def incr(self, key: str) -> int:
+        value = int(await self.get(key) or 0) + 1
+        await self.set(key, str(value))
+        return value
+    
+    async def clear(self):
+        self._entries.clear()
+
+class RedisCacheBackend:
+    """Shared backend on the application Redis"""
+    async def get(self, key: str) -> Optional[str]:
+        return await get_redis().get(key)
+    
+    async def mget(self, keys: List[str]) -> List[Optional[str]]:
+        return await get_redis().mget(keys)
+    
+    async def set(self, key: str, value: str, ttl: Optional[int] = None):
+        await get_redis().set(key, value, ex=ttl)
+    
+    async def incr(self, key: str) -> int:
+        return await get_redis().incr(key)
+
+class ResponseCache:
+    """
+    GET response cache with tag invalidation and ETag revalidation.
+    
+    Entry keys embed the current version of every tag, so bumping a tag
+    version orphans all entries built from it; they age out by TTL.
+    """
+    def __init__(self, backend, ttl_seconds: int):
+        self.backend = backend
+        self.ttl_seconds = ttl_seconds
+    
+    def _tag_key(self, tag: str) -> str:
+        return f"cache:tag:{tag}"
+    
+    def _entry_key(self, request: Request, versions: List[str], vary: Iterable[str]) -> str:
+        query = "&".join(f"{k}={v}" for k, v in sorted(request.query_params.multi_items()))
+        raw = "|".join([request.url.path, query, *versions, *vary])
+        return f"cache:response:{hashlib.sha256(raw.encode()).hexdigest()}"
+    
+    async def invalidate(self, *tags: str):
+        """Bump tag versions; call after committing a write"""
+        if self.backend is None:
+            return
+        try:
+            for tag in tags:
+                await self.backend.incr(self._tag_key(tag))
+        except RedisError as e:
+            logger.warning("Response cache invalidation failed: %s", e)
+    
+    async def serve(
+        self,
+        request: Request,
+        response: Response,
+        tags: List[str],
+        adapter: TypeAdapter,
+        build: Callable[[], Awaitable],
+        vary: Iterable[str] = ()
+    ) -> Response:
+        """Return the cached representation or build, store and return it"""
+        vary = list(vary)
+        key, cached = None, None
+        if self.backend is not None:
+            try:
+                versions = await self.backend.mget([self._tag_key(tag) for tag in tags])
+                key = self._entry_key(request, [str(version or 0) for version in versions], vary)
+                cached = await self.backend.get(key)
+            except RedisError as e:
+                logger.warning("Response cache read failed: %s", e)
+        
+        if cached is not None:
+            entry = json.loads(cached)
+            body, etag, headers = entry["body"].encode(), entry["etag"], entry["headers"]
+        else:
+            data = await build()
+            body = adapter.dump_json(data)
+            etag = f'"{hashlib.sha256(body).hexdigest()[:32]}"'
+            headers = {
+                name: value for name, value in response.headers.items() if name in CACHED_HEADERS
+            }
+            if key is not None:
+                try:
+                    await self.backend.set(
+                        key,
+                        json.dumps({"body": body.decode(), "etag": etag, "headers": headers}),
+                        self.ttl_seconds
+                    )
+                except RedisError as e:
+                    logger.warning("Response cache write failed: %s", e)
+        
+        headers = {**headers, "ETag": etag, "Cache-Control": "private, no-cache"}
+        if etag in request.headers.get("if-none-match", ""):
+            return Response(status_code=304, headers=headers)
+        return Response(content=body, media_type="application/json", headers=headers)
+
+def build_cache_backend(kind: str, max_entries: int = 1024):
+    """Backend for a "redis", "memory" or "none" setting"""
+    if kind == "redis":
+        return RedisCacheBackend()
+    if kind == "memory":
+        return InMemoryCacheBackend(max_entries)
+    return None
+
+response_cache = ResponseCache(
+    build_cache_backend(settings.RESPONSE_CACHE_BACKEND, settings.RESPONSE_CACHE_MAX_ENTRIES),
+    settings.RESPONSE_CACHE_TTL_SECONDS
+)
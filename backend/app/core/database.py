@@ -1,23 +1,225 @@
-
-from sqlalchemy import create_engine
+import json
+import threading
+import time
+from contextlib import contextmanager
+from typing import List
+from sqlalchemy import create_engine, event, exc
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
-from sqlalchemy.pool import StaticPool
+from sqlalchemy.sql.expression import ClauseElement, Executable
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool, StaticPool
 from app.core.config import settings
 
-engine = create_engine(
-    settings.DATABASE_URL,
-    poolclass=StaticPool,
-    connect_args={"check_same_thread": False} if "sqlite" in settings.DATABASE_URL else {},
-)
+class PoolMetrics:
+    """Checkout wait statistics for a connection pool"""
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.checkouts = 0
+        self.timeouts = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+    
+    def record_wait(self, seconds: float, timed_out: bool = False):
+        with self._lock:
+            self.checkouts += 1
+            self.total_wait += seconds
+            self.max_wait = max(self.max_wait, seconds)
+            if timed_out:
+                self.timeouts += 1
+    
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {
+                "checkouts": self.checkouts,
+                "timeouts": self.timeouts,
+                "avg_wait_ms": round(self.total_wait / self.checkouts * 1000, 3) if self.checkouts else 0.0,
+                "max_wait_ms": round(self.max_wait * 1000, 3)
+            }
+
+class CheckoutTimingMixin:
+    """Records how long callers wait for a connection from a queue pool"""
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.metrics = PoolMetrics()
+    
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            connection = super()._do_get()
+        except exc.TimeoutError:
+            self.metrics.record_wait(time.perf_counter() - started, timed_out=True)
+            raise
+        self.metrics.record_wait(time.perf_counter() - started)
+        return connection
+
+class InstrumentedQueuePool(CheckoutTimingMixin, QueuePool):
+    """QueuePool with checkout wait metrics"""
+
+class InstrumentedAsyncQueuePool(CheckoutTimingMixin, AsyncAdaptedQueuePool):
+    """asyncio-adapted QueuePool with checkout wait metrics"""
+
+def async_database_url(database_url: str) -> str:
+    """Map a sync database URL onto its asyncio driver"""
+    scheme, _, rest = database_url.partition("://")
+    if scheme.startswith("postgresql"):
+        return f"postgresql+asyncpg://{rest}"
+    if scheme.startswith("sqlite"):
+        return f"sqlite+aiosqlite://{rest}"
+    return database_url
+
+def engine_options(database_url: str, use_async: bool = False) -> dict:
+    """Pool configuration for the given database URL"""
+    if database_url.startswith("sqlite"):
+        # Tests share a single in-process connection
+        return {
+            "poolclass": StaticPool,
+            "connect_args": {"check_same_thread": False}
+        }
+    
+    return {
+        "poolclass": InstrumentedAsyncQueuePool if use_async else InstrumentedQueuePool,
+        "pool_size": settings.DB_POOL_SIZE,
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        "pool_timeout": settings.DB_POOL_TIMEOUT,
+        "pool_recycle": settings.DB_POOL_RECYCLE,
+        "pool_pre_ping": settings.DB_POOL_PRE_PING
+    }
+
+engine = create_engine(settings.DATABASE_URL, **engine_options(settings.DATABASE_URL))
 
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+async_engine = create_async_engine(
+    async_database_url(settings.DATABASE_URL),
+    **engine_options(settings.DATABASE_URL, use_async=True)
+)
+
+# Objects stay readable after commit; lazy loads are not possible outside the session
+AsyncSessionLocal = async_sessionmaker(
+    async_engine, class_=AsyncSession, autoflush=False, expire_on_commit=False
+)
+
 Base = declarative_base()
 
+def dialect_insert(db):
+    """Return the insert construct supporting ON CONFLICT for the bound dialect"""
+    if db.get_bind().dialect.name == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert
+    else:
+        from sqlalchemy.dialects.sqlite import insert
+    return insert
+
 def get_db():
     db = SessionLocal()
     try:
         yield db
     finally:
         db.close()
+
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
+
+def _sync_engine(bind):
+    return getattr(bind, "sync_engine", bind)
+
+def get_pool_status(bind=None) -> dict:
+    """Current pool occupancy and checkout wait statistics"""
+    pool = _sync_engine(bind or engine).pool
+    status = {"pool_class": type(pool).__name__}
+    
+    if isinstance(pool, QueuePool):
+        status.update({
+            "size": pool.size(),
+            "checked_in": pool.checkedin(),
+            "checked_out": pool.checkedout(),
+            "overflow": max(pool.overflow(), 0),
+            "max_overflow": pool._max_overflow
+        })
+    if hasattr(pool, "metrics"):
+        status.update(pool.metrics.snapshot())
+    
+    return status
+
+class QueryCounter:
+    """Collects the statements executed while attached to an engine"""
+    def __init__(self):
+        self.statements = []
+    
+    @property
+    def count(self) -> int:
+        return len(self.statements)
+    
+    def __call__(self, conn, cursor, statement, parameters, context, executemany):
+        self.statements.append(statement)
+
+@contextmanager
+def count_queries(bind=None):
+    """Count SQL statements issued inside the block (both engines by default)"""
+    targets = [_sync_engine(bind)] if bind is not None else [engine, async_engine.sync_engine]
+    counter = QueryCounter()
+    for target in targets:
+        event.listen(target, "before_cursor_execute", counter)
+    try:
+        yield counter
+    finally:
+        for target in targets:
+            event.remove(target, "before_cursor_execute", counter)
+
+@contextmanager
+def assert_max_queries(max_count: int, bind=None):
+    """Fail if the block issues more than max_count SQL statements"""
+    with count_queries(bind) as counter:
+        yield counter
+    if counter.count > max_count:
+        statements = "\n".join(counter.statements)
+        raise AssertionError(
+            f"Expected at most {max_count} queries, got {counter.count}:\n{statements}"
+        )
+
+class explain(Executable, ClauseElement):
+    """EXPLAIN of a statement, with its parameters bound as usual"""
+    inherit_cache = False
+    
+    def __init__(self, statement):
+        self.statement = statement
+
+@compiles(explain, "postgresql")
+def _explain_postgresql(element, compiler, **kw):
+    return "EXPLAIN (FORMAT JSON) " + compiler.process(element.statement, **kw)
+
+@compiles(explain, "sqlite")
+def _explain_sqlite(element, compiler, **kw):
+    return "EXPLAIN QUERY PLAN " + compiler.process(element.statement, **kw)
+
+def _plan_nodes(node):
+    yield node
+    for child in node.get("Plans", []):
+        yield from _plan_nodes(child)
+
+def sequential_scans(db, statement) -> List[str]:
+    """Tables the planner would read in full for a statement"""
+    # Raw cursor rows: the statement's result processors do not apply to plan rows
+    result = db.execute(explain(statement))
+    rows = result.cursor.fetchall()
+    result.close()
+    if db.get_bind().dialect.name == "postgresql":
+        plan = rows[0][0]
+        plan = json.loads(plan) if isinstance(plan, str) else plan
+        return [
+            node["Relation Name"] for node in _plan_nodes(plan[0]["Plan"])
+            if node["Node Type"] == "Seq Scan"
+        ]
+    # SQLite: "SCAN <table>" without "USING ... INDEX" is a full table scan
+    return [
+        detail.split()[1] for *_, detail in rows
+        if detail.startswith("SCAN ") and "INDEX" not in detail
+    ]
+
+def assert_index_scans(db, statement):
+    """Fail if the planner would read any table of a statement in full"""
+    scans = sequential_scans(db, statement)
+    if scans:
+        raise AssertionError(f"Sequential scan on {', '.join(scans)}:\n{statement}")
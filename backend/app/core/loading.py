@@ -0,0 +1,43 @@
+from functools import lru_cache
+from typing import Optional, Tuple, Type, Union, get_args, get_origin
+from pydantic import BaseModel
+from sqlalchemy import inspect
+from sqlalchemy.orm import joinedload, selectinload
+
+def _nested_schema(annotation) -> Optional[Type[BaseModel]]:
+    """Unwrap Optional[...] / List[...] annotations down to a nested schema"""
+    if isinstance(annotation, type) and issubclass(annotation, BaseModel):
+        return annotation
+    if get_origin(annotation) in (Union, list, tuple, set) or get_args(annotation):
+        for arg in get_args(annotation):
+            nested = _nested_schema(arg)
+            if nested is not None:
+                return nested
+    return None
+
+def _schema_loader_options(model, schema: Type[BaseModel], parent=None) -> list:
+    mapper = inspect(model)
+    options = []
+
+    for name, field in schema.model_fields.items():
+        nested = _nested_schema(field.annotation)
+        if nested is None or name not in mapper.relationships:
+            continue
+
+        relationship = mapper.relationships[name]
+        attribute = getattr(model, name)
+        # Collections load in a second IN query, scalars ride along as a JOIN
+        if relationship.uselist:
+            loader = parent.selectinload(attribute) if parent is not None else selectinload(attribute)
+        else:
+            loader = parent.joinedload(attribute) if parent is not None else joinedload(attribute)
+
+        options.append(loader)
+        options.extend(_schema_loader_options(relationship.mapper.class_, nested, loader))
+
+    return options
+
+@lru_cache(maxsize=None)
+def eager_load_options(model, schema: Type[BaseModel]) -> Tuple:
+    """Loader options for every relationship serialized by a response schema"""
+    return tuple(_schema_loader_options(model, schema))
@@ -0,0 +1,93 @@
+import base64
+import binascii
+import json
+import uuid
+from datetime import date, datetime
+from typing import Optional, Type
+from fastapi import HTTPException, Response
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel
+from sqlalchemy import and_, or_
+from sqlalchemy.ext.asyncio import AsyncSession
+
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 500
+STREAM_BATCH_SIZE = 500
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+def encode_cursor(sort_value, row_id) -> str:
+    """Encode the sort key of the last row of a page as an opaque cursor"""
+    if isinstance(sort_value, (date, datetime)):
+        sort_value = sort_value.isoformat()
+    payload = json.dumps([sort_value, str(row_id)])
+    return base64.urlsafe_b64encode(payload.encode()).decode()
+
+def decode_cursor(cursor: str, sort_column):
+    """Decode a cursor back into typed (sort value, id) keys"""
+    try:
+        sort_value, row_id = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        python_type = sort_column.type.python_type
+        if python_type is datetime:
+            sort_value = datetime.fromisoformat(sort_value)
+        elif python_type is date:
+            sort_value = date.fromisoformat(sort_value)
+        return sort_value, uuid.UUID(row_id)
+    except (ValueError, TypeError, binascii.Error):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+def keyset_order(stmt, sort_column, id_column, cursor: Optional[str] = None, descending: bool = False):
+    """Order by (sort key, id) and skip everything up to the cursor"""
+    if cursor:
+        sort_value, row_id = decode_cursor(cursor, sort_column)
+        if descending:
+            stmt = stmt.where(or_(
+                sort_column < sort_value,
+                and_(sort_column == sort_value, id_column < row_id)
+            ))
+        else:
+            stmt = stmt.where(or_(
+                sort_column > sort_value,
+                and_(sort_column == sort_value, id_column > row_id)
+            ))
+    
+    if descending:
+        return stmt.order_by(sort_column.desc(), id_column.desc())
+    return stmt.order_by(sort_column, id_column)
+
+async def paginate(
+    db: AsyncSession,
+    stmt,
+    sort_column,
+    id_column,
+    response: Response,
+    cursor: Optional[str] = None,
+    limit: int = DEFAULT_PAGE_SIZE,
+    descending: bool = False
+):
+    """Fetch one keyset page and expose the next cursor as a response header"""
+    stmt = keyset_order(stmt, sort_column, id_column, cursor, descending).limit(limit + 1)
+    rows = (await db.execute(stmt)).scalars().all()
+    
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last = rows[-1]
+        response.headers[NEXT_CURSOR_HEADER] = encode_cursor(
+            getattr(last, sort_column.key), getattr(last, id_column.key)
+        )
+    
+    return rows
+
+def stream_ndjson(
+    db: AsyncSession,
+    stmt,
+    schema: Type[BaseModel],
+    batch_size: int = STREAM_BATCH_SIZE
+) -> StreamingResponse:
+    """Stream rows as NDJSON from a server-side cursor, one batch in memory at a time"""
+    async def generate():
+        result = await db.stream(stmt.execution_options(yield_per=batch_size))
+        async for partition in result.scalars().partitions():
+            for row in partition:
+                yield schema.model_validate(row).model_dump_json() + "\n"
+    
+    return StreamingResponse(generate(), media_type="application/x-ndjson")
@@ -0,0 +1,109 @@
+import asyncio
+import logging
+import time
+from collections import OrderedDict
+from typing import Optional
+from redis.exceptions import RedisError
+from app.core.config import settings
+from app.core.redis import get_redis
+from app.schemas.auth import UserResponse
+
+logger = logging.getLogger(__name__)
+
+INVALIDATION_CHANNEL = "principal-cache:invalidate"
+
+class PrincipalCache:
+    """
+    Authenticated-user cache: a TTL/LRU dict per process, optionally backed
+    by Redis so workers share entries and hear about invalidations.
+    """
+    def __init__(self, ttl_seconds: int, max_size: int, use_redis: bool = False):
+        self.ttl_seconds = ttl_seconds
+        self.max_size = max_size
+        self.use_redis = use_redis
+        self._local = OrderedDict()
+    
+    def _key(self, user_id) -> str:
+        return f"principal:{user_id}"
+    
+    def _get_local(self, user_id) -> Optional[UserResponse]:
+        entry = self._local.get(str(user_id))
+        if entry is None:
+            return None
+        expires_at, principal = entry
+        if expires_at < time.monotonic():
+            self._local.pop(str(user_id), None)
+            return None
+        self._local.move_to_end(str(user_id))
+        return principal
+    
+    def _set_local(self, user_id, principal: UserResponse):
+        self._local[str(user_id)] = (time.monotonic() + self.ttl_seconds, principal)
+        self._local.move_to_end(str(user_id))
+        while len(self._local) > self.max_size:
+            self._local.popitem(last=False)
+    
+    def evict_local(self, user_id):
+        self._local.pop(str(user_id), None)
+    
+    async def get(self, user_id) -> Optional[UserResponse]:
+        principal = self._get_local(user_id)
+        if principal is not None or not self.use_redis:
+            return principal
+        
+        try:
+            payload = await get_redis().get(self._key(user_id))
+        except RedisError as e:
+            logger.warning("Principal cache read failed: %s", e)
+            return None
+        if payload is None:
+            return None
+        
+        principal = UserResponse.model_validate_json(payload)
+        self._set_local(user_id, principal)
+        return principal
+    
+    async def set(self, user_id, principal: UserResponse):
+        self._set_local(user_id, principal)
+        if not self.use_redis:
+            return
+        
+        try:
+            await get_redis().set(self._key(user_id), principal.model_dump_json(), ex=self.ttl_seconds)
+        except RedisError as e:
+            logger.warning("Principal cache write failed: %s", e)
+    
+    async def invalidate(self, user_id):
+        """Drop a user everywhere; call after deactivation or a role change"""
+        self.evict_local(user_id)
+        if not self.use_redis:
+            return
+        
+        try:
+            redis = get_redis()
+            await redis.delete(self._key(user_id))
+            await redis.publish(INVALIDATION_CHANNEL, str(user_id))
+        except RedisError as e:
+            logger.warning("Principal cache invalidation failed: %s", e)
+    
+    async def listen_for_invalidations(self):
+        """Evict local entries invalidated by other workers"""
+        while True:
+            try:
+                pubsub = get_redis().pubsub()
+                await pubsub.subscribe(INVALIDATION_CHANNEL)
+                async for message in pubsub.listen():
+                    if message["type"] == "message":
+                        self.evict_local(message["data"])
+            except asyncio.CancelledError:
+                raise
+            except RedisError as e:
+                # Local entries still expire by TTL while Redis is unreachable
+                logger.warning("Principal invalidation listener failed: %s", e)
+                await asyncio.sleep(5)
+
+principal_cache = PrincipalCache(
+    ttl_seconds=settings.PRINCIPAL_CACHE_TTL_SECONDS,
+    max_size=settings.PRINCIPAL_CACHE_MAX_SIZE,
+    use_redis=settings.PRINCIPAL_CACHE_USE_REDIS
+)
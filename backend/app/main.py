@@ -1,10 +1,17 @@
 
+import asyncio
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse
 from app.core.config import settings
-from app.core.database import Base, engine
-from app.api import auth, financial, crm
+from app.core.database import Base, engine, async_engine, get_pool_status
+from app.core.pagination import NEXT_CURSOR_HEADER
+from app.core.principal_cache import principal_cache
+from app.core.redis import close_redis
+from app.api import auth, financial, crm, labels, stock, storage, traceability
+from app.services.fx_service import rate_cache
+from app.services.proposal_pdf_service import proposal_pdf_worker
+from app.services.storage_service import get_storage_service
 
 # Create database tables
 Base.metadata.create_all(bind=engine)
@@ -22,12 +29,47 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=[NEXT_CURSOR_HEADER, "ETag", "Content-Range", "Accept-Ranges"],
 )
 
 # Include routers
 app.include_router(auth.router, prefix="/api")
 app.include_router(financial.router, prefix="/api")
 app.include_router(crm.router, prefix="/api")
+app.include_router(labels.router, prefix="/api")
+app.include_router(stock.router, prefix="/api")
+app.include_router(storage.router, prefix="/api")
+app.include_router(traceability.router, prefix="/api")
+
+@app.on_event("startup")
+async def start_cache_listeners():
+    if principal_cache.use_redis:
+        app.state.principal_listener = asyncio.create_task(
+            principal_cache.listen_for_invalidations()
+        )
+    if rate_cache.use_redis:
+        app.state.rate_listener = asyncio.create_task(rate_cache.listen_for_invalidations())
+
+@app.on_event("startup")
+async def provision_storage():
+    # Runs in the background so a slow or absent MinIO never delays startup
+    app.state.storage_provisioning = asyncio.create_task(get_storage_service().ensure_buckets())
+
+@app.on_event("startup")
+async def start_proposal_pdf_worker():
+    proposal_pdf_worker.start()
+
+@app.on_event("shutdown")
+async def stop_proposal_pdf_worker():
+    await proposal_pdf_worker.stop()
+
+@app.on_event("shutdown")
+async def stop_cache_listeners():
+    for name in ("principal_listener", "rate_listener"):
+        listener = getattr(app.state, name, None)
+        if listener:
+            listener.cancel()
+    await close_redis()
 
 @app.get("/")
 async def root():
@@ -44,6 +86,13 @@ async def health_check():
         "timestamp": "2024-01-01T00:00:00Z"
     })
 
+@app.get("/health/db-pool")
+async def db_pool_status():
+    return JSONResponse({
+        "async": get_pool_status(async_engine),
+        "sync": get_pool_status(engine)
+    })
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run(
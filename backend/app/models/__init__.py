@@ -2,13 +2,19 @@
 from app.models.user import User, Profile
 from app.models.financial import *
 from app.models.crm import *
+from app.models.document import *
 from app.models.reception import *
 from app.models.storage import *
+from app.models.expedition import *
+from app.models.sequence import *
 
 __all__ = [
     "User", "Profile",
     # Financial models will be imported from financial module
     # CRM models will be imported from crm module
+    # Document blob models will be imported from document module
     # Reception models will be imported from reception module
     # Storage models will be imported from storage module
+    # Expedition models will be imported from expedition module
+    # Sequence models will be imported from sequence module
 ]
@@ -1,5 +1,7 @@
 
-from sqlalchemy import Column, String, DateTime, Boolean, ForeignKey, Enum, Numeric, Date, Text, Integer
+from sqlalchemy import (
+    DDL, Column, String, DateTime, Boolean, ForeignKey, Enum, Numeric, Date, Text, Integer, Index, event, text
+)
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
@@ -7,6 +9,31 @@ import uuid
 import enum
 from app.core.database import Base
 
+# Full-text search uses the 'simple' configuration: names and notes mix
+# Portuguese, English and Spanish, so nothing is stemmed
+SEARCH_CONFIG = text("'simple'")
+
+def search_vector(*columns):
+    """
+    tsvector over text columns. Searches must use the very expressions
+    declared below, so the planner can match them to the GIN indexes.
+    """
+    document = func.coalesce(columns[0], text("''"))
+    for column in columns[1:]:
+        document = document.op("||")(text("' '")).op("||")(func.coalesce(column, text("''")))
+    return func.to_tsvector(SEARCH_CONFIG, document)
+
+def trigram_index(name: str, column: str) -> Index:
+    return Index(name, column, postgresql_using="gin", postgresql_ops={column: "gin_trgm_ops"}).ddl_if(
+        dialect="postgresql"
+    )
+
+# Trigram indexes need pg_trgm before create_all builds them
+event.listen(
+    Base.metadata, "before_create",
+    DDL("CREATE EXTENSION IF NOT EXISTS pg_trgm").execute_if(dialect="postgresql")
+)
+
 class ContactStatus(str, enum.Enum):
     ATIVO = "ativo"
     DESQUALIFICADO = "desqualificado"
@@ -51,6 +78,11 @@ class ProposalStatus(str, enum.Enum):
     REJEITADA = "rejeitada"
     EXPIRADA = "expirada"
 
+class ContactEventType(str, enum.Enum):
+    INTERACAO = "interacao"
+    PROPOSTA_CRIADA = "proposta_criada"
+    PROPOSTA_STATUS = "proposta_status"
+
 class CrmContact(Base):
     __tablename__ = "crm_contacts"
     
@@ -71,10 +103,59 @@ class CrmContact(Base):
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
     
+    # Activity summary, maintained by contact_activity_service on every
+    # interaction and proposal write so the contact list needs no joins
+    last_interaction_at = Column(DateTime(timezone=True))
+    next_action_date = Column(Date)
+    open_proposal_count = Column(Integer, nullable=False, default=0, server_default="0")
+    
     # Relationships
     interactions = relationship("CrmInteraction", back_populates="contact")
     opportunities = relationship("CrmOpportunity", back_populates="contact")
     proposals = relationship("CommercialProposal", back_populates="contact")
+    # Loaded with the contact: one IN query per page of contacts
+    pipeline = relationship(
+        "CrmContactPipeline", lazy="selectin", order_by="CrmContactPipeline.currency", viewonly=True
+    )
+    
+    __table_args__ = (
+        Index("ix_crm_contacts_company_name", "company_name", "id"),
+        Index("ix_crm_contacts_status_company_name", "status", "company_name", "id"),
+        Index("ix_crm_contacts_assigned_company_name", "assigned_to", "company_name", "id"),
+        trigram_index("ix_crm_contacts_company_name_trgm", "company_name"),
+        trigram_index("ix_crm_contacts_contact_name_trgm", "contact_name"),
+    )
+
+class CrmContactPipeline(Base):
+    """Open proposals of a contact per currency; rows without open proposals are removed"""
+    __tablename__ = "crm_contact_pipeline"
+    
+    contact_id = Column(UUID(as_uuid=True), ForeignKey("crm_contacts.id"), primary_key=True)
+    currency = Column(String, primary_key=True)
+    open_proposal_count = Column(Integer, nullable=False, default=0)
+    open_value = Column(Numeric(17, 2), nullable=False, default=0)
+
+class CrmContactEvent(Base):
+    """
+    Append-only activity timeline of a contact: interactions, new proposals
+    and proposal status changes, written with them in one transaction
+    """
+    __tablename__ = "crm_contact_events"
+    
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    contact_id = Column(UUID(as_uuid=True), ForeignKey("crm_contacts.id"), nullable=False)
+    occurred_at = Column(DateTime(timezone=True), nullable=False)
+    event_type = Column(Enum(ContactEventType), nullable=False)
+    reference_id = Column(UUID(as_uuid=True), nullable=False)  # interaction or proposal
+    title = Column(String, nullable=False)
+    description = Column(Text)
+    created_by = Column(UUID(as_uuid=True), ForeignKey("users.id"))
+    
+    __table_args__ = (
+        # The timeline pages newest first by (occurred_at, id)
+        Index("ix_crm_contact_events_contact_occurred_at", "contact_id", "occurred_at", "id"),
+        Index("ix_crm_contact_events_reference", "reference_id"),
+    )
 
 class CrmInteraction(Base):
     __tablename__ = "crm_interactions"
@@ -92,6 +173,10 @@ class CrmInteraction(Base):
     
     # Relationships
     contact = relationship("CrmContact", back_populates="interactions")
+    
+    __table_args__ = (
+        Index("ix_crm_interactions_contact_date", "contact_id", "interaction_date"),
+    )
 
 class CrmOpportunity(Base):
     __tablename__ = "crm_opportunities"
@@ -115,6 +200,58 @@ class CrmOpportunity(Base):
     
     # Relationships
     contact = relationship("CrmContact", back_populates="opportunities")
+    
+    __table_args__ = (
+        Index("ix_crm_opportunities_created_at", "created_at", "id"),
+        Index("ix_crm_opportunities_contact_created_at", "contact_id", "created_at", "id"),
+    )
+
+class CrmOpportunityStageChange(Base):
+    """
+    Append-only log of the funnel-relevant state of an opportunity after
+    each write; replayed to rebuild the funnel snapshots
+    """
+    __tablename__ = "crm_opportunity_stage_changes"
+    
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    opportunity_id = Column(UUID(as_uuid=True), ForeignKey("crm_opportunities.id"), nullable=False)
+    changed_at = Column(DateTime(timezone=True), nullable=False)
+    from_stage = Column(Enum(FunnelStage))
+    to_stage = Column(Enum(FunnelStage), nullable=False)
+    estimated_value = Column(Numeric(15, 2))
+    currency = Column(String)
+    probability = Column(Integer)
+    expected_close_date = Column(Date)
+    changed_by = Column(UUID(as_uuid=True), ForeignKey("users.id"))
+    
+    __table_args__ = (
+        Index("ix_crm_opportunity_stage_changes_opportunity", "opportunity_id", "changed_at"),
+        Index("ix_crm_opportunity_stage_changes_changed_at", "changed_at", "id"),
+    )
+
+class CrmFunnelSnapshot(Base):
+    """
+    End-of-day pipeline per stage, expected close month and currency.
+    Days without changes have no rows; the latest earlier day applies.
+    """
+    __tablename__ = "crm_funnel_snapshots"
+    
+    snapshot_date = Column(Date, primary_key=True)
+    stage = Column(Enum(FunnelStage), primary_key=True)
+    close_month = Column(Date, primary_key=True)
+    currency = Column(String, primary_key=True)
+    opportunity_count = Column(Integer, nullable=False, default=0)
+    total_value = Column(Numeric(17, 2), nullable=False, default=0)
+    weighted_value = Column(Numeric(17, 2), nullable=False, default=0)
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
+class CrmFunnelStageEntry(Base):
+    """Opportunities reaching a funnel stage for the first time, per day"""
+    __tablename__ = "crm_funnel_stage_entries"
+    
+    entry_date = Column(Date, primary_key=True)
+    stage = Column(Enum(FunnelStage), primary_key=True)
+    entry_count = Column(Integer, nullable=False, default=0)
 
 class CommercialProposal(Base):
     __tablename__ = "commercial_proposals"
@@ -139,6 +276,7 @@ class CommercialProposal(Base):
     status = Column(Enum(ProposalStatus), default=ProposalStatus.RASCUNHO)
     language = Column(String, default="pt")
     pdf_file_path = Column(String)
+    pdf_content_hash = Column(String(64))
     sent_at = Column(DateTime(timezone=True))
     accepted_at = Column(DateTime(timezone=True))
     notes = Column(Text)
@@ -149,3 +287,21 @@ class CommercialProposal(Base):
     # Relationships
     contact = relationship("CrmContact", back_populates="proposals")
     opportunity = relationship("CrmOpportunity")
+    
+    __table_args__ = (
+        # Proposal lists page newest first by (created_at, id)
+        Index("ix_commercial_proposals_created_at", "created_at", "id"),
+        Index("ix_commercial_proposals_contact_created_at", "contact_id", "created_at", "id"),
+        Index("ix_commercial_proposals_status_created_at", "status", "created_at", "id"),
+        trigram_index("ix_commercial_proposals_product_name_trgm", "product_name"),
+    )
+
+CONTACT_SEARCH_VECTOR = search_vector(
+    CrmContact.company_name, CrmContact.contact_name, CrmContact.city, CrmContact.general_notes
+)
+INTERACTION_SEARCH_VECTOR = search_vector(CrmInteraction.feedback)
+PROPOSAL_SEARCH_VECTOR = search_vector(CommercialProposal.product_name)
+
+Index("ix_crm_contacts_search", CONTACT_SEARCH_VECTOR, postgresql_using="gin").ddl_if(dialect="postgresql")
+Index("ix_crm_interactions_search", INTERACTION_SEARCH_VECTOR, postgresql_using="gin").ddl_if(dialect="postgresql")
+Index("ix_commercial_proposals_search", PROPOSAL_SEARCH_VECTOR, postgresql_using="gin").ddl_if(dialect="postgresql")
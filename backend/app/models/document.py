@@ -0,0 +1,15 @@
+from sqlalchemy import Column, String, DateTime, Integer, BigInteger
+from sqlalchemy.sql import func
+from app.core.database import Base
+
+class StoredBlob(Base):
+    """Content-addressed object shared by every document row with the same bytes"""
+    __tablename__ = "stored_blobs"
+    
+    sha256 = Column(String(64), primary_key=True)
+    object_name = Column(String, nullable=False)
+    size = Column(BigInteger, nullable=False)
+    content_type = Column(String)
+    ref_count = Column(Integer, nullable=False, default=0)
+    orphaned_at = Column(DateTime(timezone=True))
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
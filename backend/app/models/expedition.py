@@ -0,0 +1,223 @@
+from sqlalchemy import DDL, Column, String, DateTime, ForeignKey, Numeric, Date, Text, BigInteger, Index, event
+from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.orm import relationship
+from sqlalchemy.sql import func
+import uuid
+from app.core.database import Base
+
+class Expedition(Base):
+    __tablename__ = "expeditions"
+    
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    expedition_code = Column(String, unique=True, nullable=False)
+    destination = Column(String, nullable=False)
+    transporter = Column(String)
+    vehicle_plate = Column(String)
+    expedition_date = Column(Date, nullable=False, server_default=func.current_date())
+    total_weight_kg = Column(Numeric(10, 2), nullable=False)
+    executed_by = Column(UUID(as_uuid=True), ForeignKey("users.id"))
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    
+    # Relationships
+    items = relationship("ExpeditionItem", back_populates="expedition", cascade="all, delete-orphan")
+
+class ExpeditionItem(Base):
+    __tablename__ = "expedition_items"
+    
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    expedition_id = Column(UUID(as_uuid=True), ForeignKey("expeditions.id", ondelete="CASCADE"), index=True)
+    reception_id = Column(UUID(as_uuid=True), ForeignKey("receptions.id"))
+    consolidated_lot_id = Column(UUID(as_uuid=True), ForeignKey("consolidated_lots.id"), index=True)
+    quantity_kg = Column(Numeric(10, 2), nullable=False)
+    lot_reference = Column(String)
+    
+    # Relationships
+    expedition = relationship("Expedition", back_populates="items")
+
+class ExpeditionDocument(Base):
+    __tablename__ = "expedition_documents"
+    
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    expedition_code = Column(String, nullable=False, index=True)
+    name = Column(String, nullable=False)
+    type = Column(String, nullable=False)
+    file_path = Column(Text, nullable=False)
+    file_size = Column(BigInteger)
+    mime_type = Column(String)
+    blob_sha256 = Column(String(64), ForeignKey("stored_blobs.sha256"), index=True)
+    status = Column(String, nullable=False, default="uploaded")  # pending, uploaded, verified
+    uploaded_by = Column(UUID(as_uuid=True), ForeignKey("users.id"))
+    upload_date = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+
+class LotGenealogy(Base):
+    """
+    Closure of the lot graph: one row per path from a producer's reception
+    to an expedition item, directly or through a consolidated lot. Both
+    traceability directions are a single index range scan.
+    """
+    __tablename__ = "lot_genealogy"
+    
+    expedition_item_id = Column(
+        UUID(as_uuid=True), ForeignKey("expedition_items.id", ondelete="CASCADE"), primary_key=True
+    )
+    reception_id = Column(UUID(as_uuid=True), ForeignKey("receptions.id"), primary_key=True)
+    producer_id = Column(UUID(as_uuid=True), ForeignKey("producers.id"), nullable=False)
+    expedition_id = Column(UUID(as_uuid=True), ForeignKey("expeditions.id", ondelete="CASCADE"), nullable=False)
+    consolidated_lot_id = Column(UUID(as_uuid=True), ForeignKey("consolidated_lots.id"))
+    expedition_date = Column(Date, nullable=False)
+    quantity_kg = Column(Numeric(12, 2), nullable=False)  # share of the item attributed to the reception
+    
+    __table_args__ = (
+        Index("ix_lot_genealogy_producer", "producer_id", "expedition_date", "expedition_id"),
+        Index("ix_lot_genealogy_expedition", "expedition_id", "producer_id"),
+        Index("ix_lot_genealogy_reception", "reception_id"),
+    )
+
+# Expeditions, their items and consolidated lots are also written directly
+# by the frontend, so on PostgreSQL triggers keep lot_genealogy current.
+# The path query mirrors genealogy_service._paths; verify compares the two.
+GENEALOGY_TRIGGER_DDL = [
+    """
+    CREATE OR REPLACE FUNCTION lot_genealogy_index_expedition(target uuid) RETURNS void AS $$
+    BEGIN
+        DELETE FROM lot_genealogy WHERE expedition_id = target;
+        INSERT INTO lot_genealogy (
+            expedition_item_id, reception_id, producer_id, expedition_id,
+            consolidated_lot_id, expedition_date, quantity_kg
+        )
+        SELECT i.id, r.id, r.producer_id, e.id, NULL, e.expedition_date, i.quantity_kg
+        FROM expedition_items i
+        JOIN expeditions e ON e.id = i.expedition_id
+        JOIN receptions r ON r.id = i.reception_id
+        WHERE i.consolidated_lot_id IS NULL AND e.id = target
+        UNION ALL
+        SELECT i.id, r.id, r.producer_id, e.id, l.id, e.expedition_date,
+            coalesce(sum(i.quantity_kg * li.quantity_used_kg / nullif(l.total_quantity_kg, 0)), 0)
+        FROM expedition_items i
+        JOIN expeditions e ON e.id = i.expedition_id
+        JOIN consolidated_lots l ON l.id = i.consolidated_lot_id
+        JOIN consolidated_lot_items li ON li.consolidated_lot_id = l.id
+        JOIN receptions r ON r.id = li.original_reception_id
+        WHERE e.id = target
+        GROUP BY i.id, r.id, r.producer_id, e.id, l.id, e.expedition_date;
+    END;
+    $$ LANGUAGE plpgsql
+    """,
+    """
+    CREATE OR REPLACE FUNCTION lot_genealogy_index_lot(lot uuid) RETURNS void AS $$
+    BEGIN
+        PERFORM lot_genealogy_index_expedition(expedition_id)
+        FROM (SELECT DISTINCT expedition_id FROM expedition_items WHERE consolidated_lot_id = lot) shipped;
+    END;
+    $$ LANGUAGE plpgsql
+    """,
+    # Deleted items and expeditions leave the index through ON DELETE CASCADE
+    """
+    CREATE OR REPLACE FUNCTION lot_genealogy_item_changed() RETURNS trigger AS $$
+    BEGIN
+        IF TG_OP = 'UPDATE' AND OLD.expedition_id IS DISTINCT FROM NEW.expedition_id THEN
+            PERFORM lot_genealogy_index_expedition(OLD.expedition_id);
+        END IF;
+        PERFORM lot_genealogy_index_expedition(NEW.expedition_id);
+        RETURN NULL;
+    END;
+    $$ LANGUAGE plpgsql
+    """,
+    """
+    CREATE OR REPLACE FUNCTION lot_genealogy_lot_item_changed() RETURNS trigger AS $$
+    BEGIN
+        IF TG_OP <> 'INSERT' THEN
+            PERFORM lot_genealogy_index_lot(OLD.consolidated_lot_id);
+        END IF;
+        IF TG_OP = 'INSERT'
+            OR (TG_OP = 'UPDATE' AND OLD.consolidated_lot_id IS DISTINCT FROM NEW.consolidated_lot_id) THEN
+            PERFORM lot_genealogy_index_lot(NEW.consolidated_lot_id);
+        END IF;
+        RETURN NULL;
+    END;
+    $$ LANGUAGE plpgsql
+    """,
+    """
+    CREATE OR REPLACE FUNCTION lot_genealogy_lot_changed() RETURNS trigger AS $$
+    BEGIN
+        PERFORM lot_genealogy_index_lot(NEW.id);
+        RETURN NULL;
+    END;
+    $$ LANGUAGE plpgsql
+    """,
+    """
+    CREATE OR REPLACE FUNCTION lot_genealogy_expedition_changed() RETURNS trigger AS $$
+    BEGIN
+        PERFORM lot_genealogy_index_expedition(NEW.id);
+        RETURN NULL;
+    END;
+    $$ LANGUAGE plpgsql
+    """,
+    """
+    CREATE OR REPLACE FUNCTION lot_genealogy_reception_changed() RETURNS trigger AS $$
+    BEGIN
+        PERFORM lot_genealogy_index_expedition(expedition_id)
+        FROM (
+            SELECT expedition_id FROM expedition_items WHERE reception_id = NEW.id
+            UNION
+            SELECT i.expedition_id FROM expedition_items i
+            JOIN consolidated_lot_items li ON li.consolidated_lot_id = i.consolidated_lot_id
+            WHERE li.original_reception_id = NEW.id
+        ) shipped;
+        RETURN NULL;
+    END;
+    $$ LANGUAGE plpgsql
+    """,
+    "DROP TRIGGER IF EXISTS lot_genealogy_item ON expedition_items",
+    """
+    CREATE TRIGGER lot_genealogy_item
+    AFTER INSERT OR UPDATE OF expedition_id, reception_id, consolidated_lot_id, quantity_kg ON expedition_items
+    FOR EACH ROW EXECUTE FUNCTION lot_genealogy_item_changed()
+    """,
+    "DROP TRIGGER IF EXISTS lot_genealogy_lot_item ON consolidated_lot_items",
+    """
+    CREATE TRIGGER lot_genealogy_lot_item
+    AFTER INSERT OR UPDATE OR DELETE ON consolidated_lot_items
+    FOR EACH ROW EXECUTE FUNCTION lot_genealogy_lot_item_changed()
+    """,
+    "DROP TRIGGER IF EXISTS lot_genealogy_lot ON consolidated_lots",
+    """
+    CREATE TRIGGER lot_genealogy_lot
+    AFTER UPDATE OF total_quantity_kg ON consolidated_lots
+    FOR EACH ROW EXECUTE FUNCTION lot_genealogy_lot_changed()
+    """,
+    "DROP TRIGGER IF EXISTS lot_genealogy_expedition ON expeditions",
+    """
+    CREATE TRIGGER lot_genealogy_expedition
+    AFTER UPDATE OF expedition_date ON expeditions
+    FOR EACH ROW EXECUTE FUNCTION lot_genealogy_expedition_changed()
+    """,
+    "DROP TRIGGER IF EXISTS lot_genealogy_reception ON receptions",
+    """
+    CREATE TRIGGER lot_genealogy_reception
+    AFTER UPDATE OF producer_id ON receptions
+    FOR EACH ROW EXECUTE FUNCTION lot_genealogy_reception_changed()
+    """,
+]
+
+GENEALOGY_TRIGGERS = {
+    "lot_genealogy_item": "expedition_items",
+    "lot_genealogy_lot_item": "consolidated_lot_items",
+    "lot_genealogy_lot": "consolidated_lots",
+    "lot_genealogy_expedition": "expeditions",
+    "lot_genealogy_reception": "receptions",
+}
+GENEALOGY_FUNCTIONS = [
+    "lot_genealogy_reception_changed()", "lot_genealogy_expedition_changed()", "lot_genealogy_lot_changed()",
+    "lot_genealogy_lot_item_changed()", "lot_genealogy_item_changed()", "lot_genealogy_index_lot(uuid)",
+    "lot_genealogy_index_expedition(uuid)",
+]
+
+def _creates_genealogy(ddl, target, bind, tables=None, **kw) -> bool:
+    # Existing databases get the triggers from migration 0007
+    return bind.dialect.name == "postgresql" and any(table.name == "lot_genealogy" for table in tables or ())
+
+for statement in GENEALOGY_TRIGGER_DDL:
+    event.listen(Base.metadata, "after_create", DDL(statement).execute_if(callable_=_creates_genealogy))
+
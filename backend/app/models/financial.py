@@ -1,5 +1,5 @@
 
-from sqlalchemy import Column, String, DateTime, Boolean, ForeignKey, Enum, Numeric, Date, Text
+from sqlalchemy import Column, Computed, String, DateTime, Boolean, ForeignKey, Enum, Numeric, Date, Text, Integer, Index, text
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
@@ -38,6 +38,12 @@ class PaymentMethod(str, enum.Enum):
     PIX = "pix"
     SWIFT = "swift"
 
+class AccStatus(str, enum.Enum):
+    ABERTO = "aberto"
+    LIQUIDADO = "liquidado"
+    VENCIDO = "vencido"
+    CANCELADO = "cancelado"
+
 class AccountType(str, enum.Enum):
     RECEITA = "receita"
     CUSTO = "custo"
@@ -82,6 +88,15 @@ class AccountsPayable(Base):
     created_by = Column(UUID(as_uuid=True), ForeignKey("users.id"))
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+    
+    __table_args__ = (
+        # Keyset pages and due date ranges; open payables get their own smaller index
+        Index("ix_accounts_payable_due_date", "due_date", "id"),
+        Index(
+            "ix_accounts_payable_open_due_date", "due_date", "id",
+            postgresql_where=text("status = 'PREVISTO'"), sqlite_where=text("status = 'PREVISTO'")
+        ),
+    )
 
 class AccountsReceivable(Base):
     __tablename__ = "accounts_receivable"
@@ -128,6 +143,72 @@ class CashFlow(Base):
     created_by = Column(UUID(as_uuid=True), ForeignKey("users.id"))
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+    
+    __table_args__ = (
+        Index("ix_cash_flow_flow_date", "flow_date", "id"),
+        Index("ix_cash_flow_type_flow_date", "flow_type", "flow_date", "id"),
+        Index(
+            "ix_cash_flow_open_flow_date", "flow_date", "id",
+            postgresql_where=text("status = 'PREVISTO'"), sqlite_where=text("status = 'PREVISTO'")
+        ),
+        Index("ix_cash_flow_reference", "reference_id", "reference_type"),
+    )
+
+class CashFlowDailyRollup(Base):
+    __tablename__ = "cash_flow_daily_rollup"
+    
+    flow_date = Column(Date, primary_key=True)
+    currency = Column(Enum(CurrencyCode), primary_key=True)
+    flow_type = Column(Enum(CashFlowType), primary_key=True)
+    status = Column(Enum(TransactionStatus), primary_key=True)
+    total_amount = Column(Numeric(17, 2), nullable=False, default=0)
+    total_amount_brl = Column(Numeric(17, 2), nullable=False, default=0)
+    entry_count = Column(Integer, nullable=False, default=0)
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
+class ExchangeRate(Base):
+    """BRL value of one unit of a currency, effective from rate_date"""
+    __tablename__ = "exchange_rates"
+    
+    currency = Column(Enum(CurrencyCode), primary_key=True)
+    rate_date = Column(Date, primary_key=True)
+    rate = Column(Numeric(12, 6), nullable=False)
+    source = Column(String)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+
+class AccContract(Base):
+    """Advance on an exchange contract (ACC): USD export proceeds sold to a bank ahead of shipment"""
+    __tablename__ = "acc_contracts"
+    
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    contract_number = Column(String, unique=True, nullable=False)
+    bank_name = Column(String, nullable=False)
+    bank_code = Column(String)
+    contract_date = Column(Date, nullable=False)
+    maturity_date = Column(Date, nullable=False)
+    amount_usd = Column(Numeric(15, 2), nullable=False)
+    exchange_rate = Column(Numeric(10, 6), nullable=False)
+    amount_brl = Column(Numeric(15, 2), Computed("amount_usd * exchange_rate", persisted=True))
+    advance_percentage = Column(Numeric(5, 2), nullable=False, default=100)
+    advance_amount_usd = Column(Numeric(15, 2), Computed("amount_usd * advance_percentage / 100", persisted=True))
+    interest_rate = Column(Numeric(8, 4), nullable=False)  # % a year, 360-day basis
+    iof_rate = Column(Numeric(6, 4), nullable=False, default=0.38)  # % of the BRL advance
+    total_cost = Column(Numeric(15, 2))
+    status = Column(Enum(AccStatus), nullable=False, default=AccStatus.ABERTO)
+    expedition_id = Column(UUID(as_uuid=True), ForeignKey("expeditions.id"))
+    producer_id = Column(UUID(as_uuid=True), ForeignKey("producers.id"))
+    liquidation_date = Column(Date)
+    liquidation_rate = Column(Numeric(10, 6))
+    notes = Column(Text)
+    created_by = Column(UUID(as_uuid=True), ForeignKey("users.id"))
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+    
+    __table_args__ = (
+        Index("ix_acc_contracts_maturity_date", "maturity_date"),
+        Index("ix_acc_contracts_status_maturity_date", "status", "maturity_date"),
+    )
 
 class FinancialDocument(Base):
     __tablename__ = "financial_documents"
@@ -139,7 +220,12 @@ class FinancialDocument(Base):
     file_path = Column(String, nullable=False)
     file_size = Column(String)
     mime_type = Column(String)
+    blob_sha256 = Column(String(64), ForeignKey("stored_blobs.sha256"), index=True)
     reference_id = Column(UUID(as_uuid=True), nullable=False)
     reference_type = Column(String, nullable=False)
     uploaded_by = Column(UUID(as_uuid=True), ForeignKey("users.id"))
     uploaded_at = Column(DateTime(timezone=True), server_default=func.now())
+    
+    __table_args__ = (
+        Index("ix_financial_documents_reference", "reference_id", "uploaded_at"),
+    )
@@ -0,0 +1,113 @@
+from sqlalchemy import Column, String, DateTime, Boolean, ForeignKey, Enum, Numeric, Date, Text
+from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.orm import relationship
+from sqlalchemy.sql import func
+import uuid
+import enum
+from app.core.database import Base
+
+class ProductType(str, enum.Enum):
+    TOMATE = "tomate"
+    ALFACE = "alface"
+    PEPINO = "pepino"
+    PIMENTAO = "pimentao"
+    ABACATE_HASS = "abacate_hass"
+    OUTROS = "outros"
+
+class ReceptionStatus(str, enum.Enum):
+    PENDING = "pending"
+    APPROVED = "approved"
+    REJECTED = "rejected"
+
+class Producer(Base):
+    __tablename__ = "producers"
+    
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    name = Column(String, nullable=False)
+    ggn = Column(String, unique=True)
+    certificate_number = Column(String)
+    certificate_expiry = Column(Date, nullable=False)
+    farm_name = Column(String)
+    fruit_varieties = Column(Text)
+    production_volume_tons = Column(Numeric)
+    address = Column(Text)
+    phone = Column(String)
+    email = Column(String)
+    additional_notes = Column(Text)
+    is_active = Column(Boolean, default=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+    
+    # Relationships
+    receptions = relationship("Reception", back_populates="producer")
+
+class Reception(Base):
+    __tablename__ = "receptions"
+    
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    reception_code = Column(String, unique=True, nullable=False)
+    producer_id = Column(UUID(as_uuid=True), ForeignKey("producers.id"), nullable=False)
+    product_type = Column(Enum(ProductType), nullable=False)
+    quantity_kg = Column(Numeric(10, 2), nullable=False)
+    lot_number = Column(String)
+    harvest_date = Column(Date)
+    reception_date = Column(Date, nullable=False, server_default=func.current_date())
+    status = Column(Enum(ReceptionStatus), default=ReceptionStatus.PENDING)
+    notes = Column(Text)
+    received_by = Column(UUID(as_uuid=True), ForeignKey("users.id"))
+    approved_by = Column(UUID(as_uuid=True), ForeignKey("users.id"))
+    approved_at = Column(DateTime(timezone=True))
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+    
+    # Relationships
+    producer = relationship("Producer", back_populates="receptions")
+    labels = relationship("Label", back_populates="reception")
+
+class Label(Base):
+    __tablename__ = "labels"
+    
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    reception_id = Column(UUID(as_uuid=True), ForeignKey("receptions.id"), nullable=False)
+    label_code = Column(String, unique=True, nullable=False)
+    qr_code = Column(Text)
+    printed_at = Column(DateTime(timezone=True))
+    printed_by = Column(UUID(as_uuid=True), ForeignKey("users.id"))
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    
+    # Relationships
+    reception = relationship("Reception", back_populates="labels")
+
+class ConsolidatedLot(Base):
+    __tablename__ = "consolidated_lots"
+    
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    consolidation_code = Column(String, unique=True, nullable=False)
+    product_type = Column(String, nullable=False)
+    total_quantity_kg = Column(Numeric, nullable=False)
+    consolidated_by = Column(UUID(as_uuid=True), ForeignKey("users.id"))
+    consolidation_date = Column(DateTime(timezone=True), server_default=func.now())
+    client_name = Column(String)
+    client_lot_number = Column(String)
+    internal_lot_number = Column(String)
+    status = Column(String, default="active")  # active, shipped, cancelled
+    notes = Column(Text)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    
+    # Relationships
+    items = relationship("ConsolidatedLotItem", back_populates="consolidated_lot")
+
+class ConsolidatedLotItem(Base):
+    __tablename__ = "consolidated_lot_items"
+    
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    consolidated_lot_id = Column(
+        UUID(as_uuid=True), ForeignKey("consolidated_lots.id", ondelete="CASCADE"), nullable=False, index=True
+    )
+    original_reception_id = Column(UUID(as_uuid=True), ForeignKey("receptions.id"), nullable=False)
+    quantity_used_kg = Column(Numeric, nullable=False)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    
+    # Relationships
+    consolidated_lot = relationship("ConsolidatedLot", back_populates="items")
+    reception = relationship("Reception")
@@ -0,0 +1,11 @@
+from sqlalchemy import Column, String, DateTime, BigInteger
+from sqlalchemy.sql import func
+from app.core.database import Base
+
+class NumberSequence(Base):
+    """Named counter from which ranges of numbers are reserved"""
+    __tablename__ = "number_sequences"
+    
+    name = Column(String, primary_key=True)
+    next_value = Column(BigInteger, nullable=False)
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
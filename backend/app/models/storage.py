@@ -0,0 +1,85 @@
+from sqlalchemy import Column, String, DateTime, Boolean, ForeignKey, Enum, Numeric, Text, Integer, Index
+from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.orm import relationship
+from sqlalchemy.sql import func
+import uuid
+import enum
+from app.core.database import Base
+
+# Lot key for movements not tied to a reception
+NO_LOT = uuid.UUID(int=0)
+
+class MovementType(str, enum.Enum):
+    ENTRADA = "entrada"
+    SAIDA = "saida"
+    TRANSFERENCIA = "transferencia"
+    CONSOLIDACAO = "consolidacao"
+
+class StorageArea(Base):
+    __tablename__ = "storage_areas"
+    
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    name = Column(String, nullable=False)
+    area_code = Column(String, unique=True, nullable=False)
+    zone_type = Column(String)  # certified, non_certified, quarantine
+    qr_code = Column(String, unique=True)
+    is_certified = Column(Boolean, default=True)
+    capacity_kg = Column(Numeric(10, 2))
+    current_stock_kg = Column(Numeric(10, 2), default=0)
+    temperature_range_min = Column(Numeric)
+    temperature_range_max = Column(Numeric)
+    is_active = Column(Boolean, default=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+class StockMovement(Base):
+    __tablename__ = "stock_movements"
+    
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    reception_id = Column(UUID(as_uuid=True), ForeignKey("receptions.id"))
+    storage_area_id = Column(UUID(as_uuid=True), ForeignKey("storage_areas.id"))
+    movement_type = Column(Enum(MovementType), nullable=False)
+    quantity_kg = Column(Numeric(10, 2), nullable=False)
+    origin_area_id = Column(UUID(as_uuid=True), ForeignKey("storage_areas.id"))
+    destination_area_id = Column(UUID(as_uuid=True), ForeignKey("storage_areas.id"))
+    movement_date = Column(DateTime(timezone=True), server_default=func.now())
+    executed_by = Column(UUID(as_uuid=True), ForeignKey("users.id"))
+    notes = Column(Text)
+    
+    # Relationships
+    reception = relationship("Reception")
+    storage_area = relationship("StorageArea", foreign_keys=[storage_area_id])
+    
+    __table_args__ = (
+        Index("ix_stock_movements_movement_date", "movement_date"),
+    )
+
+class StockBalanceShard(Base):
+    """
+    Running balance per area and lot, split over STOCK_BALANCE_SHARDS rows
+    so concurrent movements rarely update the same row.
+    """
+    __tablename__ = "stock_balance_shards"
+    
+    storage_area_id = Column(UUID(as_uuid=True), ForeignKey("storage_areas.id"), primary_key=True)
+    reception_id = Column(UUID(as_uuid=True), primary_key=True)  # NO_LOT for movements without a lot
+    shard = Column(Integer, primary_key=True)
+    quantity_kg = Column(Numeric(14, 2), nullable=False, default=0)
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
+class StockSnapshot(Base):
+    __tablename__ = "stock_snapshots"
+    
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    taken_at = Column(DateTime(timezone=True), nullable=False, index=True)  # covers movements up to here
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    
+    # Relationships
+    balances = relationship("StockSnapshotBalance", cascade="all, delete-orphan")
+
+class StockSnapshotBalance(Base):
+    __tablename__ = "stock_snapshot_balances"
+    
+    snapshot_id = Column(UUID(as_uuid=True), ForeignKey("stock_snapshots.id", ondelete="CASCADE"), primary_key=True)
+    storage_area_id = Column(UUID(as_uuid=True), primary_key=True)
+    reception_id = Column(UUID(as_uuid=True), primary_key=True)
+    quantity_kg = Column(Numeric(14, 2), nullable=False)
@@ -1,10 +1,12 @@
 
-from pydantic import BaseModel, EmailStr
-from typing import Optional
+from pydantic import BaseModel, EmailStr, Field
+from typing import List, Optional
 from uuid import UUID
 from datetime import date, datetime
 from decimal import Decimal
-from app.models.crm import ContactStatus, BusinessSegment, InteractionType, ProposalStatus
+from app.models.crm import (
+    ContactEventType, ContactStatus, BusinessSegment, FunnelStage, InteractionType, ProposalStatus
+)
 
 class CrmContactBase(BaseModel):
     company_name: str
@@ -21,15 +23,102 @@ class CrmContactBase(BaseModel):
 class CrmContactCreate(CrmContactBase):
     pass
 
+class ContactPipelineValue(BaseModel):
+    currency: str
+    open_proposal_count: int
+    open_value: Decimal
+    
+    class Config:
+        from_attributes = True
+
 class CrmContactResponse(CrmContactBase):
     id: UUID
     status: ContactStatus
     created_at: datetime
     updated_at: Optional[datetime]
+    last_interaction_at: Optional[datetime] = None
+    next_action_date: Optional[date] = None
+    open_proposal_count: int = 0
+    pipeline: List[ContactPipelineValue] = []  # open proposals per currency
+    
+    class Config:
+        from_attributes = True
+
+class ContactEventResponse(BaseModel):
+    id: UUID
+    contact_id: UUID
+    occurred_at: datetime
+    event_type: ContactEventType
+    reference_id: UUID
+    title: str
+    description: Optional[str]
+    created_by: Optional[UUID]
+    
+    class Config:
+        from_attributes = True
+
+class CrmOpportunityBase(BaseModel):
+    contact_id: UUID
+    title: str
+    description: Optional[str] = None
+    estimated_value: Optional[Decimal] = None
+    currency: str = "BRL"
+    product_interest: Optional[str] = None
+    stage: FunnelStage = FunnelStage.CONTATO_INICIAL
+    probability: int = Field(50, ge=0, le=100)
+    expected_close_date: Optional[date] = None
+
+class CrmOpportunityCreate(CrmOpportunityBase):
+    pass
+
+class CrmOpportunityUpdate(BaseModel):
+    title: Optional[str] = None
+    description: Optional[str] = None
+    estimated_value: Optional[Decimal] = None
+    currency: Optional[str] = None
+    product_interest: Optional[str] = None
+    stage: Optional[FunnelStage] = None
+    probability: Optional[int] = Field(None, ge=0, le=100)
+    expected_close_date: Optional[date] = None
+    lost_reason: Optional[str] = None
+
+class CrmOpportunityResponse(CrmOpportunityBase):
+    id: UUID
+    actual_close_date: Optional[date]
+    lost_reason: Optional[str]
+    assigned_to: Optional[UUID]
+    created_at: datetime
+    updated_at: Optional[datetime]
     
     class Config:
         from_attributes = True
 
+class FunnelStageItem(BaseModel):
+    stage: FunnelStage
+    opportunity_count: int
+    value_brl: Decimal
+    weighted_value_brl: Decimal
+
+class FunnelPipelineMonth(BaseModel):
+    close_month: Optional[date]  # None for opportunities without an expected close date
+    opportunity_count: int
+    value_brl: Decimal
+    weighted_value_brl: Decimal
+
+class FunnelConversion(BaseModel):
+    from_stage: FunnelStage
+    to_stage: FunnelStage
+    entered: int
+    converted: int
+    conversion_rate: Optional[Decimal]
+
+class FunnelResponse(BaseModel):
+    snapshot_date: Optional[date]
+    stages: List[FunnelStageItem]
+    pipeline: List[FunnelPipelineMonth]
+    conversions: List[FunnelConversion]
+    unpriced_currencies: List[str]
+
 class CommercialProposalBase(BaseModel):
     contact_id: UUID
     product_name: str
@@ -44,6 +133,7 @@ class CommercialProposalBase(BaseModel):
     port_of_destination: Optional[str] = None
     payment_terms: Optional[str] = None
     validity_days: int = 30
+    language: str = "pt"
     notes: Optional[str] = None
 
 class CommercialProposalCreate(CommercialProposalBase):
@@ -53,7 +143,6 @@ class CommercialProposalResponse(CommercialProposalBase):
     id: UUID
     proposal_number: str
     status: ProposalStatus
-    language: str
     pdf_file_path: Optional[str]
     expires_at: Optional[datetime]
     created_at: datetime
@@ -80,3 +169,11 @@ class InteractionResponse(InteractionBase):
     
     class Config:
         from_attributes = True
+
+class SearchResult(BaseModel):
+    type: str  # contact, interaction or proposal
+    id: UUID
+    contact_id: UUID
+    title: Optional[str]
+    snippet: Optional[str]
+    score: float
@@ -1,10 +1,10 @@
 
-from pydantic import BaseModel
-from typing import Optional
+from pydantic import BaseModel, Field
+from typing import List, Optional
 from uuid import UUID
 from datetime import date, datetime
 from decimal import Decimal
-from app.models.financial import CurrencyCode, TransactionStatus, CashFlowType, PaymentMethod
+from app.models.financial import AccStatus, CurrencyCode, TransactionStatus, CashFlowType, PaymentMethod
 
 class AccountsPayableBase(BaseModel):
     supplier_name: str
@@ -13,7 +13,7 @@ class AccountsPayableBase(BaseModel):
     due_date: date
     amount: Decimal
     currency: CurrencyCode = CurrencyCode.BRL
-    exchange_rate: Optional[Decimal] = Decimal("1.0")
+    exchange_rate: Optional[Decimal] = None  # contracted rate; defaults to the rate table
     payment_method: Optional[PaymentMethod] = None
     notes: Optional[str] = None
 
@@ -32,6 +32,16 @@ class AccountsPayableResponse(AccountsPayableBase):
     class Config:
         from_attributes = True
 
+class BulkImportRowError(BaseModel):
+    row: int
+    errors: List[str]
+
+class BulkImportResult(BaseModel):
+    received: int
+    inserted: int
+    failed: int
+    errors: List[BulkImportRowError]
+
 class CashFlowBase(BaseModel):
     flow_date: date
     flow_type: CashFlowType
@@ -43,6 +53,7 @@ class CashFlowBase(BaseModel):
 
 class CashFlowCreate(CashFlowBase):
     origin: str
+    exchange_rate: Optional[Decimal] = None  # contracted rate; defaults to the rate table
 
 class CashFlowResponse(CashFlowBase):
     id: UUID
@@ -60,3 +71,93 @@ class CashFlowProjectionItem(BaseModel):
     total_outflow: Decimal
     net_flow: Decimal
     accumulated_balance: Decimal
+
+class ExchangeRateBase(BaseModel):
+    currency: CurrencyCode
+    rate_date: date
+    rate: Decimal = Field(..., gt=0)
+
+class ExchangeRateCreate(ExchangeRateBase):
+    source: Optional[str] = None
+
+class ExchangeRateResponse(ExchangeRateCreate):
+    class Config:
+        from_attributes = True
+
+class AccContractBase(BaseModel):
+    contract_number: str
+    bank_name: str
+    bank_code: Optional[str] = None
+    contract_date: date
+    maturity_date: date
+    amount_usd: Decimal = Field(..., gt=0)
+    exchange_rate: Optional[Decimal] = Field(None, gt=0)  # contracted rate; defaults to the rate table
+    advance_percentage: Decimal = Field(Decimal("100"), gt=0, le=100)
+    interest_rate: Decimal = Field(..., ge=0)
+    iof_rate: Decimal = Field(Decimal("0.38"), ge=0)
+    expedition_id: Optional[UUID] = None
+    producer_id: Optional[UUID] = None
+    notes: Optional[str] = None
+
+class AccContractCreate(AccContractBase):
+    pass
+
+class AccContractLiquidate(BaseModel):
+    liquidation_date: date
+    liquidation_rate: Optional[Decimal] = Field(None, gt=0)  # defaults to the rate table
+
+class AccContractResponse(AccContractBase):
+    id: UUID
+    exchange_rate: Decimal
+    amount_brl: Optional[Decimal]
+    advance_amount_usd: Optional[Decimal]
+    total_cost: Optional[Decimal]
+    status: AccStatus
+    liquidation_date: Optional[date]
+    liquidation_rate: Optional[Decimal]
+    created_at: datetime
+    
+    class Config:
+        from_attributes = True
+
+class AccValuationItem(BaseModel):
+    id: UUID
+    contract_number: str
+    bank_name: str
+    status: AccStatus
+    maturity_date: date
+    days_to_maturity: int
+    advance_amount_usd: Decimal
+    accrued_interest_usd: Decimal
+    accrued_interest_brl: Decimal
+    interest_at_maturity_usd: Decimal
+    iof_brl: Decimal
+    total_cost_brl: Decimal
+    liquidation_amount_usd: Decimal
+    liquidation_amount_brl: Decimal
+    fx_result_brl: Decimal
+    net_result_brl: Decimal
+
+class AccExposureBucket(BaseModel):
+    bucket_start: date
+    contracts: int
+    principal_usd: Decimal
+    interest_usd: Decimal
+    total_usd: Decimal
+    total_brl: Decimal
+
+class FinancialDocumentResponse(BaseModel):
+    id: UUID
+    document_type: str
+    document_number: Optional[str]
+    file_name: str
+    file_path: str
+    file_size: Optional[int]
+    mime_type: Optional[str]
+    blob_sha256: Optional[str]
+    reference_id: UUID
+    reference_type: str
+    uploaded_at: datetime
+    
+    class Config:
+        from_attributes = True
@@ -0,0 +1,20 @@
+from pydantic import BaseModel, Field
+from typing import Optional
+from uuid import UUID
+
+MAX_LABEL_BATCH = 20000
+
+class LabelBatchCreate(BaseModel):
+    reception_id: UUID
+    count: int = Field(..., gt=0, le=MAX_LABEL_BATCH)
+
+class LabelBatchResponse(BaseModel):
+    reception_id: UUID
+    count: int
+    first_label_code: str
+    last_label_code: str
+
+class LabelPrintRequest(BaseModel):
+    reception_id: UUID
+    first_label_code: Optional[str] = None
+    last_label_code: Optional[str] = None
@@ -0,0 +1,41 @@
+from pydantic import BaseModel, Field
+from typing import Optional
+from uuid import UUID
+from datetime import datetime
+from decimal import Decimal
+from app.models.storage import MovementType
+
+class StockMovementCreate(BaseModel):
+    movement_type: MovementType
+    quantity_kg: Decimal = Field(..., gt=0)
+    reception_id: Optional[UUID] = None
+    storage_area_id: Optional[UUID] = None
+    origin_area_id: Optional[UUID] = None
+    destination_area_id: Optional[UUID] = None
+    movement_date: Optional[datetime] = None
+    notes: Optional[str] = None
+
+class StockMovementResponse(StockMovementCreate):
+    id: UUID
+    movement_date: Optional[datetime]
+    executed_by: Optional[UUID]
+    
+    class Config:
+        from_attributes = True
+
+class StockBalance(BaseModel):
+    storage_area_id: UUID
+    reception_id: Optional[UUID]
+    quantity_kg: Decimal
+
+class AreaPosition(BaseModel):
+    storage_area_id: UUID
+    quantity_kg: Decimal
+    as_of: Optional[datetime]
+
+class StockSnapshotResponse(BaseModel):
+    id: UUID
+    taken_at: datetime
+    
+    class Config:
+        from_attributes = True
@@ -0,0 +1,17 @@
+from pydantic import BaseModel, Field
+from typing import List, Optional
+from datetime import datetime
+
+MAX_PRESIGNED_BATCH = 500
+
+class ObjectRef(BaseModel):
+    bucket: str
+    object_name: str
+
+class PresignedUrlRequest(BaseModel):
+    objects: List[ObjectRef] = Field(..., max_length=MAX_PRESIGNED_BATCH)
+    expires_in_seconds: Optional[int] = Field(None, ge=60, le=7 * 24 * 3600)
+
+class PresignedUrl(ObjectRef):
+    url: str
+    expires_at: datetime
@@ -0,0 +1,42 @@
+from pydantic import BaseModel
+from typing import Optional
+from uuid import UUID
+from datetime import date, datetime
+from decimal import Decimal
+
+class ProducerExpedition(BaseModel):
+    expedition_id: UUID
+    expedition_code: str
+    expedition_date: date
+    destination: str
+    reception_count: int
+    quantity_kg: Decimal
+    
+    class Config:
+        from_attributes = True
+
+class ExpeditionProducer(BaseModel):
+    producer_id: UUID
+    name: str
+    ggn: Optional[str]
+    certificate_number: Optional[str]
+    reception_count: int
+    quantity_kg: Decimal
+    
+    class Config:
+        from_attributes = True
+
+class ExpeditionDocumentResponse(BaseModel):
+    id: UUID
+    expedition_code: str
+    name: str
+    type: str
+    file_path: str
+    file_size: Optional[int]
+    mime_type: Optional[str]
+    blob_sha256: Optional[str]
+    status: str
+    upload_date: datetime
+    
+    class Config:
+        from_attributes = True
@@ -0,0 +1,166 @@
+from collections import defaultdict
+from datetime import date, timedelta
+from decimal import ROUND_HALF_UP, Decimal
+from typing import Dict, Iterable, List, Optional
+from sqlalchemy import select, update
+from sqlalchemy.orm import Session
+from app.models.financial import AccContract, AccStatus, CurrencyCode
+from app.services.fx_service import CENT, get_rate, to_brl
+
+ZERO = Decimal("0")
+HUNDRED = Decimal("100")
+# Rates are % a year over a 360-day year
+RATE_DAYS = HUNDRED * Decimal("360")
+
+# Contracts still owed to the bank
+OPEN_STATUSES = (AccStatus.ABERTO, AccStatus.VENCIDO)
+
+LADDER_BUCKETS = ("week", "month", "quarter")
+
+# Only the columns valuation reads, fetched as plain rows rather than ORM objects
+BOOK_COLUMNS = (
+    AccContract.id, AccContract.contract_number, AccContract.bank_name, AccContract.status,
+    AccContract.contract_date, AccContract.maturity_date, AccContract.advance_amount_usd,
+    AccContract.exchange_rate, AccContract.interest_rate, AccContract.iof_rate
+)
+
+def _usd(value: Decimal) -> Decimal:
+    return value.quantize(CENT, rounding=ROUND_HALF_UP)
+
+def open_book(db: Session, maturing_by: Optional[date] = None) -> list:
+    """Open contracts in maturity order, optionally only those maturing by a date"""
+    stmt = select(*BOOK_COLUMNS).where(AccContract.status.in_(OPEN_STATUSES))
+    if maturing_by:
+        stmt = stmt.where(AccContract.maturity_date <= maturing_by)
+    return db.execute(stmt.order_by(AccContract.maturity_date, AccContract.id)).all()
+
+def value_contracts(rows: Iterable, as_of: date, spot: Decimal, settle: bool = False) -> List[dict]:
+    """
+    Interest, IOF and liquidation P&L of many contracts against one USD
+    rate, in a single pass with no queries. Interest is simple, on the
+    advanced USD amount at interest_rate % a year over 360 days, accrued
+    up to as_of and paid in full at maturity. With settle, the contracts
+    are liquidated on as_of and owe only the interest accrued so far.
+    IOF is charged once on the BRL advance. The P&L compares the BRL
+    received at the contract rate with what the same USD would fetch at
+    spot, less interest and IOF.
+    """
+    valuations = []
+    for row in rows:
+        advance = Decimal(row.advance_amount_usd or 0)
+        contract_rate = Decimal(row.exchange_rate)
+        interest_base = advance * Decimal(row.interest_rate)
+        
+        term_days = (row.maturity_date - row.contract_date).days
+        accrued_days = max(0, (min(as_of, row.maturity_date) - row.contract_date).days)
+        accrued_interest_usd = _usd(interest_base * accrued_days / RATE_DAYS)
+        interest_usd = _usd(interest_base * term_days / RATE_DAYS)
+        owed_interest_usd = accrued_interest_usd if settle else interest_usd
+        
+        iof_brl = to_brl(advance * contract_rate, Decimal(row.iof_rate) / HUNDRED)
+        interest_brl = to_brl(owed_interest_usd, spot)
+        fx_result_brl = to_brl(advance, contract_rate - spot)
+        
+        valuations.append({
+            "id": row.id,
+            "contract_number": row.contract_number,
+            "bank_name": row.bank_name,
+            "status": row.status,
+            "maturity_date": row.maturity_date,
+            "days_to_maturity": (row.maturity_date - as_of).days,
+            "advance_amount_usd": advance,
+            "accrued_interest_usd": accrued_interest_usd,
+            "accrued_interest_brl": to_brl(accrued_interest_usd, spot),
+            "interest_at_maturity_usd": interest_usd,
+            "iof_brl": iof_brl,
+            "total_cost_brl": interest_brl + iof_brl,
+            "liquidation_amount_usd": advance + owed_interest_usd,
+            "liquidation_amount_brl": to_brl(advance + owed_interest_usd, spot),
+            "fx_result_brl": fx_result_brl,
+            "net_result_brl": fx_result_brl - interest_brl - iof_brl
+        })
+    return valuations
+
+def value_open_book(db: Session, as_of: date, rate_date: Optional[date] = None) -> List[dict]:
+    """Valuation of every open contract: one query for the book, one rate lookup"""
+    rows = open_book(db)
+    if not rows:
+        return []
+    spot = get_rate(db, CurrencyCode.USD, rate_date or as_of)
+    return value_contracts(rows, as_of, spot)
+
+def refresh_open_book(db: Session, as_of: date) -> int:
+    """
+    Store the current total cost of every open contract with one batched
+    UPDATE and move contracts past maturity to VENCIDO. Cheap enough to
+    run on every USD rate change; the caller commits.
+    """
+    valuations = value_open_book(db, as_of)
+    if valuations:
+        db.execute(update(AccContract), [
+            {"id": item["id"], "total_cost": item["total_cost_brl"]} for item in valuations
+        ])
+    db.execute(
+        update(AccContract)
+        .where(AccContract.status == AccStatus.ABERTO, AccContract.maturity_date < as_of)
+        .values(status=AccStatus.VENCIDO)
+    )
+    return len(valuations)
+
+def bucket_start(on_date: date, bucket: str) -> date:
+    if bucket == "week":
+        return on_date - timedelta(days=on_date.weekday())
+    if bucket == "quarter":
+        return on_date.replace(month=(on_date.month - 1) // 3 * 3 + 1, day=1)
+    return on_date.replace(day=1)
+
+def exposure_ladder(valuations: List[dict], as_of: date, bucket: str = "month") -> List[dict]:
+    """
+    USD owed to the banks per maturity bucket. Overdue contracts are due
+    now, so they fall into the bucket holding as_of.
+    """
+    ladder: Dict[date, dict] = defaultdict(lambda: {
+        "contracts": 0, "principal_usd": ZERO, "interest_usd": ZERO,
+        "total_usd": ZERO, "total_brl": ZERO
+    })
+    for item in valuations:
+        entry = ladder[bucket_start(max(item["maturity_date"], as_of), bucket)]
+        entry["contracts"] += 1
+        entry["principal_usd"] += item["advance_amount_usd"]
+        entry["interest_usd"] += item["interest_at_maturity_usd"]
+        entry["total_usd"] += item["liquidation_amount_usd"]
+        entry["total_brl"] += item["liquidation_amount_brl"]
+    return [{"bucket_start": start, **ladder[start]} for start in sorted(ladder)]
+
+def get_acc_outflows(db: Session, start_date: date, end_date: date, rate_date: date) -> Dict[date, Decimal]:
+    """
+    BRL needed on each day of a window to liquidate open contracts, at
+    rate_date's USD rate. Contracts maturing before the window are due
+    on its first day.
+    """
+    rows = open_book(db, maturing_by=end_date)
+    if not rows:
+        return {}
+    spot = get_rate(db, CurrencyCode.USD, rate_date)
+    
+    outflows = defaultdict(Decimal)
+    for item in value_contracts(rows, start_date, spot):
+        outflows[max(item["maturity_date"], start_date)] += item["liquidation_amount_brl"]
+    return outflows
+
+if __name__ == "__main__":
+    import argparse
+    from app.core.database import SessionLocal
+    
+    parser = argparse.ArgumentParser(description="Revalue the open ACC book")
+    parser.add_argument("command", choices=["refresh"])
+    parser.add_argument("--as-of", type=date.fromisoformat, default=date.today())
+    args = parser.parse_args()
+    
+    db = SessionLocal()
+    try:
+        count = refresh_open_book(db, args.as_of)
+        db.commit()
+        print(f"Revalued {count} open contracts")
+    finally:
+        db.close()
@@ -0,0 +1,181 @@
+import csv
+import io
+import uuid
+from collections import defaultdict
+from decimal import Decimal
+from typing import IO, Iterable, List, Optional
+from pydantic import ValidationError
+from sqlalchemy import insert
+from sqlalchemy.orm import Session
+from app.models.financial import (
+    AccountsPayable, CashFlow, CashFlowOrigin, CashFlowType, CurrencyCode, TransactionStatus
+)
+from app.schemas.financial import AccountsPayableCreate, BulkImportResult, BulkImportRowError
+from app.services.cash_flow_service import upsert_rollup_rows
+from app.services.fx_service import get_rates, to_brl
+
+BULK_BATCH_SIZE = 1000
+MAX_REPORTED_ERRORS = 1000
+
+def payable_amount_brl(amount: Decimal, exchange_rate: Optional[Decimal]) -> Decimal:
+    return to_brl(amount, exchange_rate or Decimal("1.0"))
+
+def payable_rate_key(payable_data: AccountsPayableCreate):
+    """Rate used when a payable carries no contracted exchange_rate"""
+    return (payable_data.currency or CurrencyCode.BRL, payable_data.due_date)
+
+def payable_cash_flow_values(
+    payable_id,
+    payable_data: AccountsPayableCreate,
+    exchange_rate: Decimal,
+    amount_brl: Decimal,
+    created_by
+) -> dict:
+    """Column values of the cash flow entry mirroring a payable"""
+    return {
+        "flow_date": payable_data.due_date,
+        "flow_type": CashFlowType.SAIDA,
+        "origin": CashFlowOrigin.OUTROS,
+        "amount": payable_data.amount,
+        "currency": payable_data.currency,
+        "exchange_rate": exchange_rate,
+        "amount_brl": amount_brl,
+        "description": f"Pagamento para {payable_data.supplier_name}",
+        "reference_id": payable_id,
+        "reference_type": "accounts_payable",
+        "created_by": created_by
+    }
+
+def _clean_row(row: dict) -> dict:
+    # CSV cells arrive as strings; blank cells mean "not provided"
+    return {key: value for key, value in row.items() if key and value not in ("", None)}
+
+def _format_errors(error: ValidationError) -> List[str]:
+    return [
+        f"{'.'.join(str(part) for part in item['loc'])}: {item['msg']}"
+        for item in error.errors()
+    ]
+
+class PayableBulkImporter:
+    """
+    Validates payable rows in batches and inserts them with their cash
+    flow mirrors as multi-row INSERTs inside the caller's transaction.
+    """
+    def __init__(self, db: Session, created_by, atomic: bool = False, batch_size: int = BULK_BATCH_SIZE):
+        self.db = db
+        self.created_by = created_by
+        self.atomic = atomic
+        self.batch_size = batch_size
+        self.received = 0
+        self.inserted = 0
+        self.failed = 0
+        self.errors: List[BulkImportRowError] = []
+        self._pending = []
+    
+    def add_rows(self, rows: Iterable[dict]):
+        for row in rows:
+            self.received += 1
+            try:
+                self._pending.append((self.received, AccountsPayableCreate.model_validate(_clean_row(row))))
+            except ValidationError as e:
+                self._fail(self.received, _format_errors(e))
+            
+            if len(self._pending) >= self.batch_size:
+                self._flush()
+    
+    def _fail(self, row: int, errors: List[str]):
+        self.failed += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append(BulkImportRowError(row=row, errors=errors))
+    
+    def _flush(self):
+        # Rates for rows without a contracted one, resolved for the whole batch at once
+        rates = get_rates(self.db, [
+            payable_rate_key(payable_data) for _, payable_data in self._pending
+            if payable_data.exchange_rate is None
+        ], strict=False)
+        
+        resolved = []
+        for row, payable_data in self._pending:
+            exchange_rate = payable_data.exchange_rate
+            if exchange_rate is None:
+                currency, on_date = payable_rate_key(payable_data)
+                exchange_rate = rates.get((currency, on_date))
+                if exchange_rate is None:
+                    self._fail(row, [f"exchange_rate: no {currency.value} rate on or before {on_date.isoformat()}"])
+                    continue
+            resolved.append((payable_data, exchange_rate))
+        
+        # In atomic mode nothing is written once any row has failed
+        if not resolved or (self.atomic and self.failed):
+            self._pending = []
+            return
+        
+        payable_rows = []
+        cash_flow_rows = []
+        rollup = defaultdict(lambda: [Decimal("0"), Decimal("0"), 0])
+        
+        for payable_data, exchange_rate in resolved:
+            payable_id = uuid.uuid4()
+            amount_brl = payable_amount_brl(payable_data.amount, exchange_rate)
+            payable_rows.append({
+                **payable_data.model_dump(),
+                "id": payable_id,
+                "exchange_rate": exchange_rate,
+                "amount_brl": amount_brl,
+                "status": TransactionStatus.PREVISTO,
+                "created_by": self.created_by
+            })
+            cash_flow_rows.append({
+                "id": uuid.uuid4(),
+                "status": TransactionStatus.PREVISTO,
+                **payable_cash_flow_values(payable_id, payable_data, exchange_rate, amount_brl, self.created_by)
+            })
+            
+            bucket = rollup[(payable_data.due_date, payable_data.currency or CurrencyCode.BRL)]
+            bucket[0] += payable_data.amount
+            bucket[1] += amount_brl
+            bucket[2] += 1
+        
+        self.db.execute(insert(AccountsPayable), payable_rows)
+        self.db.execute(insert(CashFlow), cash_flow_rows)
+        upsert_rollup_rows(self.db, [
+            {
+                "flow_date": flow_date,
+                "currency": currency,
+                "flow_type": CashFlowType.SAIDA,
+                "status": TransactionStatus.PREVISTO,
+                "total_amount": total_amount,
+                "total_amount_brl": total_amount_brl,
+                "entry_count": entry_count
+            }
+            for (flow_date, currency), (total_amount, total_amount_brl, entry_count) in rollup.items()
+        ])
+        
+        self.inserted += len(payable_rows)
+        self._pending = []
+    
+    def finish(self) -> BulkImportResult:
+        self._flush()
+        if self.atomic and self.failed:
+            self.db.rollback()
+            self.inserted = 0
+        else:
+            self.db.commit()
+        
+        return BulkImportResult(
+            received=self.received,
+            inserted=self.inserted,
+            failed=self.failed,
+            errors=self.errors
+        )
+
+def import_payable_rows(db: Session, rows: Iterable[dict], created_by, atomic: bool = False) -> BulkImportResult:
+    importer = PayableBulkImporter(db, created_by, atomic=atomic)
+    importer.add_rows(rows)
+    return importer.finish()
+
+def import_payable_csv(db: Session, file: IO[bytes], created_by, atomic: bool = False) -> BulkImportResult:
+    """Import a CSV with a header row named after AccountsPayableCreate fields"""
+    reader = csv.DictReader(io.TextIOWrapper(file, encoding="utf-8-sig", newline=""))
+    return import_payable_rows(db, reader, created_by, atomic=atomic)
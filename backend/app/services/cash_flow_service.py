@@ -0,0 +1,252 @@
+from collections import defaultdict
+from datetime import date, timedelta
+from decimal import Decimal
+from typing import List, Optional
+from sqlalchemy import case, func, insert, select
+from sqlalchemy.orm import Session
+from app.core.database import dialect_insert
+from app.models.financial import (
+    CashFlow, CashFlowDailyRollup, CashFlowType, CurrencyCode, TransactionStatus
+)
+from app.schemas.financial import CashFlowProjectionItem
+from app.services.acc_service import get_acc_outflows
+from app.services.fx_service import get_rates, to_brl
+
+ZERO = Decimal("0.0")
+
+ROLLUP_KEY = ["flow_date", "currency", "flow_type", "status"]
+
+def rollup_delta(flow: CashFlow, sign: int = 1) -> dict:
+    """Rollup row increment contributed by a single cash flow"""
+    return {
+        "flow_date": flow.flow_date,
+        "currency": flow.currency or CurrencyCode.BRL,
+        "flow_type": flow.flow_type,
+        "status": flow.status or TransactionStatus.PREVISTO,
+        "total_amount": sign * (flow.amount or ZERO),
+        "total_amount_brl": sign * (flow.amount_brl or ZERO),
+        "entry_count": sign
+    }
+
+def upsert_rollup_rows(db: Session, rows: List[dict]):
+    """Add deltas to the rollup, creating missing day buckets atomically"""
+    if not rows:
+        return
+    
+    stmt = dialect_insert(db)(CashFlowDailyRollup)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=ROLLUP_KEY,
+        set_={
+            "total_amount": CashFlowDailyRollup.total_amount + stmt.excluded.total_amount,
+            "total_amount_brl": CashFlowDailyRollup.total_amount_brl + stmt.excluded.total_amount_brl,
+            "entry_count": CashFlowDailyRollup.entry_count + stmt.excluded.entry_count,
+            "updated_at": func.now()
+        }
+    )
+    db.execute(stmt, rows)
+
+def apply_cash_flow_to_rollup(db: Session, *flows: CashFlow, sign: int = 1):
+    """Record cash flows in the rollup within the caller's transaction"""
+    upsert_rollup_rows(db, [rollup_delta(flow, sign) for flow in flows])
+
+def update_cash_flow_status(db: Session, flow: CashFlow, status: TransactionStatus):
+    """Move a cash flow to another status bucket in the rollup"""
+    if flow.status == status:
+        return
+    
+    apply_cash_flow_to_rollup(db, flow, sign=-1)
+    flow.status = status
+    apply_cash_flow_to_rollup(db, flow)
+
+def delete_cash_flow(db: Session, flow: CashFlow):
+    """Delete a cash flow and remove it from the rollup"""
+    apply_cash_flow_to_rollup(db, flow, sign=-1)
+    db.delete(flow)
+
+def _base_aggregate():
+    """Rollup rows recomputed from the cash_flow base table"""
+    return select(
+        CashFlow.flow_date,
+        func.coalesce(CashFlow.currency, CurrencyCode.BRL),
+        CashFlow.flow_type,
+        func.coalesce(CashFlow.status, TransactionStatus.PREVISTO),
+        func.coalesce(func.sum(CashFlow.amount), 0),
+        func.coalesce(func.sum(CashFlow.amount_brl), 0),
+        func.count(CashFlow.id)
+    ).group_by(
+        CashFlow.flow_date,
+        func.coalesce(CashFlow.currency, CurrencyCode.BRL),
+        CashFlow.flow_type,
+        func.coalesce(CashFlow.status, TransactionStatus.PREVISTO)
+    )
+
+def rebuild_rollup(db: Session) -> int:
+    """Recompute the whole rollup from cash_flow in one statement"""
+    db.query(CashFlowDailyRollup).delete()
+    db.execute(insert(CashFlowDailyRollup).from_select(
+        ROLLUP_KEY + ["total_amount", "total_amount_brl", "entry_count"],
+        _base_aggregate()
+    ))
+    db.commit()
+    return db.query(CashFlowDailyRollup).count()
+
+def verify_rollup(db: Session) -> List[dict]:
+    """Compare the rollup against cash_flow and return mismatching buckets"""
+    expected = {
+        tuple(row[:4]): (Decimal(row[4]), Decimal(row[5]), row[6])
+        for row in db.execute(_base_aggregate())
+    }
+    actual = {
+        (row.flow_date, row.currency, row.flow_type, row.status):
+            (row.total_amount, row.total_amount_brl, row.entry_count)
+        for row in db.query(CashFlowDailyRollup).filter(CashFlowDailyRollup.entry_count != 0)
+    }
+    
+    mismatches = []
+    for key in sorted(set(expected) | set(actual), key=lambda k: (k[0], str(k[1:]))):
+        if expected.get(key) != actual.get(key):
+            mismatches.append({
+                "key": dict(zip(ROLLUP_KEY, key)),
+                "expected": expected.get(key),
+                "actual": actual.get(key)
+            })
+    return mismatches
+
+def get_opening_balance(db: Session, before_date: date) -> Decimal:
+    """Net BRL balance of realized flows dated before the given date"""
+    signed_amount = case(
+        (CashFlowDailyRollup.flow_type == CashFlowType.ENTRADA, CashFlowDailyRollup.total_amount_brl),
+        else_=-CashFlowDailyRollup.total_amount_brl
+    )
+    balance = db.query(func.coalesce(func.sum(signed_amount), 0)).filter(
+        CashFlowDailyRollup.flow_date < before_date,
+        CashFlowDailyRollup.status == TransactionStatus.REALIZADO
+    ).scalar()
+    return Decimal(balance or 0)
+
+def get_daily_totals(db: Session, start_date: date, end_date: date):
+    """Sum BRL totals by date and flow type from the daily rollup"""
+    rows = db.query(
+        CashFlowDailyRollup.flow_date,
+        CashFlowDailyRollup.flow_type,
+        func.sum(CashFlowDailyRollup.total_amount_brl)
+    ).filter(
+        CashFlowDailyRollup.flow_date >= start_date,
+        CashFlowDailyRollup.flow_date <= end_date,
+        CashFlowDailyRollup.status != TransactionStatus.CANCELADO
+    ).group_by(CashFlowDailyRollup.flow_date, CashFlowDailyRollup.flow_type).all()
+    
+    inflows = {}
+    outflows = {}
+    for flow_date, flow_type, total in rows:
+        target = inflows if flow_type == CashFlowType.ENTRADA else outflows
+        target[flow_date] = Decimal(total or 0)
+    return inflows, outflows
+
+def get_revalued_daily_totals(db: Session, start_date: date, end_date: date, rate_date: date):
+    """
+    Daily totals with every currency converted at its rate on rate_date
+    instead of the booked amount_brl. Rollup totals are summed per currency
+    in SQL, so one rate lookup per currency revalues any number of flows.
+    """
+    rows = db.query(
+        CashFlowDailyRollup.flow_date,
+        CashFlowDailyRollup.flow_type,
+        CashFlowDailyRollup.currency,
+        func.sum(CashFlowDailyRollup.total_amount)
+    ).filter(
+        CashFlowDailyRollup.flow_date >= start_date,
+        CashFlowDailyRollup.flow_date <= end_date,
+        CashFlowDailyRollup.status != TransactionStatus.CANCELADO
+    ).group_by(
+        CashFlowDailyRollup.flow_date, CashFlowDailyRollup.flow_type, CashFlowDailyRollup.currency
+    ).all()
+    
+    rates = get_rates(db, {(currency, rate_date) for _, _, currency, _ in rows})
+    
+    inflows = defaultdict(Decimal)
+    outflows = defaultdict(Decimal)
+    for flow_date, flow_type, currency, total in rows:
+        target = inflows if flow_type == CashFlowType.ENTRADA else outflows
+        target[flow_date] += to_brl(Decimal(total or 0), rates[(currency, rate_date)])
+    return inflows, outflows
+
+def build_projection(
+    start_date: date,
+    days_ahead: int,
+    inflows: dict,
+    outflows: dict,
+    opening_balance: Decimal = ZERO
+) -> List[CashFlowProjectionItem]:
+    """Fill gaps and accumulate the running balance in a single pass"""
+    projection_data = []
+    accumulated_balance = opening_balance
+    
+    for i in range(days_ahead):
+        current_date = start_date + timedelta(days=i)
+        total_inflow = inflows.get(current_date, ZERO)
+        total_outflow = outflows.get(current_date, ZERO)
+        net_flow = total_inflow - total_outflow
+        accumulated_balance += net_flow
+        
+        projection_data.append(CashFlowProjectionItem(
+            projection_date=current_date.isoformat(),
+            total_inflow=total_inflow,
+            total_outflow=total_outflow,
+            net_flow=net_flow,
+            accumulated_balance=accumulated_balance
+        ))
+    
+    return projection_data
+
+def project_cash_flow(
+    db: Session,
+    start_date: date,
+    days_ahead: int,
+    include_opening_balance: bool = True,
+    revalue_at: Optional[date] = None,
+    acc_rate_date: Optional[date] = None
+) -> List[CashFlowProjectionItem]:
+    """
+    Project daily cash flow for the window starting at start_date; with
+    revalue_at, flows in the window are converted at that date's rates.
+    With acc_rate_date, liquidations of open ACC contracts are added as
+    outflows at that date's USD rate. The opening balance always uses
+    booked amounts.
+    """
+    if days_ahead <= 0:
+        return []
+    
+    end_date = start_date + timedelta(days=days_ahead - 1)
+    if revalue_at:
+        inflows, outflows = get_revalued_daily_totals(db, start_date, end_date, revalue_at)
+    else:
+        inflows, outflows = get_daily_totals(db, start_date, end_date)
+    if acc_rate_date:
+        for flow_date, amount in get_acc_outflows(db, start_date, end_date, acc_rate_date).items():
+            outflows[flow_date] = outflows.get(flow_date, ZERO) + amount
+    opening_balance = get_opening_balance(db, start_date) if include_opening_balance else ZERO
+    
+    return build_projection(start_date, days_ahead, inflows, outflows, opening_balance)
+
+if __name__ == "__main__":
+    import argparse
+    import sys
+    from app.core.database import SessionLocal
+    
+    parser = argparse.ArgumentParser(description="Maintain the cash flow daily rollup")
+    parser.add_argument("command", choices=["rebuild", "verify"])
+    args = parser.parse_args()
+    
+    db = SessionLocal()
+    try:
+        if args.command == "rebuild":
+            print(f"Rollup rebuilt with {rebuild_rollup(db)} buckets")
+        else:
+            mismatches = verify_rollup(db)
+            for mismatch in mismatches:
+                print(mismatch)
+            print(f"{len(mismatches)} mismatching buckets")
+            sys.exit(1 if mismatches else 0)
+    finally:
+        db.close()
@@ -0,0 +1,270 @@
+from collections import defaultdict
+from datetime import datetime
+from decimal import Decimal
+from typing import Dict, List, Optional, Tuple
+from sqlalchemy import delete, insert, or_, select, update
+from sqlalchemy.orm import Session
+from app.core.database import dialect_insert
+from app.models.crm import (
+    CommercialProposal, ContactEventType, CrmContact, CrmContactEvent, CrmContactPipeline,
+    CrmInteraction, InteractionType, ProposalStatus
+)
+
+ZERO = Decimal("0")
+
+# Proposals that still count towards a contact's pipeline
+OPEN_PROPOSAL_STATUSES = (ProposalStatus.RASCUNHO, ProposalStatus.ENVIADA)
+
+BATCH_SIZE = 1000
+
+# (last interaction, its next action date, open proposals, {currency: [count, value]})
+Summary = Tuple[Optional[datetime], Optional[object], int, Dict[str, list]]
+
+def proposal_status(proposal) -> ProposalStatus:
+    """Status with the column default applied"""
+    return ProposalStatus(proposal.status or ProposalStatus.RASCUNHO)
+
+def _interaction_event(interaction, created_by=None) -> dict:
+    return {
+        "contact_id": interaction.contact_id,
+        "occurred_at": interaction.interaction_date,
+        "event_type": ContactEventType.INTERACAO,
+        "reference_id": interaction.id,
+        "title": InteractionType(interaction.interaction_type).value,
+        "description": interaction.feedback,
+        "created_by": created_by
+    }
+
+def _proposal_event(
+    proposal, event_type: ContactEventType, status: ProposalStatus, occurred_at: datetime, created_by=None
+) -> dict:
+    return {
+        "contact_id": proposal.contact_id,
+        "occurred_at": occurred_at,
+        "event_type": event_type,
+        "reference_id": proposal.id,
+        "title": f"{proposal.proposal_number} {status.value}",
+        "description": proposal.product_name,
+        "created_by": created_by
+    }
+
+def record_interaction(db: Session, interaction: CrmInteraction, created_by=None):
+    """
+    Move the contact's last interaction and next action date to a new
+    interaction, unless a later one is already recorded, and add it to the
+    timeline. The next action date is the one set by the latest interaction,
+    so logging the follow-up clears it. The caller commits.
+    """
+    db.flush()
+    occurred_at = interaction.interaction_date
+    db.execute(
+        update(CrmContact)
+        .where(
+            CrmContact.id == interaction.contact_id,
+            or_(CrmContact.last_interaction_at.is_(None), CrmContact.last_interaction_at <= occurred_at)
+        )
+        .values(last_interaction_at=occurred_at, next_action_date=interaction.next_action_date)
+        .execution_options(synchronize_session="fetch")
+    )
+    db.add(CrmContactEvent(**_interaction_event(interaction, created_by)))
+
+def _move_pipeline(db: Session, proposal: CommercialProposal, sign: int):
+    currency = proposal.currency or "USD"
+    db.execute(
+        update(CrmContact)
+        .where(CrmContact.id == proposal.contact_id)
+        .values(open_proposal_count=CrmContact.open_proposal_count + sign)
+        .execution_options(synchronize_session="fetch")
+    )
+    
+    stmt = dialect_insert(db)(CrmContactPipeline)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[CrmContactPipeline.contact_id, CrmContactPipeline.currency],
+        set_={
+            "open_proposal_count": CrmContactPipeline.open_proposal_count + stmt.excluded.open_proposal_count,
+            "open_value": CrmContactPipeline.open_value + stmt.excluded.open_value
+        }
+    )
+    db.execute(stmt, [{
+        "contact_id": proposal.contact_id, "currency": currency,
+        "open_proposal_count": sign, "open_value": sign * Decimal(proposal.total_value or 0)
+    }])
+    if sign < 0:
+        db.execute(delete(CrmContactPipeline).where(
+            CrmContactPipeline.contact_id == proposal.contact_id,
+            CrmContactPipeline.currency == currency,
+            CrmContactPipeline.open_proposal_count <= 0
+        ))
+
+def record_proposal_change(
+    db: Session,
+    proposal: CommercialProposal,
+    previous_status: Optional[ProposalStatus] = None,
+    changed_by=None,
+    changed_at: Optional[datetime] = None
+):
+    """
+    Count a proposal in or out of its contact's open pipeline and add the
+    creation or status change to the timeline. previous_status is None for
+    a new proposal. The caller commits.
+    """
+    db.flush()
+    status = proposal_status(proposal)
+    if proposal.contact_id is None or status == previous_status:
+        return
+    
+    was_open = previous_status in OPEN_PROPOSAL_STATUSES
+    is_open = status in OPEN_PROPOSAL_STATUSES
+    if is_open != was_open:
+        _move_pipeline(db, proposal, 1 if is_open else -1)
+    
+    if previous_status is None:
+        event = _proposal_event(proposal, ContactEventType.PROPOSTA_CRIADA, status, proposal.created_at, changed_by)
+    else:
+        event = _proposal_event(
+            proposal, ContactEventType.PROPOSTA_STATUS, status, changed_at or datetime.utcnow(), changed_by
+        )
+    db.add(CrmContactEvent(**event))
+
+# Maintenance
+
+def expected_summaries(db: Session) -> Dict[object, Summary]:
+    """Contact summaries computed from the interactions and proposals tables"""
+    summaries = {
+        contact_id: [None, None, 0, defaultdict(lambda: [0, ZERO])]
+        for contact_id in db.scalars(select(CrmContact.id))
+    }
+    
+    # Ascending per contact, so the last row seen is the latest interaction
+    for contact_id, interaction_date, next_action_date in db.execute(
+        select(CrmInteraction.contact_id, CrmInteraction.interaction_date, CrmInteraction.next_action_date)
+        .where(CrmInteraction.contact_id.is_not(None))
+        .order_by(CrmInteraction.contact_id, CrmInteraction.interaction_date, CrmInteraction.id)
+        .execution_options(yield_per=BATCH_SIZE)
+    ):
+        summaries[contact_id][0:2] = [interaction_date, next_action_date]
+    
+    for contact_id, currency, total_value in db.execute(
+        select(CommercialProposal.contact_id, CommercialProposal.currency, CommercialProposal.total_value)
+        .where(CommercialProposal.contact_id.is_not(None), CommercialProposal.status.in_(OPEN_PROPOSAL_STATUSES))
+        .execution_options(yield_per=BATCH_SIZE)
+    ):
+        summary = summaries[contact_id]
+        summary[2] += 1
+        totals = summary[3][currency or "USD"]
+        totals[0] += 1
+        totals[1] += Decimal(total_value or 0)
+    
+    return {
+        contact_id: (last, next_action, count, dict(pipeline))
+        for contact_id, (last, next_action, count, pipeline) in summaries.items()
+    }
+
+def _stored_summaries(db: Session) -> Dict[object, Summary]:
+    pipelines = defaultdict(dict)
+    for row in db.scalars(select(CrmContactPipeline)):
+        pipelines[row.contact_id][row.currency] = [row.open_proposal_count, Decimal(row.open_value)]
+    return {
+        row.id: (row.last_interaction_at, row.next_action_date, row.open_proposal_count, pipelines.get(row.id, {}))
+        for row in db.execute(select(
+            CrmContact.id, CrmContact.last_interaction_at, CrmContact.next_action_date, CrmContact.open_proposal_count
+        ))
+    }
+
+def backfill_events(db: Session) -> int:
+    """Add interactions and proposals that predate the timeline, at their recorded times"""
+    logged = select(CrmContactEvent.id).where(CrmContactEvent.reference_id == CrmInteraction.id).exists()
+    events = [
+        _interaction_event(interaction, interaction.created_by)
+        for interaction in db.scalars(
+            select(CrmInteraction).where(CrmInteraction.contact_id.is_not(None), ~logged)
+        )
+    ]
+    
+    logged = select(CrmContactEvent.id).where(CrmContactEvent.reference_id == CommercialProposal.id).exists()
+    for proposal in db.scalars(
+        select(CommercialProposal).where(CommercialProposal.contact_id.is_not(None), ~logged)
+    ):
+        events.append(_proposal_event(
+            proposal, ContactEventType.PROPOSTA_CRIADA, ProposalStatus.RASCUNHO, proposal.created_at,
+            proposal.created_by
+        ))
+        # Status changes left no trace but these timestamps
+        changes = [(ProposalStatus.ENVIADA, proposal.sent_at), (ProposalStatus.ACEITA, proposal.accepted_at)]
+        status = proposal_status(proposal)
+        if status in (ProposalStatus.REJEITADA, ProposalStatus.EXPIRADA):
+            changes.append((status, proposal.updated_at or proposal.created_at))
+        events += [
+            _proposal_event(proposal, ContactEventType.PROPOSTA_STATUS, status, occurred_at)
+            for status, occurred_at in changes
+            if occurred_at
+        ]
+    
+    for start in range(0, len(events), BATCH_SIZE):
+        db.execute(insert(CrmContactEvent), events[start:start + BATCH_SIZE])
+    return len(events)
+
+def rebuild_summaries(db: Session) -> int:
+    """Recompute every contact summary and the pipeline table. The caller commits."""
+    summaries = expected_summaries(db)
+    db.execute(
+        update(CrmContact),
+        [
+            {
+                "id": contact_id, "last_interaction_at": last,
+                "next_action_date": next_action, "open_proposal_count": count
+            }
+            for contact_id, (last, next_action, count, _) in summaries.items()
+        ]
+    )
+    db.execute(delete(CrmContactPipeline))
+    rows = [
+        {"contact_id": contact_id, "currency": currency, "open_proposal_count": count, "open_value": value}
+        for contact_id, (_, _, _, pipeline) in summaries.items()
+        for currency, (count, value) in pipeline.items()
+    ]
+    if rows:
+        db.execute(insert(CrmContactPipeline), rows)
+    return len(summaries)
+
+def verify_summaries(db: Session) -> List[dict]:
+    """Compare the stored contact summaries against the source tables and return mismatching contacts"""
+    expected = expected_summaries(db)
+    actual = _stored_summaries(db)
+    return [
+        {"contact_id": contact_id, "expected": expected[contact_id], "actual": actual.get(contact_id)}
+        for contact_id in expected
+        if _comparable(expected[contact_id]) != _comparable(actual.get(contact_id))
+    ]
+
+def _comparable(summary: Optional[Summary]):
+    if summary is None:
+        return None
+    last, next_action, count, pipeline = summary
+    # SQLite drops the time zone, PostgreSQL returns it
+    last = last.replace(tzinfo=None) if last else None
+    return last, next_action, count, {currency: (n, Decimal(value)) for currency, (n, value) in pipeline.items()}
+
+if __name__ == "__main__":
+    import argparse
+    import sys
+    from app.core.database import SessionLocal
+    
+    parser = argparse.ArgumentParser(description="Maintain the contact activity summaries and timeline")
+    parser.add_argument("command", choices=["rebuild", "verify"])
+    args = parser.parse_args()
+    
+    db = SessionLocal()
+    try:
+        if args.command == "rebuild":
+            print(f"Added {backfill_events(db)} timeline events")
+            print(f"Rebuilt {rebuild_summaries(db)} contact summaries")
+            db.commit()
+        else:
+            mismatches = verify_summaries(db)
+            for mismatch in mismatches:
+                print(mismatch)
+            print(f"{len(mismatches)} mismatching contacts")
+            sys.exit(1 if mismatches else 0)
+    finally:
+        db.close()
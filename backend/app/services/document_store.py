@@ -0,0 +1,138 @@
+import hashlib
+import logging
+from datetime import datetime, timedelta, timezone
+from typing import BinaryIO, Tuple
+from fastapi import UploadFile
+from sqlalchemy import case, delete, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
+from app.core.database import dialect_insert
+from app.models.document import StoredBlob
+from app.models.expedition import ExpeditionDocument
+from app.models.financial import FinancialDocument
+from app.services.storage_service import BLOB_BUCKET, StorageService
+
+logger = logging.getLogger(__name__)
+
+HASH_CHUNK_SIZE = 1024 * 1024
+GC_GRACE_PERIOD = timedelta(hours=24)
+
+def blob_object_name(sha256: str) -> str:
+    return f"sha256/{sha256[:2]}/{sha256}"
+
+def hash_file(file: BinaryIO) -> Tuple[str, int]:
+    """SHA-256 and size of a seekable file, rewound afterwards"""
+    digest = hashlib.sha256()
+    size = 0
+    file.seek(0)
+    while chunk := file.read(HASH_CHUNK_SIZE):
+        digest.update(chunk)
+        size += len(chunk)
+    file.seek(0)
+    return digest.hexdigest(), size
+
+async def acquire_blob(db: AsyncSession, storage: StorageService, file: UploadFile) -> StoredBlob:
+    """
+    Take a reference on the blob holding the upload's bytes, uploading it
+    only if no blob with the same hash exists. The reference belongs to the
+    document row the caller adds in the same transaction.
+    """
+    sha256, size = await run_in_threadpool(hash_file, file.file)
+    
+    # Re-referencing an existing blob also rescues it from garbage collection
+    result = await db.execute(
+        update(StoredBlob)
+        .where(StoredBlob.sha256 == sha256)
+        .values(ref_count=StoredBlob.ref_count + 1, orphaned_at=None)
+    )
+    if result.rowcount == 0:
+        object_name = blob_object_name(sha256)
+        uploaded = await run_in_threadpool(
+            storage.upload_stream, BLOB_BUCKET, object_name, file.file, size, file.content_type
+        )
+        if uploaded["sha256"] != sha256:
+            raise Exception("File changed while uploading")
+        
+        # A concurrent upload of the same bytes may have inserted the row meanwhile
+        stmt = dialect_insert(db)(StoredBlob).values(
+            sha256=sha256,
+            object_name=object_name,
+            size=size,
+            content_type=file.content_type,
+            ref_count=1
+        )
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[StoredBlob.sha256],
+            set_={"ref_count": StoredBlob.ref_count + 1, "orphaned_at": None}
+        )
+        await db.execute(stmt)
+    
+    return await db.get(StoredBlob, sha256, populate_existing=True)
+
+async def release_blob(db: AsyncSession, sha256: str):
+    """Drop a reference; the blob becomes collectable when none remain"""
+    await db.execute(
+        update(StoredBlob)
+        .where(StoredBlob.sha256 == sha256)
+        .values(
+            ref_count=StoredBlob.ref_count - 1,
+            orphaned_at=case((StoredBlob.ref_count <= 1, datetime.now(timezone.utc)), else_=None)
+        )
+    )
+
+def collect_garbage(db: Session, storage: StorageService, grace: timedelta = GC_GRACE_PERIOD) -> int:
+    """
+    Delete blobs unreferenced for longer than the grace period.
+    
+    Each row is deleted conditionally and the object removed while that
+    row lock is still held, so a concurrent acquire either re-references
+    the blob first (and the delete matches nothing) or waits and uploads
+    a fresh copy after the commit.
+    """
+    cutoff = datetime.now(timezone.utc) - grace
+    # Rows written outside acquire_blob (e.g. by the frontend) hold no count
+    referenced = [
+        select(model.id).where(model.blob_sha256 == StoredBlob.sha256).exists()
+        for model in (FinancialDocument, ExpeditionDocument)
+    ]
+    candidates = db.execute(
+        select(StoredBlob.sha256, StoredBlob.object_name)
+        .where(StoredBlob.ref_count <= 0, StoredBlob.orphaned_at < cutoff, *[~exists for exists in referenced])
+    ).all()
+    
+    removed = 0
+    for sha256, object_name in candidates:
+        deleted = db.execute(
+            delete(StoredBlob).where(StoredBlob.sha256 == sha256, StoredBlob.ref_count <= 0)
+        )
+        if deleted.rowcount == 0:
+            db.rollback()
+            continue
+        try:
+            storage.delete_file(BLOB_BUCKET, object_name)
+        except Exception as e:
+            logger.warning("Could not delete blob %s: %s", sha256, e)
+            db.rollback()
+            continue
+        db.commit()
+        removed += 1
+    
+    return removed
+
+if __name__ == "__main__":
+    import argparse
+    from app.core.database import SessionLocal
+    from app.services.storage_service import get_storage_service
+    
+    parser = argparse.ArgumentParser(description="Maintain the content-addressed document store")
+    parser.add_argument("command", choices=["gc"])
+    parser.add_argument("--grace-hours", type=float, default=GC_GRACE_PERIOD.total_seconds() / 3600)
+    args = parser.parse_args()
+    
+    db = SessionLocal()
+    try:
+        removed = collect_garbage(db, get_storage_service(), timedelta(hours=args.grace_hours))
+        print(f"Removed {removed} unreferenced blobs")
+    finally:
+        db.close()
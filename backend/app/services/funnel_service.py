@@ -0,0 +1,368 @@
+from collections import defaultdict
+from datetime import date, datetime
+from decimal import ROUND_HALF_UP, Decimal
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+from sqlalchemy import func, insert, literal, select
+from sqlalchemy.orm import Session
+from app.core.database import dialect_insert
+from app.models.crm import (
+    CrmFunnelSnapshot, CrmFunnelStageEntry, CrmOpportunity, CrmOpportunityStageChange, FunnelStage
+)
+from app.models.financial import CurrencyCode
+from app.services.fx_service import CENT, get_rates, to_brl
+
+ZERO = Decimal("0")
+HUNDRED = Decimal("100")
+
+# Stages in funnel order; reaching one counts as passing the earlier ones
+FUNNEL_PATH = [
+    FunnelStage.CONTATO_INICIAL, FunnelStage.QUALIFICADO, FunnelStage.PROPOSTA_ENVIADA,
+    FunnelStage.NEGOCIACAO, FunnelStage.FECHADO_GANHOU
+]
+CLOSED_STAGES = (FunnelStage.FECHADO_GANHOU, FunnelStage.FECHADO_PERDEU)
+
+# Snapshot key for opportunities without an expected close date
+NO_CLOSE_MONTH = date(1900, 1, 1)
+
+FUNNEL_ORDER = {stage: index for index, stage in enumerate(FunnelStage)}
+
+SNAPSHOT_KEY = ["snapshot_date", "stage", "close_month", "currency"]
+
+# (stage, close month, currency)
+BucketKey = Tuple[FunnelStage, date, str]
+
+def funnel_state(opportunity) -> dict:
+    """The fields that place an opportunity in the funnel, with column defaults applied"""
+    return {
+        "stage": FunnelStage(opportunity.stage or FunnelStage.CONTATO_INICIAL),
+        "estimated_value": Decimal(opportunity.estimated_value or 0),
+        "currency": opportunity.currency or "BRL",
+        "probability": 50 if opportunity.probability is None else opportunity.probability,
+        "expected_close_date": opportunity.expected_close_date
+    }
+
+def bucket_key(state: dict) -> BucketKey:
+    close_date = state["expected_close_date"]
+    return state["stage"], close_date.replace(day=1) if close_date else NO_CLOSE_MONTH, state["currency"]
+
+def weighted_value(state: dict) -> Decimal:
+    return (state["estimated_value"] * state["probability"] / HUNDRED).quantize(CENT, rounding=ROUND_HALF_UP)
+
+def reached_stages(stage: FunnelStage) -> Set[FunnelStage]:
+    if stage in FUNNEL_PATH:
+        return set(FUNNEL_PATH[:FUNNEL_PATH.index(stage) + 1])
+    return {stage}
+
+def _add_to_buckets(buckets: Dict[BucketKey, list], state: dict, sign: int):
+    totals = buckets[bucket_key(state)]
+    totals[0] += sign
+    totals[1] += sign * state["estimated_value"]
+    totals[2] += sign * weighted_value(state)
+
+def _carry_forward(db: Session, day: date):
+    """Start a day's snapshot from the latest earlier one, once per day"""
+    if db.scalar(select(CrmFunnelSnapshot.snapshot_date).where(CrmFunnelSnapshot.snapshot_date == day).limit(1)):
+        return
+    latest = select(func.max(CrmFunnelSnapshot.snapshot_date)).where(
+        CrmFunnelSnapshot.snapshot_date < day
+    ).scalar_subquery()
+    copy = select(
+        literal(day, CrmFunnelSnapshot.snapshot_date.type), CrmFunnelSnapshot.stage,
+        CrmFunnelSnapshot.close_month, CrmFunnelSnapshot.currency, CrmFunnelSnapshot.opportunity_count,
+        CrmFunnelSnapshot.total_value, CrmFunnelSnapshot.weighted_value
+    ).where(CrmFunnelSnapshot.snapshot_date == latest, CrmFunnelSnapshot.opportunity_count != 0)
+    # Concurrent first writes of the day copy the same rows; the loser inserts nothing
+    db.execute(
+        dialect_insert(db)(CrmFunnelSnapshot)
+        .from_select(SNAPSHOT_KEY + ["opportunity_count", "total_value", "weighted_value"], copy)
+        .on_conflict_do_nothing()
+    )
+
+def _upsert_snapshot_rows(db: Session, day: date, buckets: Dict[BucketKey, list]):
+    rows = [
+        {
+            "snapshot_date": day, "stage": stage, "close_month": close_month, "currency": currency,
+            "opportunity_count": count, "total_value": total, "weighted_value": weighted
+        }
+        for (stage, close_month, currency), (count, total, weighted) in buckets.items()
+        if count or total or weighted
+    ]
+    if not rows:
+        return
+    
+    stmt = dialect_insert(db)(CrmFunnelSnapshot)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=SNAPSHOT_KEY,
+        set_={
+            "opportunity_count": CrmFunnelSnapshot.opportunity_count + stmt.excluded.opportunity_count,
+            "total_value": CrmFunnelSnapshot.total_value + stmt.excluded.total_value,
+            "weighted_value": CrmFunnelSnapshot.weighted_value + stmt.excluded.weighted_value,
+            "updated_at": func.now()
+        }
+    )
+    db.execute(stmt, rows)
+
+def _upsert_stage_entries(db: Session, day: date, stages: Iterable[FunnelStage]):
+    rows = [{"entry_date": day, "stage": stage, "entry_count": 1} for stage in stages]
+    if not rows:
+        return
+    
+    stmt = dialect_insert(db)(CrmFunnelStageEntry)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[CrmFunnelStageEntry.entry_date, CrmFunnelStageEntry.stage],
+        set_={"entry_count": CrmFunnelStageEntry.entry_count + stmt.excluded.entry_count}
+    )
+    db.execute(stmt, rows)
+
+def record_opportunity_change(
+    db: Session,
+    opportunity: CrmOpportunity,
+    previous: Optional[dict] = None,
+    changed_by=None,
+    changed_at: Optional[datetime] = None
+):
+    """
+    Move an opportunity between buckets of today's funnel snapshot and log
+    its new state. previous is funnel_state from before the write, None
+    for a new opportunity. The caller commits.
+    """
+    db.flush()
+    current = funnel_state(opportunity)
+    if current == previous:
+        return
+    
+    changed_at = changed_at or datetime.utcnow()
+    day = changed_at.date()
+    
+    buckets = defaultdict(lambda: [0, ZERO, ZERO])
+    if previous is not None:
+        _add_to_buckets(buckets, previous, -1)
+    _add_to_buckets(buckets, current, 1)
+    _carry_forward(db, day)
+    _upsert_snapshot_rows(db, day, buckets)
+    
+    if previous is None or previous["stage"] != current["stage"]:
+        reached = set()
+        for stage in db.scalars(
+            select(CrmOpportunityStageChange.to_stage)
+            .where(CrmOpportunityStageChange.opportunity_id == opportunity.id)
+            .distinct()
+        ):
+            reached |= reached_stages(stage)
+        _upsert_stage_entries(db, day, reached_stages(current["stage"]) - reached)
+    
+    db.add(CrmOpportunityStageChange(
+        opportunity_id=opportunity.id,
+        changed_at=changed_at,
+        from_stage=previous["stage"] if previous else None,
+        to_stage=current["stage"],
+        estimated_value=current["estimated_value"],
+        currency=current["currency"],
+        probability=current["probability"],
+        expected_close_date=current["expected_close_date"],
+        changed_by=changed_by
+    ))
+
+def backfill_history(db: Session) -> int:
+    """Log the current state of opportunities that predate the change log, at their creation time"""
+    logged = select(CrmOpportunityStageChange.id).where(
+        CrmOpportunityStageChange.opportunity_id == CrmOpportunity.id
+    ).exists()
+    rows = []
+    for opportunity in db.scalars(select(CrmOpportunity).where(~logged)):
+        state = funnel_state(opportunity)
+        rows.append({
+            "opportunity_id": opportunity.id,
+            "changed_at": opportunity.created_at or datetime.utcnow(),
+            "to_stage": state.pop("stage"),
+            **state
+        })
+    if rows:
+        db.execute(insert(CrmOpportunityStageChange), rows)
+    return len(rows)
+
+def change_state(change: CrmOpportunityStageChange) -> dict:
+    return {
+        "stage": change.to_stage,
+        "estimated_value": Decimal(change.estimated_value or 0),
+        "currency": change.currency or "BRL",
+        "probability": 50 if change.probability is None else change.probability,
+        "expected_close_date": change.expected_close_date
+    }
+
+def _snapshot_rows(day: date, buckets: Dict[BucketKey, list]) -> List[dict]:
+    return [
+        {
+            "snapshot_date": day, "stage": stage, "close_month": close_month, "currency": currency,
+            "opportunity_count": count, "total_value": total, "weighted_value": weighted
+        }
+        for (stage, close_month, currency), (count, total, weighted) in buckets.items() if count
+    ]
+
+def rebuild_snapshots(db: Session) -> int:
+    """
+    Replace the funnel snapshots and stage entries by replaying the change
+    log in order, writing one snapshot per day that had changes. Commits;
+    returns the number of snapshot days.
+    """
+    db.query(CrmFunnelSnapshot).delete()
+    db.query(CrmFunnelStageEntry).delete()
+    
+    states = {}
+    reached = defaultdict(set)
+    buckets: Dict[BucketKey, list] = defaultdict(lambda: [0, ZERO, ZERO])
+    entries: Dict[FunnelStage, int] = defaultdict(int)
+    days = []
+    
+    def close_day(day: date):
+        rows = _snapshot_rows(day, buckets)
+        if rows:
+            db.execute(insert(CrmFunnelSnapshot), rows)
+        if entries:
+            db.execute(insert(CrmFunnelStageEntry), [
+                {"entry_date": day, "stage": stage, "entry_count": count} for stage, count in entries.items()
+            ])
+            entries.clear()
+        days.append(day)
+    
+    changes = db.scalars(
+        select(CrmOpportunityStageChange)
+        .order_by(CrmOpportunityStageChange.changed_at, CrmOpportunityStageChange.id)
+        .execution_options(yield_per=1000)
+    )
+    current_day = None
+    for change in changes:
+        day = change.changed_at.date()
+        if current_day is not None and day != current_day:
+            close_day(current_day)
+        current_day = day
+        
+        state = change_state(change)
+        previous = states.get(change.opportunity_id)
+        if previous is not None:
+            _add_to_buckets(buckets, previous, -1)
+        _add_to_buckets(buckets, state, 1)
+        states[change.opportunity_id] = state
+        
+        new_stages = reached_stages(state["stage"]) - reached[change.opportunity_id]
+        reached[change.opportunity_id] |= new_stages
+        for stage in new_stages:
+            entries[stage] += 1
+    
+    if current_day is not None:
+        close_day(current_day)
+    db.commit()
+    return len(days)
+
+def _latest_snapshot_date(db: Session, as_of: date) -> Optional[date]:
+    return db.scalar(
+        select(func.max(CrmFunnelSnapshot.snapshot_date)).where(CrmFunnelSnapshot.snapshot_date <= as_of)
+    )
+
+def verify_snapshots(db: Session) -> List[dict]:
+    """Compare the latest snapshot against the current opportunities and return mismatching buckets"""
+    expected = defaultdict(lambda: [0, ZERO, ZERO])
+    for opportunity in db.scalars(select(CrmOpportunity).execution_options(yield_per=1000)):
+        _add_to_buckets(expected, funnel_state(opportunity), 1)
+    expected = {key: tuple(totals) for key, totals in expected.items() if totals[0]}
+    
+    latest = _latest_snapshot_date(db, date.max)
+    actual = {
+        (row.stage, row.close_month, row.currency):
+            (row.opportunity_count, Decimal(row.total_value), Decimal(row.weighted_value))
+        for row in db.scalars(select(CrmFunnelSnapshot).where(
+            CrmFunnelSnapshot.snapshot_date == latest, CrmFunnelSnapshot.opportunity_count != 0
+        ))
+    }
+    
+    return [
+        {"key": dict(zip(SNAPSHOT_KEY[1:], key)), "expected": expected.get(key), "actual": actual.get(key)}
+        for key in sorted(set(expected) | set(actual), key=lambda k: (FUNNEL_ORDER[k[0]], k[1], k[2]))
+        if expected.get(key) != actual.get(key)
+    ]
+
+def get_funnel(db: Session, as_of: date, conversions_from: date) -> dict:
+    """
+    Stage counts, weighted open pipeline per expected close month and
+    stage-to-stage conversion from the snapshot tables, in three indexed
+    queries plus one rate lookup per currency. Values are in BRL at the
+    as_of rates; currencies without a rate are listed and left out.
+    """
+    snapshot_date = _latest_snapshot_date(db, as_of)
+    rows = db.execute(
+        select(
+            CrmFunnelSnapshot.stage, CrmFunnelSnapshot.close_month, CrmFunnelSnapshot.currency,
+            CrmFunnelSnapshot.opportunity_count, CrmFunnelSnapshot.total_value, CrmFunnelSnapshot.weighted_value
+        ).where(CrmFunnelSnapshot.snapshot_date == snapshot_date, CrmFunnelSnapshot.opportunity_count != 0)
+    ).all() if snapshot_date else []
+    
+    currencies = {row.currency for row in rows}
+    rates = get_rates(
+        db, {(currency, as_of) for currency in currencies if currency in CurrencyCode.__members__}, strict=False
+    )
+    unpriced = sorted(currency for currency in currencies if (currency, as_of) not in rates)
+    
+    stages = {stage: {"stage": stage, "opportunity_count": 0, "value_brl": ZERO, "weighted_value_brl": ZERO} for stage in FunnelStage}
+    months = defaultdict(lambda: {"opportunity_count": 0, "value_brl": ZERO, "weighted_value_brl": ZERO})
+    for row in rows:
+        rate = rates.get((row.currency, as_of))
+        value = to_brl(Decimal(row.total_value), rate) if rate is not None else ZERO
+        weighted = to_brl(Decimal(row.weighted_value), rate) if rate is not None else ZERO
+        for target in (stages[row.stage], months[row.close_month] if row.stage not in CLOSED_STAGES else None):
+            if target is None:
+                continue
+            target["opportunity_count"] += row.opportunity_count
+            target["value_brl"] += value
+            target["weighted_value_brl"] += weighted
+    
+    entered = dict(db.execute(
+        select(CrmFunnelStageEntry.stage, func.sum(CrmFunnelStageEntry.entry_count))
+        .where(CrmFunnelStageEntry.entry_date >= conversions_from, CrmFunnelStageEntry.entry_date <= as_of)
+        .group_by(CrmFunnelStageEntry.stage)
+    ).all())
+    conversions = []
+    for from_stage, to_stage in zip(FUNNEL_PATH, FUNNEL_PATH[1:]):
+        started, converted = int(entered.get(from_stage) or 0), int(entered.get(to_stage) or 0)
+        conversions.append({
+            "from_stage": from_stage,
+            "to_stage": to_stage,
+            "entered": started,
+            "converted": converted,
+            "conversion_rate": (Decimal(converted) / started).quantize(Decimal("0.0001")) if started else None
+        })
+    
+    return {
+        "snapshot_date": snapshot_date,
+        "stages": [stages[stage] for stage in FunnelStage],
+        "pipeline": [
+            {"close_month": None if month == NO_CLOSE_MONTH else month, **months[month]}
+            for month in sorted(months)
+        ],
+        "conversions": conversions,
+        "unpriced_currencies": unpriced
+    }
+
+if __name__ == "__main__":
+    import argparse
+    import sys
+    from app.core.database import SessionLocal
+    
+    parser = argparse.ArgumentParser(description="Maintain the sales funnel snapshots")
+    parser.add_argument("command", choices=["backfill", "verify"])
+    args = parser.parse_args()
+    
+    db = SessionLocal()
+    try:
+        if args.command == "backfill":
+            logged = backfill_history(db)
+            db.commit()
+            print(f"Logged {logged} opportunities without history")
+            print(f"Funnel rebuilt with {rebuild_snapshots(db)} snapshot days")
+        else:
+            mismatches = verify_snapshots(db)
+            for mismatch in mismatches:
+                print(mismatch)
+            print(f"{len(mismatches)} mismatching buckets")
+            sys.exit(1 if mismatches else 0)
+    finally:
+        db.close()
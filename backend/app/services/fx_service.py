@@ -0,0 +1,210 @@
+import asyncio
+import csv
+import logging
+import threading
+import time
+from bisect import bisect_right
+from collections import defaultdict
+from datetime import date
+from decimal import ROUND_HALF_UP, Decimal
+from typing import Dict, IO, Iterable, List, Optional, Sequence, Tuple
+from redis.exceptions import RedisError
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+from app.core.config import settings
+from app.core.database import dialect_insert
+from app.core.redis import get_redis
+from app.models.financial import CurrencyCode, ExchangeRate
+
+logger = logging.getLogger(__name__)
+
+INVALIDATION_CHANNEL = "fx-rate-cache:invalidate"
+
+ONE = Decimal("1")
+CENT = Decimal("0.01")
+
+RateKey = Tuple[CurrencyCode, date]
+
+class MissingRateError(LookupError):
+    """No rate on or before the requested date"""
+    def __init__(self, missing: Iterable[RateKey]):
+        self.missing = sorted(set(missing))
+        super().__init__(", ".join(
+            f"no {currency.value} rate on or before {on_date.isoformat()}" for currency, on_date in self.missing
+        ))
+
+class RateCache:
+    """
+    Process-local cache of resolved (currency, date) rates. With Redis,
+    invalidations are published so every worker drops its entries.
+    """
+    def __init__(self, ttl_seconds: int, use_redis: bool = False):
+        self.ttl_seconds = ttl_seconds
+        self.use_redis = use_redis
+        self._entries: Dict[RateKey, Tuple[float, Decimal]] = {}
+        self._lock = threading.Lock()
+    
+    def get_many(self, keys: Iterable[RateKey]) -> Dict[RateKey, Decimal]:
+        now = time.monotonic()
+        with self._lock:
+            return {
+                key: entry[1] for key in keys
+                if (entry := self._entries.get(key)) is not None and entry[0] > now
+            }
+    
+    def set_many(self, rates: Dict[RateKey, Decimal]):
+        expires_at = time.monotonic() + self.ttl_seconds
+        with self._lock:
+            self._entries.update((key, (expires_at, rate)) for key, rate in rates.items())
+    
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+    
+    async def invalidate(self):
+        """Drop cached rates everywhere; call after committing rate changes"""
+        self.clear()
+        if not self.use_redis:
+            return
+        
+        try:
+            await get_redis().publish(INVALIDATION_CHANNEL, "all")
+        except RedisError as e:
+            logger.warning("FX rate cache invalidation failed: %s", e)
+    
+    async def listen_for_invalidations(self):
+        """Clear the local entries when another worker changes rates"""
+        while True:
+            try:
+                pubsub = get_redis().pubsub()
+                await pubsub.subscribe(INVALIDATION_CHANNEL)
+                async for message in pubsub.listen():
+                    if message["type"] == "message":
+                        self.clear()
+            except asyncio.CancelledError:
+                raise
+            except RedisError as e:
+                # Local entries still expire by TTL while Redis is unreachable
+                logger.warning("FX rate invalidation listener failed: %s", e)
+                await asyncio.sleep(5)
+
+rate_cache = RateCache(settings.FX_RATE_CACHE_TTL_SECONDS, use_redis=settings.FX_RATE_CACHE_USE_REDIS)
+
+def _load_rates(db: Session, currency: CurrencyCode, dates: List[date]) -> Dict[RateKey, Decimal]:
+    """Effective rates for many dates of one currency with a single range query"""
+    first, last = min(dates), max(dates)
+    # The range starts at the last rate in effect on the earliest date
+    floor = select(func.max(ExchangeRate.rate_date)).where(
+        ExchangeRate.currency == currency,
+        ExchangeRate.rate_date <= first
+    ).scalar_subquery()
+    rows = db.execute(
+        select(ExchangeRate.rate_date, ExchangeRate.rate)
+        .where(
+            ExchangeRate.currency == currency,
+            ExchangeRate.rate_date <= last,
+            ExchangeRate.rate_date >= func.coalesce(floor, first)
+        )
+        .order_by(ExchangeRate.rate_date)
+    ).all()
+    
+    rate_dates = [row.rate_date for row in rows]
+    rates = {}
+    for on_date in dates:
+        index = bisect_right(rate_dates, on_date) - 1
+        if index >= 0:
+            rates[(currency, on_date)] = Decimal(rows[index].rate)
+    return rates
+
+def get_rates(db: Session, keys: Iterable[RateKey], strict: bool = True) -> Dict[RateKey, Decimal]:
+    """
+    BRL rates for many (currency, date) pairs: the latest rate on or before
+    each date. Costs at most one query per currency for uncached pairs.
+    Missing pairs raise MissingRateError, or are left out when not strict.
+    """
+    keys = {(CurrencyCode(currency), on_date) for currency, on_date in keys}
+    rates = {key: ONE for key in keys if key[0] == CurrencyCode.BRL}
+    rates.update(rate_cache.get_many(keys - rates.keys()))
+    
+    pending = defaultdict(list)
+    for currency, on_date in keys - rates.keys():
+        pending[currency].append(on_date)
+    
+    loaded = {}
+    for currency, dates in pending.items():
+        loaded.update(_load_rates(db, currency, dates))
+    rate_cache.set_many(loaded)
+    rates.update(loaded)
+    
+    if strict and len(rates) < len(keys):
+        raise MissingRateError(keys - rates.keys())
+    return rates
+
+def get_rate(db: Session, currency: CurrencyCode, on_date: date) -> Decimal:
+    return get_rates(db, [(currency, on_date)])[(CurrencyCode(currency), on_date)]
+
+def to_brl(amount: Decimal, rate: Decimal) -> Decimal:
+    return (amount * rate).quantize(CENT, rounding=ROUND_HALF_UP)
+
+def convert_to_brl(db: Session, items: Sequence[Tuple[Decimal, CurrencyCode, date]]) -> List[Decimal]:
+    """BRL values of (amount, currency, date) items, resolving all rates in one batch"""
+    rates = get_rates(db, {(currency, on_date) for _, currency, on_date in items})
+    return [
+        to_brl(amount, rates[(CurrencyCode(currency), on_date)])
+        for amount, currency, on_date in items
+    ]
+
+def upsert_rates(db: Session, rows: List[dict]) -> int:
+    """
+    Insert or replace rates (currency, rate_date, rate, source). The caller
+    commits and then calls rate_cache.invalidate(), so no request can cache
+    the old rate again after the clear.
+    """
+    if not rows:
+        return 0
+    
+    stmt = dialect_insert(db)(ExchangeRate)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[ExchangeRate.currency, ExchangeRate.rate_date],
+        set_={"rate": stmt.excluded.rate, "source": stmt.excluded.source, "updated_at": func.now()}
+    )
+    db.execute(stmt, rows)
+    return len(rows)
+
+def import_rates_csv(db: Session, file: IO[str], source: Optional[str] = None) -> int:
+    """Load a CSV with currency,rate_date,rate columns"""
+    rows = [
+        {
+            "currency": CurrencyCode(row["currency"].strip().upper()),
+            "rate_date": date.fromisoformat(row["rate_date"].strip()),
+            "rate": Decimal(row["rate"].strip()),
+            "source": source
+        }
+        for row in csv.DictReader(file)
+    ]
+    count = upsert_rates(db, rows)
+    db.commit()
+    return count
+
+if __name__ == "__main__":
+    import argparse
+    from app.core.database import SessionLocal
+    from app.core.redis import close_redis
+    
+    parser = argparse.ArgumentParser(description="Maintain the exchange rate table")
+    parser.add_argument("command", choices=["import-csv"])
+    parser.add_argument("path", help="CSV with currency,rate_date,rate columns")
+    parser.add_argument("--source", default="csv")
+    args = parser.parse_args()
+    
+    async def notify_workers():
+        await rate_cache.invalidate()
+        await close_redis()
+    
+    db = SessionLocal()
+    try:
+        with open(args.path, newline="") as file:
+            print(f"Imported {import_rates_csv(db, file, args.source)} rates")
+        asyncio.run(notify_workers())
+    finally:
+        db.close()
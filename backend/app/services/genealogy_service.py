@@ -0,0 +1,145 @@
+from datetime import date
+from typing import List, Optional
+from sqlalchemy import delete, func, insert, literal, null, select, union_all
+from sqlalchemy.orm import Session
+from app.models.expedition import Expedition, ExpeditionItem, LotGenealogy
+from app.models.reception import ConsolidatedLot, ConsolidatedLotItem, Producer, Reception
+
+GENEALOGY_COLUMNS = [
+    "expedition_item_id", "reception_id", "producer_id", "expedition_id",
+    "consolidated_lot_id", "expedition_date", "quantity_kg"
+]
+
+def _paths(expedition_id=None):
+    """Select every reception → expedition item path in the lot graph"""
+    direct = (
+        select(
+            ExpeditionItem.id,
+            Reception.id,
+            Reception.producer_id,
+            Expedition.id,
+            null(),
+            Expedition.expedition_date,
+            ExpeditionItem.quantity_kg
+        )
+        .join(Expedition, Expedition.id == ExpeditionItem.expedition_id)
+        .join(Reception, Reception.id == ExpeditionItem.reception_id)
+        .where(ExpeditionItem.consolidated_lot_id.is_(None))
+    )
+    
+    # Items shipped from a consolidated lot descend from every reception in
+    # it, each credited with its share of the lot. A lot may take several
+    # portions of one reception, summed into a single path.
+    share = ExpeditionItem.quantity_kg * ConsolidatedLotItem.quantity_used_kg / func.nullif(
+        ConsolidatedLot.total_quantity_kg, 0
+    )
+    consolidated = (
+        select(
+            ExpeditionItem.id,
+            Reception.id,
+            Reception.producer_id,
+            Expedition.id,
+            ConsolidatedLot.id,
+            Expedition.expedition_date,
+            func.coalesce(func.sum(share), literal(0))
+        )
+        .join(Expedition, Expedition.id == ExpeditionItem.expedition_id)
+        .join(ConsolidatedLot, ConsolidatedLot.id == ExpeditionItem.consolidated_lot_id)
+        .join(ConsolidatedLotItem, ConsolidatedLotItem.consolidated_lot_id == ConsolidatedLot.id)
+        .join(Reception, Reception.id == ConsolidatedLotItem.original_reception_id)
+        .group_by(
+            ExpeditionItem.id, Reception.id, Reception.producer_id, Expedition.id,
+            ConsolidatedLot.id, Expedition.expedition_date
+        )
+    )
+    
+    if expedition_id is not None:
+        direct = direct.where(Expedition.id == expedition_id)
+        consolidated = consolidated.where(Expedition.id == expedition_id)
+    return union_all(direct, consolidated)
+
+def index_expedition(db: Session, expedition_id):
+    """
+    Recompute the genealogy rows of one expedition after its items change.
+    On PostgreSQL the lot_genealogy triggers already do this on every write.
+    """
+    db.execute(delete(LotGenealogy).where(LotGenealogy.expedition_id == expedition_id))
+    db.execute(insert(LotGenealogy).from_select(GENEALOGY_COLUMNS, _paths(expedition_id)))
+
+def rebuild_genealogy(db: Session) -> int:
+    """Recompute the whole index from the lot tables"""
+    db.execute(delete(LotGenealogy))
+    db.execute(insert(LotGenealogy).from_select(GENEALOGY_COLUMNS, _paths()))
+    db.commit()
+    return db.scalar(select(func.count()).select_from(LotGenealogy))
+
+def verify_genealogy(db: Session) -> List[tuple]:
+    """Return (expedition_item_id, reception_id, problem) for rows out of sync"""
+    paths = _paths().subquery()
+    expected = {(row[0], row[1]) for row in db.execute(select(paths.c[0], paths.c[1]))}
+    indexed = set(db.execute(select(LotGenealogy.expedition_item_id, LotGenealogy.reception_id)).all())
+    return (
+        [(*key, "missing") for key in expected - indexed]
+        + [(*key, "stale") for key in indexed - expected]
+    )
+
+def expeditions_for_producer(producer_id, date_from: Optional[date] = None, date_to: Optional[date] = None):
+    """Expeditions containing any of a producer's lots, newest first"""
+    stmt = (
+        select(
+            Expedition.id.label("expedition_id"),
+            Expedition.expedition_code,
+            Expedition.expedition_date,
+            Expedition.destination,
+            func.count(func.distinct(LotGenealogy.reception_id)).label("reception_count"),
+            func.sum(LotGenealogy.quantity_kg).label("quantity_kg")
+        )
+        .join(Expedition, Expedition.id == LotGenealogy.expedition_id)
+        .where(LotGenealogy.producer_id == producer_id)
+        .group_by(Expedition.id, Expedition.expedition_code, Expedition.expedition_date, Expedition.destination)
+        .order_by(Expedition.expedition_date.desc())
+    )
+    if date_from:
+        stmt = stmt.where(LotGenealogy.expedition_date >= date_from)
+    if date_to:
+        stmt = stmt.where(LotGenealogy.expedition_date <= date_to)
+    return stmt
+
+def producers_for_expedition(expedition_id):
+    """Producers whose lots went into an expedition"""
+    return (
+        select(
+            Producer.id.label("producer_id"),
+            Producer.name,
+            Producer.ggn,
+            Producer.certificate_number,
+            func.count(func.distinct(LotGenealogy.reception_id)).label("reception_count"),
+            func.sum(LotGenealogy.quantity_kg).label("quantity_kg")
+        )
+        .join(Producer, Producer.id == LotGenealogy.producer_id)
+        .where(LotGenealogy.expedition_id == expedition_id)
+        .group_by(Producer.id, Producer.name, Producer.ggn, Producer.certificate_number)
+        .order_by(Producer.name)
+    )
+
+if __name__ == "__main__":
+    import argparse
+    import sys
+    from app.core.database import SessionLocal
+    
+    parser = argparse.ArgumentParser(description="Maintain the lot genealogy index")
+    parser.add_argument("command", choices=["rebuild", "verify"])
+    args = parser.parse_args()
+    
+    db = SessionLocal()
+    try:
+        if args.command == "rebuild":
+            print(f"Genealogy rebuilt with {rebuild_genealogy(db)} paths")
+        else:
+            mismatches = verify_genealogy(db)
+            for mismatch in mismatches:
+                print(mismatch)
+            print(f"{len(mismatches)} mismatching paths")
+            sys.exit(1 if mismatches else 0)
+    finally:
+        db.close()
@@ -0,0 +1,180 @@
+import multiprocessing
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+from typing import IO, List, Optional, Tuple
+from reportlab.graphics.barcode.qrencoder import QRCode, QRErrorCorrectLevel
+from reportlab.lib.pagesizes import A4
+from reportlab.lib.units import mm
+from reportlab.pdfgen import canvas
+from sqlalchemy import func, insert, select, tuple_, update
+from sqlalchemy.orm import Session
+from app.core.config import settings
+from app.models.reception import Label, Producer, Reception
+from app.services.sequence_service import reserve_range
+
+# Sheet layout: 3 x 8 labels on A4
+LABEL_COLUMNS = 3
+LABEL_ROWS = 8
+LABELS_PER_PAGE = LABEL_COLUMNS * LABEL_ROWS
+PAGE_MARGIN = 8 * mm
+QR_SIZE = 26 * mm
+
+# Labels per task sent to a render process
+QR_CHUNK_SIZE = 200
+
+# (module count, dark runs as (row, column, length))
+QrMatrix = Tuple[int, List[Tuple[int, int, int]]]
+
+def label_code(reception_code: str, sequence: int) -> str:
+    return f"{reception_code}-{sequence:05d}"
+
+# Codes of a reception share their prefix, so ordering by length first keeps
+# them in sequence order past 99999, where the suffix grows a sixth digit
+LABEL_CODE_ORDER = tuple_(func.length(Label.label_code), Label.label_code)
+
+def _code_key(code: str):
+    return tuple_(len(code), code)
+
+def _in_code_range(stmt, first_code: Optional[str], last_code: Optional[str]):
+    if first_code:
+        stmt = stmt.where(LABEL_CODE_ORDER >= _code_key(first_code))
+    if last_code:
+        stmt = stmt.where(LABEL_CODE_ORDER <= _code_key(last_code))
+    return stmt
+
+def qr_payload(code: str) -> str:
+    if settings.LABEL_QR_BASE_URL:
+        return f"{settings.LABEL_QR_BASE_URL.rstrip('/')}/{code}"
+    return code
+
+def create_label_batch(db: Session, reception: Reception, count: int) -> Tuple[str, str]:
+    """
+    Reserve count label codes for a reception and insert the labels in
+    one multi-row INSERT; returns the first and last codes. The caller
+    commits.
+    """
+    first = reserve_range(db, f"labels:{reception.id}", count)
+    codes = [label_code(reception.reception_code, n) for n in range(first, first + count)]
+    db.execute(insert(Label), [
+        {"id": uuid.uuid4(), "reception_id": reception.id, "label_code": code, "qr_code": qr_payload(code)}
+        for code in codes
+    ])
+    return codes[0], codes[-1]
+
+def label_sheet_rows(
+    db: Session,
+    reception_id,
+    first_code: Optional[str] = None,
+    last_code: Optional[str] = None,
+    printed_by=None
+) -> List[dict]:
+    """Labels to print, in code order; stamps them as printed when printed_by is given"""
+    stmt = (
+        select(
+            Label.id, Label.label_code, Label.qr_code, Reception.reception_code,
+            Reception.product_type, Reception.lot_number, Reception.harvest_date,
+            Producer.name.label("producer_name")
+        )
+        .join(Reception, Label.reception_id == Reception.id)
+        .join(Producer, Reception.producer_id == Producer.id)
+        .where(Label.reception_id == reception_id)
+        .order_by(func.length(Label.label_code), Label.label_code)
+    )
+    stmt = _in_code_range(stmt, first_code, last_code)
+    
+    rows = [dict(row) for row in db.execute(stmt).mappings()]
+    
+    if rows and printed_by is not None:
+        stamp = _in_code_range(update(Label).where(Label.reception_id == reception_id), first_code, last_code)
+        db.execute(stamp.values(printed_at=func.now(), printed_by=printed_by))
+    
+    return rows
+
+def encode_qr(value: str) -> QrMatrix:
+    qr = QRCode(None, QRErrorCorrectLevel.M)
+    qr.addData(value)
+    qr.make()
+    
+    count = qr.getModuleCount()
+    runs = []
+    for row in range(count):
+        column = 0
+        while column < count:
+            if qr.isDark(row, column):
+                start = column
+                while column < count and qr.isDark(row, column):
+                    column += 1
+                runs.append((row, start, column - start))
+            else:
+                column += 1
+    return count, runs
+
+def _encode_chunk(values: List[str]) -> List[QrMatrix]:
+    return [encode_qr(value) for value in values]
+
+def render_workers() -> int:
+    return settings.LABEL_RENDER_WORKERS or multiprocessing.cpu_count()
+
+@lru_cache
+def get_render_pool() -> ProcessPoolExecutor:
+    # spawn: forking a process that runs the event loop and thread pools is unsafe
+    return ProcessPoolExecutor(render_workers(), mp_context=multiprocessing.get_context("spawn"))
+
+def encode_qr_codes(values: List[str], workers: Optional[int] = None) -> List[QrMatrix]:
+    """QR matrices for values, spread over the render pool when worth it"""
+    workers = render_workers() if workers is None else workers
+    if workers <= 1 or len(values) <= QR_CHUNK_SIZE:
+        return _encode_chunk(values)
+    
+    chunks = [values[i:i + QR_CHUNK_SIZE] for i in range(0, len(values), QR_CHUNK_SIZE)]
+    return [matrix for chunk in get_render_pool().map(_encode_chunk, chunks) for matrix in chunk]
+
+def _draw_qr(pdf: canvas.Canvas, matrix: QrMatrix, x: float, y: float, size: float):
+    count, runs = matrix
+    # 4-module quiet zone on each side
+    module = size / (count + 8)
+    top = y + size - 4 * module
+    for row, column, length in runs:
+        pdf.rect(
+            x + (column + 4) * module, top - (row + 1) * module,
+            length * module, module, stroke=0, fill=1
+        )
+
+def _draw_label(pdf: canvas.Canvas, label: dict, matrix: QrMatrix, x: float, y: float, height: float):
+    _draw_qr(pdf, matrix, x, y + (height - QR_SIZE) / 2, QR_SIZE)
+    
+    text_x = x + QR_SIZE + 2 * mm
+    text_y = y + height - 6 * mm
+    product = label["product_type"]
+    lines = [
+        ("Helvetica-Bold", 8, label["label_code"]),
+        ("Helvetica", 7, getattr(product, "value", product)),
+        ("Helvetica", 7, f"Lote: {label['lot_number'] or '-'}"),
+        ("Helvetica", 7, (label["producer_name"] or "")[:28]),
+        ("Helvetica", 7, f"Colheita: {label['harvest_date'] or '-'}")
+    ]
+    for font, size, text in lines:
+        pdf.setFont(font, size)
+        pdf.drawString(text_x, text_y, str(text))
+        text_y -= size + 2
+
+def render_labels_pdf(labels: List[dict], out: IO[bytes], workers: Optional[int] = None):
+    """Write printable label sheets for labels into out as one multi-page PDF"""
+    matrices = encode_qr_codes([label["qr_code"] or label["label_code"] for label in labels], workers)
+    
+    page_width, page_height = A4
+    cell_width = (page_width - 2 * PAGE_MARGIN) / LABEL_COLUMNS
+    cell_height = (page_height - 2 * PAGE_MARGIN) / LABEL_ROWS
+    
+    pdf = canvas.Canvas(out, pagesize=A4, pageCompression=1)
+    pdf.setTitle("Etiquetas")
+    for index, (label, matrix) in enumerate(zip(labels, matrices)):
+        slot = index % LABELS_PER_PAGE
+        if index and not slot:
+            pdf.showPage()
+        row, column = divmod(slot, LABEL_COLUMNS)
+        x = PAGE_MARGIN + column * cell_width
+        y = page_height - PAGE_MARGIN - (row + 1) * cell_height
+        _draw_label(pdf, label, matrix, x, y, cell_height)
+    pdf.save()
@@ -0,0 +1,223 @@
+import argparse
+import asyncio
+import hashlib
+import io
+import json
+import logging
+import os
+import uuid
+from decimal import Decimal
+from functools import lru_cache
+from typing import Optional, Set, Tuple
+from jinja2 import Environment, FileSystemLoader, Template
+from reportlab.lib import colors
+from reportlab.lib.pagesizes import A4
+from reportlab.lib.styles import getSampleStyleSheet
+from reportlab.lib.units import mm
+from reportlab.platypus import Paragraph, SimpleDocTemplate, Spacer, Table, TableStyle
+from sqlalchemy import select
+from sqlalchemy.orm import Session, joinedload
+from starlette.concurrency import run_in_threadpool
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.models.crm import CommercialProposal
+from app.services.storage_service import StorageService, get_storage_service
+
+logger = logging.getLogger(__name__)
+
+PDF_BUCKET = "proposal-pdfs"
+TEMPLATE_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), "templates", "proposals")
+LANGUAGES = ("pt", "en", "es")
+DEFAULT_LANGUAGE = "pt"
+
+PROPOSAL_FIELDS = (
+    "proposal_number", "product_name", "product_description", "total_weight_kg", "unit_price",
+    "total_value", "currency", "incoterm", "delivery_time_days", "port_of_origin",
+    "port_of_destination", "payment_terms", "validity_days", "expires_at", "notes", "created_at"
+)
+CONTACT_FIELDS = ("company_name", "contact_name", "email", "country")
+
+# Built once; rendering only instantiates flowables
+STYLES = getSampleStyleSheet()
+TABLE_STYLE = TableStyle([
+    ("VALIGN", (0, 0), (-1, -1), "TOP"),
+    ("LINEBELOW", (0, 0), (-1, -1), 0.25, colors.lightgrey),
+    ("BOTTOMPADDING", (0, 0), (-1, -1), 4)
+])
+
+def _amount(value, places: int = 2, language: str = DEFAULT_LANGUAGE) -> str:
+    text = f"{Decimal(value):,.{places}f}"
+    if language != "en":
+        text = text.replace(",", "_").replace(".", ",").replace("_", ".")
+    return text
+
+def _date(value) -> str:
+    return value.strftime("%d/%m/%Y") if value else ""
+
+@lru_cache
+def get_template(language: str) -> Tuple[Template, str]:
+    """Compiled template for a language and the hash of its source"""
+    if language not in LANGUAGES:
+        language = DEFAULT_LANGUAGE
+    env = Environment(
+        loader=FileSystemLoader(TEMPLATE_DIR),
+        autoescape=True,
+        auto_reload=False,
+        trim_blocks=True,
+        lstrip_blocks=True
+    )
+    env.filters["amount"] = lambda value, places=2: _amount(value, places, language)
+    env.filters["date"] = _date
+    source, _, _ = env.loader.get_source(env, f"{language}.j2")
+    return env.get_template(f"{language}.j2"), hashlib.sha256(source.encode()).hexdigest()
+
+def proposal_context(proposal: CommercialProposal) -> dict:
+    contact = proposal.contact
+    return {
+        "proposal": {field: getattr(proposal, field) for field in PROPOSAL_FIELDS},
+        "contact": {field: getattr(contact, field) if contact else None for field in CONTACT_FIELDS}
+    }
+
+def proposal_content_hash(proposal: CommercialProposal) -> str:
+    """Hash of everything that ends up in the PDF, template included"""
+    _, template_hash = get_template(proposal.language or DEFAULT_LANGUAGE)
+    payload = json.dumps(proposal_context(proposal), default=str, sort_keys=True)
+    return hashlib.sha256(f"{proposal.language}|{template_hash}|{payload}".encode()).hexdigest()
+
+def _story(markup: str) -> list:
+    """Flowables for rendered template lines"""
+    story, rows = [], []
+    for line in markup.splitlines() + [""]:
+        line = line.strip()
+        if " | " in line:
+            label, value = line.split(" | ", 1)
+            rows.append([Paragraph(f"<b>{label}</b>", STYLES["BodyText"]), Paragraph(value, STYLES["BodyText"])])
+            continue
+        if rows:
+            story.append(Table(rows, colWidths=[45 * mm, None], style=TABLE_STYLE, hAlign="LEFT"))
+            rows = []
+        if line.startswith("## "):
+            story.append(Paragraph(line[3:], STYLES["Heading2"]))
+        elif line.startswith("# "):
+            story.append(Paragraph(line[2:], STYLES["Title"]))
+        elif line:
+            story.append(Paragraph(line, STYLES["BodyText"]))
+        else:
+            story.append(Spacer(1, 3 * mm))
+    return story
+
+def render_proposal_pdf(proposal: CommercialProposal) -> bytes:
+    template, _ = get_template(proposal.language or DEFAULT_LANGUAGE)
+    out = io.BytesIO()
+    doc = SimpleDocTemplate(
+        out, pagesize=A4, title=proposal.proposal_number,
+        leftMargin=20 * mm, rightMargin=20 * mm, topMargin=20 * mm, bottomMargin=20 * mm
+    )
+    doc.build(_story(template.render(**proposal_context(proposal))))
+    return out.getvalue()
+
+def update_proposal_pdf(db: Session, storage: StorageService, proposal_id, force: bool = False) -> bool:
+    """
+    Render and upload a proposal PDF unless its content hash is unchanged;
+    returns whether a new PDF was stored. Commits.
+    """
+    proposal = db.get(CommercialProposal, proposal_id, options=[joinedload(CommercialProposal.contact)])
+    if proposal is None:
+        return False
+    
+    content_hash = proposal_content_hash(proposal)
+    if not force and proposal.pdf_file_path and proposal.pdf_content_hash == content_hash:
+        return False
+    
+    body = render_proposal_pdf(proposal)
+    # Versioned by content, so cached presigned URLs never serve a stale PDF
+    object_name = f"{proposal.id}/{content_hash[:16]}.pdf"
+    storage.upload_stream(PDF_BUCKET, object_name, io.BytesIO(body), len(body), "application/pdf")
+    
+    proposal.pdf_file_path = object_name
+    proposal.pdf_content_hash = content_hash
+    db.commit()
+    return True
+
+def stale_proposal_ids(db: Session) -> list:
+    """Proposals without a PDF or whose content or template changed since it was rendered"""
+    candidates = db.scalars(
+        select(CommercialProposal)
+        .options(joinedload(CommercialProposal.contact))
+        .execution_options(yield_per=500)
+    )
+    return [
+        proposal.id for proposal in candidates
+        if not proposal.pdf_file_path or proposal.pdf_content_hash != proposal_content_hash(proposal)
+    ]
+
+def _render_in_session(proposal_id) -> bool:
+    with SessionLocal() as db:
+        return update_proposal_pdf(db, get_storage_service(), proposal_id)
+
+class ProposalPdfWorker:
+    """
+    In-process render queue. Handlers enqueue proposal ids and return;
+    worker tasks render in the thread pool. Repeated requests for a
+    proposal already waiting in the queue are coalesced.
+    """
+    def __init__(self, concurrency: int):
+        self.concurrency = concurrency
+        self.queue: Optional[asyncio.Queue] = None
+        self._pending: Set = set()
+        self._tasks = []
+    
+    def start(self):
+        # Compile every template up front instead of on the first render
+        for language in LANGUAGES:
+            get_template(language)
+        self.queue = asyncio.Queue()
+        self._tasks = [asyncio.create_task(self._run()) for _ in range(self.concurrency)]
+    
+    async def stop(self):
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+    
+    def enqueue(self, proposal_id):
+        if self.queue is None or proposal_id in self._pending:
+            return
+        self._pending.add(proposal_id)
+        self.queue.put_nowait(proposal_id)
+    
+    async def _run(self):
+        while True:
+            proposal_id = await self.queue.get()
+            # Edits made while rendering queue a fresh job
+            self._pending.discard(proposal_id)
+            try:
+                await run_in_threadpool(_render_in_session, proposal_id)
+            except Exception:
+                logger.exception("Proposal PDF rendering failed for %s", proposal_id)
+            finally:
+                self.queue.task_done()
+
+proposal_pdf_worker = ProposalPdfWorker(settings.PROPOSAL_PDF_WORKERS)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Render proposal PDFs")
+    parser.add_argument("command", choices=["render-stale", "render"])
+    parser.add_argument("--proposal-id", help="Proposal to re-render with the render command")
+    args = parser.parse_args()
+    
+    if args.command == "render" and not args.proposal_id:
+        parser.error("render requires --proposal-id")
+    
+    storage = get_storage_service()
+    db = SessionLocal()
+    try:
+        if args.command == "render":
+            update_proposal_pdf(db, storage, uuid.UUID(args.proposal_id), force=True)
+            print(f"Rendered proposal {args.proposal_id}")
+        else:
+            proposal_ids = stale_proposal_ids(db)
+            rendered = sum(update_proposal_pdf(db, storage, proposal_id) for proposal_id in proposal_ids)
+            print(f"Rendered {rendered} of {len(proposal_ids)} stale proposal PDFs")
+    finally:
+        db.close()
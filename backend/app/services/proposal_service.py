@@ -1,20 +1,38 @@
+from datetime import date, datetime
+from decimal import Decimal
+from typing import Optional
+from sqlalchemy.orm import Session
+from app.core.config import settings
+from app.models.financial import CurrencyCode
+from app.services.fx_service import get_rates, to_brl
+from app.services.sequence_service import BlockAllocator
 
-from datetime import datetime
-import uuid
+proposal_numbers = BlockAllocator(settings.PROPOSAL_NUMBER_BLOCK_SIZE)
 
-def generate_proposal_number() -> str:
-    """Generate a unique proposal number"""
+async def generate_proposal_number() -> str:
+    """Generate a unique proposal number, sequential per day"""
     timestamp = datetime.now().strftime("%Y%m%d")
-    short_uuid = str(uuid.uuid4())[:8].upper()
-    return f"PROP-{timestamp}-{short_uuid}"
+    sequence = await proposal_numbers.next_value("proposals", timestamp)
+    return f"PROP-{timestamp}-{sequence:06d}"
 
-def calculate_proposal_totals(unit_price: float, quantity: float, currency: str = "USD"):
-    """Calculate proposal totals with currency conversion if needed"""
+def calculate_proposal_totals(
+    db: Session,
+    unit_price: Decimal,
+    quantity: Decimal,
+    currency: str = "USD",
+    on_date: Optional[date] = None
+):
+    """Calculate proposal totals, with the BRL equivalent when a rate is known"""
     total_value = unit_price * quantity
     
-    # Here you could add currency conversion logic
-    # For now, returning the basic calculation
+    exchange_rate = None
+    if currency in CurrencyCode.__members__:
+        key = (CurrencyCode[currency], on_date or date.today())
+        exchange_rate = get_rates(db, [key], strict=False).get(key)
+    
     return {
         "total_value": total_value,
-        "currency": currency
+        "currency": currency,
+        "exchange_rate": exchange_rate,
+        "total_value_brl": to_brl(total_value, exchange_rate) if exchange_rate is not None else None
     }
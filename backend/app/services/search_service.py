@@ -0,0 +1,264 @@
+import heapq
+import re
+import threading
+from bisect import bisect_left
+from collections import defaultdict
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+from sqlalchemy import event, func, or_, select
+from sqlalchemy.orm import Session
+from app.core.config import settings
+from app.models.crm import (
+    CONTACT_SEARCH_VECTOR, INTERACTION_SEARCH_VECTOR, PROPOSAL_SEARCH_VECTOR, SEARCH_CONFIG,
+    CommercialProposal, CrmContact, CrmInteraction
+)
+
+SEARCH_TYPES = ("contact", "interaction", "proposal")
+
+# pg_trgm's default similarity threshold, also used by the fallback index
+TRIGRAM_THRESHOLD = 0.3
+
+SNIPPET_LENGTH = 120
+
+# Field weights in the fallback index; names count more than notes
+SEARCH_FIELDS = {
+    "contact": {"company_name": 1.0, "contact_name": 1.0, "city": 0.6, "general_notes": 0.3},
+    "interaction": {"feedback": 0.5},
+    "proposal": {"product_name": 1.0}
+}
+SEARCH_MODELS = {CrmContact: "contact", CrmInteraction: "interaction", CommercialProposal: "proposal"}
+
+TERM_PATTERN = re.compile(r"\w+")
+
+DocKey = Tuple[str, object]
+# (key, displayed document, token weights)
+IndexEntry = Tuple[DocKey, dict, Dict[str, float]]
+
+def search_terms(text: str) -> List[str]:
+    return TERM_PATTERN.findall(text.casefold())
+
+def prefix_tsquery(terms: List[str]) -> str:
+    """Every term as a prefix, all required; terms are word characters only"""
+    return " & ".join(f"{term}:*" for term in terms)
+
+def _snippet(text: Optional[str]) -> Optional[str]:
+    if text and len(text) > SNIPPET_LENGTH:
+        return text[:SNIPPET_LENGTH - 1].rstrip() + "…"
+    return text
+
+def search_document(record) -> dict:
+    """What a search hit shows for a contact, interaction or proposal"""
+    kind = SEARCH_MODELS[type(record)]
+    if kind == "contact":
+        return {
+            "type": kind, "id": record.id, "contact_id": record.id,
+            "title": record.company_name, "snippet": record.contact_name
+        }
+    if kind == "interaction":
+        return {
+            "type": kind, "id": record.id, "contact_id": record.contact_id,
+            "title": _snippet(record.feedback), "snippet": None
+        }
+    return {
+        "type": kind, "id": record.id, "contact_id": record.contact_id,
+        "title": record.product_name, "snippet": record.proposal_number
+    }
+
+# PostgreSQL: tsvector and pg_trgm GIN indexes
+
+def _search_postgres(db: Session, text: str, terms: List[str], types: Iterable[str], limit: int) -> List[dict]:
+    query = func.to_tsquery(SEARCH_CONFIG, prefix_tsquery(terms))
+    hits = []
+    
+    if "contact" in types:
+        score = func.ts_rank(CONTACT_SEARCH_VECTOR, query) + func.greatest(
+            func.similarity(CrmContact.company_name, text), func.similarity(CrmContact.contact_name, text)
+        )
+        rows = db.execute(
+            select(CrmContact, score.label("score"))
+            .where(or_(
+                CONTACT_SEARCH_VECTOR.op("@@")(query),
+                CrmContact.company_name.op("%")(text),
+                CrmContact.contact_name.op("%")(text)
+            ))
+            .order_by(score.desc())
+            .limit(limit)
+        ).all()
+        hits += [{**search_document(contact), "score": float(score)} for contact, score in rows]
+    
+    if "interaction" in types:
+        # Every match is ranked; an unordered pre-limit would drop the best ones
+        score = func.ts_rank(INTERACTION_SEARCH_VECTOR, query)
+        rows = db.execute(
+            select(CrmInteraction, score.label("score"))
+            .where(INTERACTION_SEARCH_VECTOR.op("@@")(query))
+            .order_by(score.desc(), CrmInteraction.interaction_date.desc())
+            .limit(limit)
+        ).all()
+        hits += [{**search_document(interaction), "score": float(score)} for interaction, score in rows]
+    
+    if "proposal" in types:
+        score = func.ts_rank(PROPOSAL_SEARCH_VECTOR, query) + func.similarity(CommercialProposal.product_name, text)
+        rows = db.execute(
+            select(CommercialProposal, score.label("score"))
+            .where(or_(PROPOSAL_SEARCH_VECTOR.op("@@")(query), CommercialProposal.product_name.op("%")(text)))
+            .order_by(score.desc())
+            .limit(limit)
+        ).all()
+        hits += [{**search_document(proposal), "score": float(score)} for proposal, score in rows]
+    
+    return hits
+
+# Fallback: in-process inverted index, for SQLite where neither exists
+
+def index_entry(record) -> IndexEntry:
+    document = search_document(record)
+    tokens: Dict[str, float] = {}
+    for field, weight in SEARCH_FIELDS[document["type"]].items():
+        for token in search_terms(getattr(record, field) or ""):
+            tokens[token] = max(tokens.get(token, 0.0), weight)
+    return (document["type"], document["id"]), document, tokens
+
+def trigrams(word: str) -> Set[str]:
+    padded = f"  {word} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+def trigram_similarity(a: str, b: str) -> float:
+    first, second = trigrams(a), trigrams(b)
+    return len(first & second) / len(first | second)
+
+class SearchIndex:
+    """
+    Inverted index over the searchable CRM fields, loaded on first use and
+    kept current from committed ORM writes. Terms match tokens by prefix,
+    or by trigram similarity when nothing starts with them. Only valid for
+    a single process, which is what the SQLite test setup runs.
+    """
+    def __init__(self):
+        self.loaded = False
+        self._lock = threading.RLock()
+        self._documents: Dict[DocKey, dict] = {}
+        self._tokens: Dict[DocKey, Dict[str, float]] = {}
+        # token -> search type -> documents
+        self._postings: Dict[str, Dict[str, Set[DocKey]]] = defaultdict(lambda: defaultdict(set))
+        self._vocabulary: List[str] = []
+    
+    def load(self, db: Session):
+        with self._lock:
+            if self.loaded:
+                return
+            for model in SEARCH_MODELS:
+                for record in db.scalars(select(model).execution_options(yield_per=1000)):
+                    self._add(*index_entry(record))
+            self.loaded = True
+    
+    def apply(self, changes: Dict[DocKey, Optional[IndexEntry]]):
+        """Index committed records; None entries remove deleted ones"""
+        with self._lock:
+            if not self.loaded:
+                return
+            for key, entry in changes.items():
+                self._remove(key)
+                if entry is not None:
+                    self._add(*entry)
+    
+    def _add(self, key: DocKey, document: dict, tokens: Dict[str, float]):
+        self._documents[key] = document
+        self._tokens[key] = tokens
+        for token in tokens:
+            postings = self._postings[token]
+            if not postings:
+                self._vocabulary.insert(bisect_left(self._vocabulary, token), token)
+            postings[key[0]].add(key)
+    
+    def _remove(self, key: DocKey):
+        self._documents.pop(key, None)
+        for token in self._tokens.pop(key, {}):
+            postings = self._postings[token]
+            postings[key[0]].discard(key)
+            if not postings[key[0]]:
+                del postings[key[0]]
+            if not postings:
+                del self._postings[token]
+                self._vocabulary.pop(bisect_left(self._vocabulary, token))
+    
+    def _expand(self, term: str) -> Dict[str, float]:
+        """Vocabulary tokens a query term matches, with a match quality"""
+        start = bisect_left(self._vocabulary, term)
+        matches = {}
+        for token in self._vocabulary[start:]:
+            if not token.startswith(term):
+                break
+            matches[token] = 1.0 if token == term else 0.8
+        if not matches:
+            for token in self._vocabulary:
+                similarity = trigram_similarity(term, token)
+                if similarity >= TRIGRAM_THRESHOLD:
+                    matches[token] = similarity * 0.8
+        return matches
+    
+    def search(self, terms: List[str], types: Iterable[str], limit: int) -> List[dict]:
+        with self._lock:
+            expanded = [self._expand(term) for term in terms]
+            # Every term must match, as in the tsquery: intersect before scoring
+            matches: List[Set[DocKey]] = []
+            for tokens in expanded:
+                keys: Set[DocKey] = set()
+                for token in tokens:
+                    for kind in types:
+                        keys.update(self._postings[token].get(kind, ()))
+                matches.append(keys)
+            matches.sort(key=len)
+            candidates = set.intersection(*matches) if matches else set()
+            
+            def score(key: DocKey) -> float:
+                weights = self._tokens[key]
+                return sum(
+                    max(quality * weights[token] for token, quality in tokens.items() if token in weights)
+                    for tokens in expanded
+                )
+            
+            ranked = heapq.nlargest(limit, ((score(key), key) for key in candidates), key=lambda hit: hit[0])
+            return [{**self._documents[key], "score": round(total, 4)} for total, key in ranked]
+
+search_index = SearchIndex()
+
+def use_fallback_index() -> bool:
+    return not settings.DATABASE_URL.startswith("postgresql")
+
+if use_fallback_index():
+    # Entries are built at flush time: after the commit the records are expired
+    @event.listens_for(Session, "after_flush")
+    def _collect_search_changes(session, flush_context):
+        changes = session.info.setdefault("search_changes", {})
+        for record in session.new | session.dirty:
+            if type(record) in SEARCH_MODELS:
+                entry = index_entry(record)
+                changes[entry[0]] = entry
+        for record in session.deleted:
+            if type(record) in SEARCH_MODELS:
+                changes[(SEARCH_MODELS[type(record)], record.id)] = None
+    
+    @event.listens_for(Session, "after_commit")
+    def _apply_search_changes(session):
+        changes = session.info.pop("search_changes", None)
+        if changes:
+            search_index.apply(changes)
+    
+    @event.listens_for(Session, "after_rollback")
+    def _discard_search_changes(session):
+        session.info.pop("search_changes", None)
+
+def search(db: Session, text: str, types: Iterable[str] = SEARCH_TYPES, limit: int = 20) -> List[dict]:
+    """Ranked contacts, interactions and proposals matching every word of text as a prefix"""
+    terms = search_terms(text)
+    if not terms:
+        return []
+    types = set(types)
+    
+    if use_fallback_index():
+        search_index.load(db)
+        return search_index.search(terms, types, limit)
+    
+    hits = _search_postgres(db, text, terms, types, limit)
+    hits.sort(key=lambda hit: hit["score"], reverse=True)
+    return hits[:limit]
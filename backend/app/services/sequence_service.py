@@ -0,0 +1,53 @@
+import asyncio
+from typing import Dict, List, Tuple
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+from app.core.database import AsyncSessionLocal, dialect_insert
+from app.models.sequence import NumberSequence
+
+def reserve_range(db: Session, name: str, count: int, start: int = 1) -> int:
+    """
+    Reserve count consecutive values of a named sequence in one statement
+    and return the first. The sequence row stays locked until the caller
+    commits, so concurrent reservations never overlap.
+    """
+    stmt = dialect_insert(db)(NumberSequence).values(name=name, next_value=start + count)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[NumberSequence.name],
+        set_={"next_value": NumberSequence.next_value + count, "updated_at": func.now()}
+    ).returning(NumberSequence.next_value)
+    return db.execute(stmt).scalar_one() - count
+
+async def reserve_block(name: str, count: int) -> int:
+    """reserve_range in its own short transaction, releasing the row lock at once"""
+    async with AsyncSessionLocal() as db:
+        first = await db.run_sync(reserve_range, name, count)
+        await db.commit()
+    return first
+
+class BlockAllocator:
+    """
+    Hands out sequence values from blocks reserved in the database, so
+    only one number in block_size costs a round trip. Values are unique
+    across processes and increasing within one; a process that stops
+    mid-block leaves a gap. A series restarting each period (a day, say)
+    is stored as "<series>:<period>", and only the current period's block
+    is kept in memory.
+    """
+    def __init__(self, block_size: int):
+        self.block_size = block_size
+        # series -> (period, [next value, end of block])
+        self._blocks: Dict[str, Tuple[str, List[int]]] = {}
+        self._lock = asyncio.Lock()
+    
+    async def next_value(self, series: str, period: str) -> int:
+        async with self._lock:
+            current = self._blocks.get(series)
+            if current is None or current[0] != period or current[1][0] >= current[1][1]:
+                first = await reserve_block(f"{series}:{period}", self.block_size)
+                # Replaces the previous period's block, which is never used again
+                current = self._blocks[series] = (period, [first, first + self.block_size])
+            block = current[1]
+            value = block[0]
+            block[0] += 1
+            return value
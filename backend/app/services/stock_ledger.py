@@ -0,0 +1,225 @@
+import random
+from datetime import datetime, timezone
+from decimal import Decimal
+from typing import List, Optional
+from sqlalchemy import case, delete, func, insert, literal, select, union_all
+from sqlalchemy.orm import Session
+from app.core.config import settings
+from app.core.database import dialect_insert
+from app.models.storage import (
+    NO_LOT, MovementType, StockBalanceShard, StockMovement, StockSnapshot, StockSnapshotBalance
+)
+
+BALANCE_KEY = ["storage_area_id", "reception_id", "shard"]
+
+def movement_deltas(movement: StockMovement) -> List[tuple]:
+    """(storage_area_id, lot, signed quantity) changes caused by one movement"""
+    lot = movement.reception_id or NO_LOT
+    quantity = Decimal(movement.quantity_kg)
+    deltas = []
+    
+    if movement.movement_type != MovementType.SAIDA:
+        inbound = movement.destination_area_id or movement.storage_area_id
+        if inbound:
+            deltas.append((inbound, lot, quantity))
+    if movement.movement_type != MovementType.ENTRADA:
+        if movement.movement_type == MovementType.SAIDA:
+            outbound = movement.origin_area_id or movement.storage_area_id
+        else:
+            outbound = movement.origin_area_id
+        if outbound:
+            deltas.append((outbound, lot, -quantity))
+    
+    return deltas
+
+def _ledger_deltas(after: Optional[datetime] = None, until: Optional[datetime] = None) -> list:
+    """SQL counterpart of movement_deltas over a window of the ledger, as selects to union"""
+    lot = func.coalesce(StockMovement.reception_id, literal(NO_LOT, StockMovement.reception_id.type))
+    inbound_area = func.coalesce(StockMovement.destination_area_id, StockMovement.storage_area_id)
+    outbound_area = case(
+        (StockMovement.movement_type == MovementType.SAIDA,
+         func.coalesce(StockMovement.origin_area_id, StockMovement.storage_area_id)),
+        else_=StockMovement.origin_area_id
+    )
+    
+    window = []
+    if after is not None:
+        window.append(StockMovement.movement_date > after)
+    if until is not None:
+        window.append(StockMovement.movement_date <= until)
+    
+    inbound = select(
+        inbound_area.label("storage_area_id"), lot.label("reception_id"), StockMovement.quantity_kg.label("quantity_kg")
+    ).where(StockMovement.movement_type != MovementType.SAIDA, inbound_area.isnot(None), *window)
+    outbound = select(
+        outbound_area.label("storage_area_id"), lot.label("reception_id"), (-StockMovement.quantity_kg).label("quantity_kg")
+    ).where(StockMovement.movement_type != MovementType.ENTRADA, outbound_area.isnot(None), *window)
+    return [inbound, outbound]
+
+def record_movement(db: Session, movement: StockMovement):
+    """Append a movement to the ledger and apply it to a random balance shard"""
+    db.add(movement)
+    deltas = movement_deltas(movement)
+    if not deltas:
+        return
+    
+    # One shard per movement keeps all of its rows in a consistent lock order
+    shard = random.randrange(settings.STOCK_BALANCE_SHARDS)
+    rows = [
+        {"storage_area_id": area_id, "reception_id": lot, "shard": shard, "quantity_kg": quantity}
+        for area_id, lot, quantity in sorted(deltas, key=lambda delta: (str(delta[0]), str(delta[1])))
+    ]
+    stmt = dialect_insert(db)(StockBalanceShard)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=BALANCE_KEY,
+        set_={
+            "quantity_kg": StockBalanceShard.quantity_kg + stmt.excluded.quantity_kg,
+            "updated_at": func.now()
+        }
+    )
+    db.execute(stmt, rows)
+
+def current_balances(storage_area_id=None, reception_id=None):
+    """Current per-area/per-lot balances summed over their shards"""
+    stmt = (
+        select(
+            StockBalanceShard.storage_area_id,
+            StockBalanceShard.reception_id,
+            func.sum(StockBalanceShard.quantity_kg).label("quantity_kg")
+        )
+        .group_by(StockBalanceShard.storage_area_id, StockBalanceShard.reception_id)
+    )
+    if storage_area_id:
+        stmt = stmt.where(StockBalanceShard.storage_area_id == storage_area_id)
+    if reception_id:
+        stmt = stmt.where(StockBalanceShard.reception_id == reception_id)
+    return stmt
+
+def balances_as_of(db: Session, as_of: datetime, storage_area_id=None, reception_id=None):
+    """
+    Balances at a past instant: the nearest snapshot at or before it plus
+    the ledger movements recorded after that snapshot, up to as_of.
+    """
+    snapshot = db.execute(
+        select(StockSnapshot.id, StockSnapshot.taken_at)
+        .where(StockSnapshot.taken_at <= as_of)
+        .order_by(StockSnapshot.taken_at.desc())
+        .limit(1)
+    ).first()
+    
+    parts = _ledger_deltas(after=snapshot.taken_at if snapshot else None, until=as_of)
+    if snapshot:
+        parts.append(
+            select(
+                StockSnapshotBalance.storage_area_id,
+                StockSnapshotBalance.reception_id,
+                StockSnapshotBalance.quantity_kg
+            ).where(StockSnapshotBalance.snapshot_id == snapshot.id)
+        )
+    
+    rows = union_all(*parts).subquery()
+    stmt = (
+        select(rows.c.storage_area_id, rows.c.reception_id, func.sum(rows.c.quantity_kg).label("quantity_kg"))
+        .group_by(rows.c.storage_area_id, rows.c.reception_id)
+    )
+    if storage_area_id:
+        stmt = stmt.where(rows.c.storage_area_id == storage_area_id)
+    if reception_id:
+        stmt = stmt.where(rows.c.reception_id == reception_id)
+    return stmt
+
+def get_balances(db: Session, storage_area_id=None, reception_id=None, as_of: Optional[datetime] = None) -> List[dict]:
+    """Per-area/per-lot balances, current or as of a past instant"""
+    if as_of is None:
+        stmt = current_balances(storage_area_id, reception_id)
+    else:
+        stmt = balances_as_of(db, as_of, storage_area_id, reception_id)
+    return [
+        {
+            "storage_area_id": area_id,
+            "reception_id": None if lot == NO_LOT else lot,
+            "quantity_kg": quantity
+        }
+        for area_id, lot, quantity in db.execute(stmt)
+    ]
+
+def take_snapshot(db: Session, as_of: Optional[datetime] = None) -> StockSnapshot:
+    """
+    Materialize balances as of an instant (default now). Movements back-dated
+    before an existing snapshot are not reflected in it, so take snapshots
+    with some lag behind the present when back-dating is common.
+    """
+    as_of = as_of or datetime.now(timezone.utc)
+    balances = balances_as_of(db, as_of).subquery()
+    
+    snapshot = StockSnapshot(taken_at=as_of)
+    db.add(snapshot)
+    db.flush()
+    db.execute(
+        insert(StockSnapshotBalance).from_select(
+            ["snapshot_id", "storage_area_id", "reception_id", "quantity_kg"],
+            select(
+                literal(snapshot.id, StockSnapshotBalance.snapshot_id.type),
+                balances.c.storage_area_id,
+                balances.c.reception_id,
+                balances.c.quantity_kg
+            ).where(balances.c.quantity_kg != 0)
+        )
+    )
+    db.commit()
+    return snapshot
+
+def rebuild_balances(db: Session) -> int:
+    """Recompute balances from the full ledger, collapsing shards into shard 0"""
+    deltas = union_all(*_ledger_deltas()).subquery()
+    db.execute(delete(StockBalanceShard))
+    db.execute(
+        insert(StockBalanceShard).from_select(
+            ["storage_area_id", "reception_id", "shard", "quantity_kg"],
+            select(deltas.c.storage_area_id, deltas.c.reception_id, literal(0), func.sum(deltas.c.quantity_kg))
+            .group_by(deltas.c.storage_area_id, deltas.c.reception_id)
+        )
+    )
+    db.commit()
+    return db.scalar(select(func.count()).select_from(StockBalanceShard))
+
+def verify_balances(db: Session) -> List[tuple]:
+    """Return (storage_area_id, reception_id, sharded, ledger) for mismatching balances"""
+    sharded = {(row[0], row[1]): row[2] for row in db.execute(current_balances())}
+    deltas = union_all(*_ledger_deltas()).subquery()
+    ledger = {
+        (row[0], row[1]): row[2]
+        for row in db.execute(
+            select(deltas.c.storage_area_id, deltas.c.reception_id, func.sum(deltas.c.quantity_kg))
+            .group_by(deltas.c.storage_area_id, deltas.c.reception_id)
+        )
+    }
+    return [
+        (*key, sharded.get(key, Decimal("0")), ledger.get(key, Decimal("0")))
+        for key in sharded.keys() | ledger.keys()
+        if Decimal(sharded.get(key) or 0) != Decimal(ledger.get(key) or 0)
+    ]
+
+if __name__ == "__main__":
+    import argparse
+    import sys
+    from app.core.database import SessionLocal
+    
+    parser = argparse.ArgumentParser(description="Maintain the stock ledger balances and snapshots")
+    parser.add_argument("command", choices=["snapshot", "rebuild", "verify"])
+    args = parser.parse_args()
+    
+    db = SessionLocal()
+    try:
+        if args.command == "snapshot":
+            print(f"Snapshot taken at {take_snapshot(db).taken_at.isoformat()}")
+        elif args.command == "rebuild":
+            print(f"Balances rebuilt with {rebuild_balances(db)} area/lot rows")
+        else:
+            mismatches = verify_balances(db)
+            for mismatch in mismatches:
+                print(mismatch)
+            print(f"{len(mismatches)} mismatching balances")
+            sys.exit(1 if mismatches else 0)
+    finally:
+        db.close()
@@ -1,66 +1,268 @@
-
 from minio import Minio
 from minio.error import S3Error
 from fastapi import UploadFile
+from starlette.concurrency import run_in_threadpool
+from functools import lru_cache
+from datetime import datetime, timedelta, timezone
+from redis.exceptions import RedisError
+from typing import AsyncIterator, BinaryIO, Iterator, List, Optional, Tuple
+import asyncio
+import certifi
+import hashlib
+import json
+import logging
+import threading
+import urllib3
 import uuid
+from app.core.cache import build_cache_backend
 from app.core.config import settings
 
+logger = logging.getLogger(__name__)
+
+BUCKETS = (
+    "financial-documents",
+    "proposal-pdfs",
+    "user-avatars",
+    "expedition-documents",
+    "certificates",
+    "document-blobs"
+)
+
+# Content-addressed blobs shared by financial and expedition documents
+BLOB_BUCKET = "document-blobs"
+
+class HashingReader:
+    """File-like wrapper that checksums data as the uploader reads it"""
+    def __init__(self, raw: BinaryIO):
+        self.raw = raw
+        self.size = 0
+        self._sha256 = hashlib.sha256()
+    
+    def read(self, size: int = -1) -> bytes:
+        data = self.raw.read(size)
+        self._sha256.update(data)
+        self.size += len(data)
+        return data
+    
+    @property
+    def sha256(self) -> str:
+        return self._sha256.hexdigest()
+
+class AsyncIteratorReader:
+    """
+    Blocking file-like view of an async byte iterator, for use from a
+    worker thread while the iterator is consumed on the event loop.
+    """
+    def __init__(self, chunks: AsyncIterator[bytes], loop: asyncio.AbstractEventLoop):
+        self._chunks = chunks.__aiter__()
+        self._loop = loop
+        self._buffer = bytearray()
+        self._eof = False
+    
+    def _next_chunk(self) -> bytes:
+        future = asyncio.run_coroutine_threadsafe(self._chunks.__anext__(), self._loop)
+        try:
+            return future.result()
+        except StopAsyncIteration:
+            self._eof = True
+            return b""
+    
+    def read(self, size: int = -1) -> bytes:
+        while not self._eof and (size < 0 or len(self._buffer) < size):
+            self._buffer += self._next_chunk()
+        if size < 0:
+            size = len(self._buffer)
+        data = bytes(self._buffer[:size])
+        del self._buffer[:size]
+        return data
+
+class PresignedUrlCache:
+    """
+    Signed GET URLs keyed by object and lifetime, reused until
+    refresh_margin seconds before they expire.
+    """
+    def __init__(self, backend, refresh_margin: int):
+        self.backend = backend
+        self.refresh_margin = refresh_margin
+    
+    def key(self, bucket: str, object_name: str, expires_in: int) -> str:
+        return f"presigned:{expires_in}:{bucket}/{object_name}"
+    
+    async def get_many(self, keys: List[str]) -> List[Optional[dict]]:
+        if self.backend is None or not keys:
+            return [None] * len(keys)
+        try:
+            values = await self.backend.mget(keys)
+        except RedisError as e:
+            logger.warning("Presigned URL cache read failed: %s", e)
+            return [None] * len(keys)
+        return [json.loads(value) if value else None for value in values]
+    
+    async def set_many(self, entries: dict, expires_in: int):
+        ttl = expires_in - self.refresh_margin
+        if self.backend is None or ttl <= 0:
+            return
+        try:
+            for key, entry in entries.items():
+                await self.backend.set(key, json.dumps(entry), ttl)
+        except RedisError as e:
+            logger.warning("Presigned URL cache write failed: %s", e)
+
+@lru_cache
+def get_minio_client() -> Minio:
+    """Shared MinIO client; its urllib3 pool is reused by every thread"""
+    http_client = urllib3.PoolManager(
+        timeout=urllib3.util.Timeout(
+            connect=settings.STORAGE_CONNECT_TIMEOUT,
+            read=settings.STORAGE_READ_TIMEOUT
+        ),
+        maxsize=settings.STORAGE_POOL_MAXSIZE,
+        block=True,
+        cert_reqs="CERT_REQUIRED",
+        ca_certs=certifi.where(),
+        retries=urllib3.Retry(total=3, backoff_factor=0.2, status_forcelist=[500, 502, 503, 504])
+    )
+    return Minio(
+        settings.MINIO_ENDPOINT,
+        access_key=settings.MINIO_ACCESS_KEY,
+        secret_key=settings.MINIO_SECRET_KEY,
+        secure=settings.MINIO_SECURE,
+        region=settings.MINIO_REGION,
+        http_client=http_client
+    )
+
 class StorageService:
+    """
+    Creating the service does no I/O; the client is built on first use and
+    buckets are provisioned once by ensure_buckets() at startup.
+    """
     def __init__(self):
-        self.client = Minio(
-            settings.MINIO_ENDPOINT,
-            access_key=settings.MINIO_ACCESS_KEY,
-            secret_key=settings.MINIO_SECRET_KEY,
-            secure=settings.MINIO_SECURE
+        self._buckets_ready = False
+        self._buckets_lock = threading.Lock()
+        self.url_cache = PresignedUrlCache(
+            build_cache_backend(
+                settings.PRESIGNED_URL_CACHE_BACKEND, settings.PRESIGNED_URL_CACHE_MAX_ENTRIES
+            ),
+            settings.PRESIGNED_URL_REFRESH_MARGIN_SECONDS
         )
-        self._ensure_buckets()
-    
-    def _ensure_buckets(self):
-        """Ensure required buckets exist"""
-        buckets = [
-            "financial-documents",
-            "proposal-pdfs", 
-            "user-avatars",
-            "expedition-documents",
-            "certificates"
-        ]
-        
-        for bucket in buckets:
+    
+    @property
+    def client(self) -> Minio:
+        return get_minio_client()
+    
+    def _ensure_buckets(self) -> bool:
+        """Ensure required buckets exist; cached after the first success"""
+        with self._buckets_lock:
+            if self._buckets_ready:
+                return True
             try:
-                if not self.client.bucket_exists(bucket):
-                    self.client.make_bucket(bucket)
-            except S3Error as e:
-                print(f"Error creating bucket {bucket}: {e}")
+                # One listing instead of a bucket_exists round-trip per bucket
+                existing = {bucket.name for bucket in self.client.list_buckets()}
+                for bucket in BUCKETS:
+                    if bucket not in existing:
+                        self.client.make_bucket(bucket)
+            except (S3Error, urllib3.exceptions.HTTPError) as e:
+                logger.warning("Storage bucket provisioning failed: %s", e)
+                return False
+            self._buckets_ready = True
+            return True
     
-    def upload_file(self, bucket: str, file: UploadFile, folder: str = ""):
-        """Upload file to MinIO"""
+    async def ensure_buckets(self) -> bool:
+        """Provision buckets from a worker thread"""
+        if self._buckets_ready:
+            return True
+        return await run_in_threadpool(self._ensure_buckets)
+    
+    def _object_name(self, filename: Optional[str], folder: str = "") -> str:
+        # Generate unique filename
+        filename = filename or ""
+        file_extension = filename.split('.')[-1] if '.' in filename else ''
+        unique_filename = f"{uuid.uuid4()}.{file_extension}" if file_extension else str(uuid.uuid4())
+        return f"{folder}/{unique_filename}" if folder else unique_filename
+    
+    def upload_stream(
+        self,
+        bucket: str,
+        object_name: str,
+        data: BinaryIO,
+        length: int = -1,
+        content_type: Optional[str] = None
+    ):
+        """
+        Stream data to MinIO in parts of STORAGE_PART_SIZE, uploading up to
+        STORAGE_PARALLEL_UPLOADS parts at once. Blocking; call off the event loop.
+        """
+        if not self._buckets_ready:
+            self._ensure_buckets()
+        
+        reader = HashingReader(data)
         try:
-            # Generate unique filename
-            file_extension = file.filename.split('.')[-1] if '.' in file.filename else ''
-            unique_filename = f"{uuid.uuid4()}.{file_extension}" if file_extension else str(uuid.uuid4())
-            
-            if folder:
-                object_name = f"{folder}/{unique_filename}"
-            else:
-                object_name = unique_filename
-            
-            # Upload file
-            self.client.put_object(
+            result = self.client.put_object(
                 bucket,
                 object_name,
-                file.file,
-                length=file.size or -1,
-                content_type=file.content_type
+                reader,
+                length=length,
+                content_type=content_type or "application/octet-stream",
+                part_size=settings.STORAGE_PART_SIZE,
+                num_parallel_uploads=settings.STORAGE_PARALLEL_UPLOADS
             )
-            
-            return {
-                "bucket": bucket,
-                "object_name": object_name,
-                "file_url": f"http://{settings.MINIO_ENDPOINT}/{bucket}/{object_name}"
-            }
-            
         except S3Error as e:
             raise Exception(f"Failed to upload file: {str(e)}")
+        
+        return {
+            "bucket": bucket,
+            "object_name": object_name,
+            "file_url": f"http://{settings.MINIO_ENDPOINT}/{bucket}/{object_name}",
+            "size": reader.size,
+            "sha256": reader.sha256,
+            "etag": result.etag
+        }
+    
+    def upload_file(self, bucket: str, file: UploadFile, folder: str = ""):
+        """Upload file to MinIO"""
+        return self.upload_stream(
+            bucket,
+            self._object_name(file.filename, folder),
+            file.file,
+            length=file.size if file.size is not None else -1,
+            content_type=file.content_type
+        )
+    
+    async def upload_file_async(self, bucket: str, file: UploadFile, folder: str = ""):
+        """Upload an UploadFile from a worker thread"""
+        return await run_in_threadpool(self.upload_file, bucket, file, folder)
+    
+    async def upload_body(
+        self,
+        bucket: str,
+        object_name: str,
+        chunks: AsyncIterator[bytes],
+        length: int = -1,
+        content_type: Optional[str] = None
+    ):
+        """Upload a request body as it arrives, without spooling it first"""
+        reader = AsyncIteratorReader(chunks, asyncio.get_running_loop())
+        return await run_in_threadpool(
+            self.upload_stream, bucket, object_name, reader, length, content_type
+        )
+    
+    def get_file_info(self, bucket: str, object_name: str):
+        """Object metadata, or None if the object does not exist"""
+        try:
+            return self.client.stat_object(bucket, object_name)
+        except S3Error as e:
+            if e.code in ("NoSuchKey", "NoSuchObject"):
+                return None
+            raise Exception(f"Failed to read file info: {str(e)}")
+    
+    def iter_file(self, bucket: str, object_name: str, offset: int = 0, length: int = 0) -> Iterator[bytes]:
+        """Yield the object (or a byte range of it) in STORAGE_DOWNLOAD_CHUNK_SIZE chunks"""
+        response = self.client.get_object(bucket, object_name, offset=offset, length=length)
+        try:
+            yield from response.stream(settings.STORAGE_DOWNLOAD_CHUNK_SIZE)
+        finally:
+            response.close()
+            response.release_conn()
     
     def get_file_url(self, bucket: str, object_name: str, expires_in_days: int = 7):
         """Generate presigned URL for file access"""
@@ -75,6 +277,47 @@ class StorageService:
         except S3Error as e:
             raise Exception(f"Failed to generate file URL: {str(e)}")
     
+    def _sign_urls(self, objects: List[Tuple[str, str]], expires_in: int) -> List[dict]:
+        """Presign GET URLs sharing one request time"""
+        request_date = datetime.now(timezone.utc)
+        expires_at = (request_date + timedelta(seconds=expires_in)).isoformat()
+        try:
+            return [
+                {
+                    "bucket": bucket,
+                    "object_name": object_name,
+                    "url": self.client.presigned_get_object(
+                        bucket,
+                        object_name,
+                        expires=timedelta(seconds=expires_in),
+                        request_date=request_date
+                    ),
+                    "expires_at": expires_at
+                }
+                for bucket, object_name in objects
+            ]
+        except S3Error as e:
+            raise Exception(f"Failed to generate file URL: {str(e)}")
+    
+    async def get_file_urls(self, objects: List[Tuple[str, str]], expires_in: Optional[int] = None) -> List[dict]:
+        """Presigned URLs for many objects, served from the cache where still fresh"""
+        expires_in = expires_in or settings.PRESIGNED_URL_EXPIRES_SECONDS
+        keys = [self.url_cache.key(bucket, object_name, expires_in) for bucket, object_name in objects]
+        urls = await self.url_cache.get_many(keys)
+        
+        missing = [i for i, url in enumerate(urls) if url is None]
+        if missing:
+            signed = await run_in_threadpool(
+                self._sign_urls, [objects[i] for i in missing], expires_in
+            )
+            for i, entry in zip(missing, signed):
+                urls[i] = entry
+            await self.url_cache.set_many(
+                {keys[i]: entry for i, entry in zip(missing, signed)}, expires_in
+            )
+        
+        return urls
+    
     def delete_file(self, bucket: str, object_name: str):
         """Delete file from MinIO"""
         try:
@@ -83,5 +326,7 @@ class StorageService:
         except S3Error as e:
             raise Exception(f"Failed to delete file: {str(e)}")
 
-# Global instance
-storage_service = StorageService()
+@lru_cache
+def get_storage_service() -> StorageService:
+    """Shared instance, created on first use"""
+    return StorageService()
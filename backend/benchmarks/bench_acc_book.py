@@ -0,0 +1,90 @@
+"""
+Open ACC book revaluation time, the work done on every USD rate change.
+
+Seeds tagged contracts and a USD rate into the configured DATABASE_URL,
+times the valuation, the stored cost refresh and the projection outflows,
+then removes the seeded rows:
+
+    python benchmarks/bench_acc_book.py --contracts 20000 --repeat 5
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+import uuid
+from datetime import date, timedelta
+from decimal import Decimal
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import delete, insert
+
+from app.core.database import Base, SessionLocal, engine
+from app.models.financial import AccContract, CurrencyCode
+from app.services.acc_service import exposure_ladder, get_acc_outflows, refresh_open_book, value_open_book
+from app.services.fx_service import upsert_rates
+
+BANK_NAME = "bench-acc-book"
+
+def seed(db, count: int, today: date):
+    rng = random.Random(42)
+    rows = []
+    for n in range(count):
+        contract_date = today - timedelta(days=rng.randint(0, 180))
+        rows.append({
+            "id": uuid.uuid4(),
+            "contract_number": f"BENCH-ACC-{n:07d}",
+            "bank_name": BANK_NAME,
+            "contract_date": contract_date,
+            "maturity_date": contract_date + timedelta(days=rng.randint(30, 360)),
+            "amount_usd": Decimal(rng.randint(10_000, 2_000_000)),
+            "exchange_rate": Decimal("5.1") + Decimal(rng.randint(0, 5000)) / 10000,
+            "advance_percentage": Decimal(rng.choice([70, 80, 100])),
+            "interest_rate": Decimal(rng.randint(400, 900)) / 100,
+            "iof_rate": Decimal("0.38")
+        })
+    db.execute(insert(AccContract), rows)
+    upsert_rates(db, [{"currency": CurrencyCode.USD, "rate_date": today, "rate": Decimal("5.4321"), "source": BANK_NAME}])
+    db.commit()
+
+def timed(label: str, repeat: int, fn):
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - started)
+    print(f"{label:<24} {best * 1000:9.1f} ms")
+    return result
+
+def main(contracts: int, repeat: int):
+    Base.metadata.create_all(bind=engine)
+    today = date.today()
+    db = SessionLocal()
+    try:
+        seed(db, contracts, today)
+        
+        valuations = timed("valuation", repeat, lambda: value_open_book(db, today))
+        timed("exposure ladder", repeat, lambda: exposure_ladder(valuations, today))
+        timed("projection outflows", repeat, lambda: get_acc_outflows(db, today, today + timedelta(days=365), today))
+        
+        def refresh():
+            count = refresh_open_book(db, today)
+            db.commit()
+            return count
+        
+        timed("refresh stored costs", repeat, refresh)
+        print(f"{len(valuations)} open contracts")
+    finally:
+        db.rollback()
+        db.execute(delete(AccContract).where(AccContract.bank_name == BANK_NAME))
+        db.commit()
+        db.close()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--contracts", type=int, default=20000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+    main(args.contracts, args.repeat)
@@ -0,0 +1,90 @@
+"""
+Bulk payable import throughput.
+
+Generates a CSV of synthetic payables and imports it with the batched
+importer from app.services.accounts_payable_service against DATABASE_URL.
+With --compare, a sample is also inserted one payable per transaction
+(the old per-request path) for reference:
+
+    python benchmarks/bench_bulk_import.py --rows 100000 --compare 1000
+"""
+
+import argparse
+import io
+import os
+import random
+import sys
+import time
+from datetime import date, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.core.database import SessionLocal
+from app.models.financial import AccountsPayable, CashFlow
+from app.models.user import User
+from app.schemas.financial import AccountsPayableCreate
+from app.services.accounts_payable_service import (
+    import_payable_csv, payable_amount_brl, payable_cash_flow_values
+)
+from app.services.cash_flow_service import apply_cash_flow_to_rollup
+
+CURRENCIES = [("BRL", ""), ("USD", "5.10"), ("EUR", "5.55")]
+
+def generate_csv(rows: int) -> bytes:
+    buffer = io.StringIO()
+    buffer.write("supplier_name,invoice_number,issue_date,due_date,amount,currency,exchange_rate\n")
+    today = date.today()
+    for i in range(rows):
+        currency, rate = random.choice(CURRENCIES)
+        due_date = today + timedelta(days=random.randint(0, 180))
+        buffer.write(
+            f"Fornecedor {i % 500},NF-{i},{today.isoformat()},{due_date.isoformat()},"
+            f"{random.randint(100, 100000) / 100},{currency},{rate}\n"
+        )
+    return buffer.getvalue().encode()
+
+def per_row_insert(db, rows, created_by):
+    for row in rows:
+        payable_data = AccountsPayableCreate.model_validate(row)
+        amount_brl = payable_amount_brl(payable_data.amount, payable_data.exchange_rate)
+        payable = AccountsPayable(**payable_data.model_dump(), amount_brl=amount_brl, created_by=created_by)
+        db.add(payable)
+        db.commit()
+        cash_flow = CashFlow(**payable_cash_flow_values(payable.id, payable_data, amount_brl, created_by))
+        db.add(cash_flow)
+        apply_cash_flow_to_rollup(db, cash_flow)
+        db.commit()
+
+def main(rows: int, compare: int):
+    db = SessionLocal()
+    user = db.query(User).first()
+    if user is None:
+        sys.exit("Create a user first (POST /api/auth/register)")
+    
+    payload = generate_csv(rows)
+    print(f"{rows} rows, {len(payload) / 1024 / 1024:.1f} MiB CSV")
+    
+    started = time.perf_counter()
+    result = import_payable_csv(db, io.BytesIO(payload), user.id)
+    elapsed = time.perf_counter() - started
+    print(f"    bulk: {result.inserted / elapsed:9.1f} rows/s ({elapsed:.2f} s, {result.failed} failed)")
+    
+    if compare:
+        import csv
+        sample = [
+            {key: value for key, value in row.items() if value}
+            for row in csv.DictReader(io.StringIO(generate_csv(compare).decode()))
+        ]
+        started = time.perf_counter()
+        per_row_insert(db, sample, user.id)
+        elapsed = time.perf_counter() - started
+        print(f" per-row: {compare / elapsed:9.1f} rows/s ({elapsed:.2f} s)")
+    
+    db.close()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=100000)
+    parser.add_argument("--compare", type=int, default=0, help="rows to insert one by one for reference")
+    args = parser.parse_args()
+    main(args.rows, args.compare)
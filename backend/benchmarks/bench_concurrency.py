@@ -0,0 +1,57 @@
+"""
+Requests/sec of an API endpoint at a fixed concurrency.
+
+Run it against a server started from each revision to compare before/after:
+
+    uvicorn app.main:app --workers 1
+    python benchmarks/bench_concurrency.py --url http://localhost:8000/api/crm/contacts \
+        --token <jwt> --concurrency 64 --requests 5000
+"""
+
+import argparse
+import asyncio
+import statistics
+import time
+import httpx
+
+async def run(url: str, token: str, concurrency: int, total: int, method: str, body: str):
+    headers = {"Authorization": f"Bearer {token}"} if token else {}
+    if body:
+        headers["Content-Type"] = "application/json"
+    latencies = []
+    errors = 0
+    queue = asyncio.Queue()
+    for _ in range(total):
+        queue.put_nowait(None)
+    
+    async with httpx.AsyncClient(timeout=60, limits=httpx.Limits(max_connections=concurrency)) as client:
+        async def worker():
+            nonlocal errors
+            while not queue.empty():
+                queue.get_nowait()
+                started = time.perf_counter()
+                response = await client.request(method, url, headers=headers, content=body or None)
+                latencies.append(time.perf_counter() - started)
+                if response.status_code >= 400:
+                    errors += 1
+        
+        started = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        elapsed = time.perf_counter() - started
+    
+    latencies.sort()
+    print(f"{total} requests, concurrency {concurrency}, {errors} errors")
+    print(f"throughput: {total / elapsed:.1f} req/s")
+    print(f"latency p50: {statistics.median(latencies) * 1000:.1f} ms, "
+          f"p95: {latencies[int(len(latencies) * 0.95) - 1] * 1000:.1f} ms")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", required=True)
+    parser.add_argument("--token", default="")
+    parser.add_argument("--method", default="GET")
+    parser.add_argument("--body", default="")
+    parser.add_argument("--concurrency", type=int, default=64)
+    parser.add_argument("--requests", type=int, default=2000)
+    args = parser.parse_args()
+    asyncio.run(run(args.url, args.token, args.concurrency, args.requests, args.method, args.body))
@@ -0,0 +1,127 @@
+"""
+Sales funnel reads from the daily snapshots vs aggregating opportunities.
+
+Seeds tagged opportunities with a year of stage changes into the configured
+DATABASE_URL, rebuilds the snapshots from the change log the way the
+backfill job does, then times the funnel query against a full scan of the
+opportunities table. Seeded rows are removed afterwards:
+
+    python benchmarks/bench_funnel.py --opportunities 100000 --repeat 5
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+import uuid
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import delete, func, insert, select
+
+from app.core.database import Base, SessionLocal, engine
+from app.models.crm import CrmContact, CrmOpportunity, CrmOpportunityStageChange, FunnelStage
+from app.services.funnel_service import FUNNEL_PATH, get_funnel, rebuild_snapshots
+
+TITLE = "bench-funnel"
+
+def seed(db, count: int, today: date):
+    rng = random.Random(42)
+    contact_id = uuid.uuid4()
+    db.execute(insert(CrmContact), [{
+        "id": contact_id, "company_name": TITLE, "contact_name": TITLE, "email": f"{contact_id}@bench.invalid"
+    }])
+    
+    opportunities, changes = [], []
+    for _ in range(count):
+        opportunity_id = uuid.uuid4()
+        created_at = datetime.combine(today - timedelta(days=rng.randint(30, 365)), datetime.min.time())
+        changed_at = created_at
+        value = Decimal(rng.randint(1_000, 500_000))
+        currency = rng.choice(["BRL", "USD", "EUR"])
+        close_date = today + timedelta(days=rng.randint(-30, 180))
+        
+        stage = None
+        for next_stage in FUNNEL_PATH[:rng.randint(1, len(FUNNEL_PATH))]:
+            if rng.random() < 0.1:
+                next_stage = FunnelStage.FECHADO_PERDEU
+            changes.append({
+                "id": uuid.uuid4(), "opportunity_id": opportunity_id, "changed_at": changed_at,
+                "from_stage": stage, "to_stage": next_stage, "estimated_value": value,
+                "currency": currency, "probability": 50, "expected_close_date": close_date
+            })
+            stage = next_stage
+            changed_at += timedelta(days=rng.randint(1, 20))
+            if stage == FunnelStage.FECHADO_PERDEU:
+                break
+        
+        opportunities.append({
+            "id": opportunity_id, "contact_id": contact_id, "title": TITLE, "estimated_value": value,
+            "currency": currency, "stage": stage, "probability": 50, "expected_close_date": close_date,
+            "created_at": created_at
+        })
+    
+    db.execute(insert(CrmOpportunity), opportunities)
+    db.execute(insert(CrmOpportunityStageChange), changes)
+    db.commit()
+    return contact_id, len(changes)
+
+def scan_opportunities(db):
+    """What a dashboard would run without the snapshots"""
+    if db.bind.dialect.name == "postgresql":
+        close_month = func.date_trunc("month", CrmOpportunity.expected_close_date)
+    else:
+        close_month = func.strftime("%Y-%m", CrmOpportunity.expected_close_date)
+    return db.execute(
+        select(
+            CrmOpportunity.stage, CrmOpportunity.currency, close_month,
+            func.count(), func.sum(CrmOpportunity.estimated_value),
+            func.sum(CrmOpportunity.estimated_value * CrmOpportunity.probability / 100)
+        ).group_by(CrmOpportunity.stage, CrmOpportunity.currency, close_month)
+    ).all()
+
+def timed(label: str, repeat: int, fn):
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - started)
+    print(f"{label:<24} {best * 1000:9.1f} ms")
+
+def main(count: int, repeat: int):
+    Base.metadata.create_all(bind=engine)
+    today = date.today()
+    db = SessionLocal()
+    contact_id = None
+    try:
+        contact_id, change_count = seed(db, count, today)
+        
+        started = time.perf_counter()
+        days = rebuild_snapshots(db)
+        print(f"backfill: {change_count} changes, {days} snapshot days in {time.perf_counter() - started:.1f} s")
+        
+        timed("funnel from snapshots", repeat, lambda: get_funnel(db, today, today - timedelta(days=89)))
+        timed("opportunity scan", repeat, lambda: scan_opportunities(db))
+    finally:
+        db.rollback()
+        if contact_id:
+            opportunity_ids = select(CrmOpportunity.id).where(CrmOpportunity.contact_id == contact_id)
+            db.execute(delete(CrmOpportunityStageChange).where(
+                CrmOpportunityStageChange.opportunity_id.in_(opportunity_ids)
+            ))
+            db.execute(delete(CrmOpportunity).where(CrmOpportunity.contact_id == contact_id))
+            db.execute(delete(CrmContact).where(CrmContact.id == contact_id))
+            db.commit()
+            # Snapshots of the remaining opportunities
+            rebuild_snapshots(db)
+        db.close()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--opportunities", type=int, default=100000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+    main(args.opportunities, args.repeat)
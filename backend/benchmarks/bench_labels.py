@@ -0,0 +1,56 @@
+"""
+Label sheet rendering throughput, serial vs the QR render pool.
+
+Renders synthetic labels to an in-memory PDF, so no database is needed:
+
+    python benchmarks/bench_labels.py --labels 5000 --workers 4
+"""
+
+import argparse
+import io
+import os
+import sys
+import time
+from datetime import date
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.core.config import settings
+from app.services.label_service import get_render_pool, label_code, render_labels_pdf, render_workers
+
+def build_labels(count: int):
+    return [
+        {
+            "label_code": label_code("REC-BENCH", n),
+            "qr_code": label_code("REC-BENCH", n),
+            "reception_code": "REC-BENCH",
+            "product_type": "tomate",
+            "lot_number": "LOT-1",
+            "producer_name": "Produtor Benchmark",
+            "harvest_date": date(2025, 1, 1)
+        }
+        for n in range(1, count + 1)
+    ]
+
+def measure(label: str, labels, workers: int):
+    out = io.BytesIO()
+    started = time.perf_counter()
+    render_labels_pdf(labels, out, workers)
+    elapsed = time.perf_counter() - started
+    print(f"{label:>10}: {len(labels) / elapsed:8.0f} labels/s ({out.tell() / 1024:.0f} KiB)")
+
+def main(count: int, workers: int):
+    labels = build_labels(count)
+    measure("serial", labels, 1)
+    
+    settings.LABEL_RENDER_WORKERS = workers
+    # Warm the pool so process start-up is not billed to the run
+    get_render_pool().submit(int).result()
+    measure(f"{render_workers()} workers", labels, render_workers())
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--labels", type=int, default=5000)
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    args = parser.parse_args()
+    main(args.labels, args.workers)
@@ -0,0 +1,63 @@
+"""
+Login hashing throughput and event-loop stall under concurrency.
+
+Compares verifying passwords inline in the coroutine (the old behaviour)
+with the bounded hashing pool from app.core.security:
+
+    python benchmarks/bench_password_hashing.py --concurrency 32 --logins 256
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.core.config import settings
+from app.core.security import pwd_context, verify_and_update_password
+
+async def measure(label: str, verify, concurrency: int, logins: int, hashed: str):
+    max_lag = 0.0
+    running = True
+    
+    async def ticker():
+        # Wakes every 5 ms; any extra delay is time the loop was blocked
+        nonlocal max_lag
+        while running:
+            started = time.perf_counter()
+            await asyncio.sleep(0.005)
+            max_lag = max(max_lag, time.perf_counter() - started - 0.005)
+    
+    semaphore = asyncio.Semaphore(concurrency)
+    
+    async def login():
+        async with semaphore:
+            await verify("secret-password", hashed)
+    
+    tick = asyncio.create_task(ticker())
+    started = time.perf_counter()
+    await asyncio.gather(*(login() for _ in range(logins)))
+    elapsed = time.perf_counter() - started
+    running = False
+    await tick
+    
+    print(f"{label:>8}: {logins / elapsed:7.1f} logins/s, max event-loop stall {max_lag * 1000:7.1f} ms")
+
+async def inline_verify(password: str, hashed: str):
+    return pwd_context.verify(password, hashed)
+
+async def main(concurrency: int, logins: int):
+    hashed = pwd_context.hash("secret-password")
+    print(f"bcrypt rounds={settings.BCRYPT_ROUNDS}, workers={settings.PASSWORD_HASH_WORKERS}, "
+          f"concurrency={concurrency}")
+    await measure("inline", inline_verify, concurrency, logins, hashed)
+    await measure("pooled", verify_and_update_password, concurrency, logins, hashed)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--logins", type=int, default=128)
+    args = parser.parse_args()
+    asyncio.run(main(args.concurrency, args.logins))
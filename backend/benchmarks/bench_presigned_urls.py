@@ -0,0 +1,46 @@
+"""
+Presigned URL throughput, with and without the URL cache.
+
+Simulates document panels requesting the same batch of URLs on every
+page view. Signing is local (no MinIO needed) as long as the region is
+known, so MINIO_REGION defaults to us-east-1 here:
+
+    python benchmarks/bench_presigned_urls.py --objects 50 --views 200
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("MINIO_REGION", "us-east-1")
+os.environ.setdefault("PRESIGNED_URL_CACHE_BACKEND", "memory")
+
+from app.services.storage_service import BLOB_BUCKET, StorageService
+
+async def measure(label: str, storage: StorageService, objects, views: int):
+    started = time.perf_counter()
+    for _ in range(views):
+        await storage.get_file_urls(objects)
+    elapsed = time.perf_counter() - started
+    signed = len(objects) * views
+    print(f"{label:>8}: {signed / elapsed:10.0f} URLs/s, {views / elapsed:8.1f} page views/s")
+
+async def main(objects: int, views: int):
+    refs = [(BLOB_BUCKET, f"sha256/{i:02x}/{i:064x}") for i in range(objects)]
+    
+    uncached = StorageService()
+    uncached.url_cache.backend = None
+    await measure("no cache", uncached, refs, views)
+    
+    cached = StorageService()
+    await measure("cached", cached, refs, views)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--objects", type=int, default=50, help="URLs per page view")
+    parser.add_argument("--views", type=int, default=200)
+    args = parser.parse_args()
+    asyncio.run(main(args.objects, args.views))
@@ -0,0 +1,85 @@
+"""
+Proposal number allocation under concurrency, across several processes.
+
+Each process creates proposals from many concurrent tasks, each taking a
+number and inserting its proposal in its own transaction, the way API
+workers do. Afterwards the numbers are checked to be unique and increasing
+within each process, and the script exits non-zero if they are not. Run it
+against the configured DATABASE_URL (PostgreSQL for meaningful numbers):
+
+    python benchmarks/bench_proposal_numbers.py --processes 4 --proposals 5000 --concurrency 32
+"""
+
+import argparse
+import asyncio
+import multiprocessing
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import delete, func, select
+
+from app.core.database import AsyncSessionLocal, Base, SessionLocal, engine
+from app.models.crm import CommercialProposal
+from app.services.proposal_service import generate_proposal_number
+
+PRODUCT_NAME = "bench-proposal-numbers"
+
+async def create_proposals(count: int, concurrency: int):
+    numbers = []
+    remaining = iter(range(count))
+    
+    async def worker():
+        for _ in remaining:
+            number = await generate_proposal_number()
+            numbers.append(number)
+            async with AsyncSessionLocal() as db:
+                db.add(CommercialProposal(proposal_number=number, product_name=PRODUCT_NAME))
+                await db.commit()
+    
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return numbers
+
+def run_process(count: int, concurrency: int):
+    return asyncio.run(create_proposals(count, concurrency))
+
+def main(processes: int, proposals: int, concurrency: int):
+    Base.metadata.create_all(bind=engine)
+    with SessionLocal() as db:
+        # Leftovers from an earlier run would skew the stored count
+        db.execute(delete(CommercialProposal).where(CommercialProposal.product_name == PRODUCT_NAME))
+        db.commit()
+    per_process = proposals // processes
+    
+    started = time.perf_counter()
+    with multiprocessing.get_context("spawn").Pool(processes) as pool:
+        results = pool.starmap(run_process, [(per_process, concurrency)] * processes)
+    elapsed = time.perf_counter() - started
+    
+    numbers = [number for result in results for number in result]
+    ordered = all(result == sorted(result) for result in results)
+    with SessionLocal() as db:
+        stored = db.scalar(
+            select(func.count(func.distinct(CommercialProposal.proposal_number)))
+            .where(CommercialProposal.product_name == PRODUCT_NAME)
+        )
+    
+    print(f"{len(numbers)} proposals in {elapsed:.2f}s ({len(numbers) / elapsed:.0f}/s)")
+    checks = {
+        "unique numbers": len(set(numbers)) == len(numbers),
+        "increasing per process": ordered,
+        f"distinct numbers stored ({stored})": stored == len(numbers)
+    }
+    for name, passed in checks.items():
+        print(f"{'ok' if passed else 'FAIL':>4}  {name}")
+    sys.exit(0 if all(checks.values()) else 1)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--processes", type=int, default=4)
+    parser.add_argument("--proposals", type=int, default=5000)
+    parser.add_argument("--concurrency", type=int, default=32)
+    args = parser.parse_args()
+    main(args.processes, args.proposals, args.concurrency)
@@ -0,0 +1,111 @@
+"""
+CRM search latency over a large interaction history.
+
+Seeds tagged contacts, interactions and proposals with random words into
+the configured DATABASE_URL, then times prefix, multi-word, common-word and
+misspelled searches. On PostgreSQL run it against a database migrated to
+head so the GIN indexes exist; elsewhere the in-process index is loaded
+once first. Seeded rows are removed afterwards:
+
+    python benchmarks/bench_search.py --interactions 1000000 --repeat 5
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+import uuid
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import delete, insert, select
+
+from app.core.database import Base, SessionLocal, engine
+from app.models.crm import CommercialProposal, CrmContact, CrmInteraction, InteractionType
+from app.services.search_service import search, search_index, use_fallback_index
+
+TAG = "bench-search"
+BATCH = 10000
+
+WORDS = [
+    "amostra", "arabica", "conilon", "safra", "contrato", "embarque", "frete", "porto", "santos",
+    "preco", "desconto", "qualidade", "peneira", "umidade", "armazem", "pagamento", "cambio",
+    "container", "certificado", "organico", "torrefacao", "exportacao", "visita", "ligacao",
+    "retorno", "pedido", "cotacao", "negociacao", "entrega", "atraso"
+]
+
+def sentence(rng, words: int) -> str:
+    return " ".join(rng.choice(WORDS) for _ in range(words))
+
+def seed(db, contacts: int, interactions: int):
+    rng = random.Random(42)
+    contact_ids = [uuid.uuid4() for _ in range(contacts)]
+    db.execute(insert(CrmContact), [
+        {
+            "id": contact_id, "company_name": f"{TAG} {sentence(rng, 2)} {n}", "contact_name": TAG,
+            "email": f"{contact_id}@bench.invalid", "city": rng.choice(WORDS), "general_notes": sentence(rng, 8)
+        }
+        for n, contact_id in enumerate(contact_ids)
+    ])
+    db.execute(insert(CommercialProposal), [
+        {
+            "id": uuid.uuid4(), "proposal_number": f"BENCH-SEARCH-{n:07d}",
+            "contact_id": rng.choice(contact_ids), "product_name": sentence(rng, 3)
+        }
+        for n in range(contacts)
+    ])
+    for start in range(0, interactions, BATCH):
+        db.execute(insert(CrmInteraction), [
+            {
+                "id": uuid.uuid4(), "contact_id": rng.choice(contact_ids),
+                "interaction_type": rng.choice(list(InteractionType)), "feedback": sentence(rng, 12)
+            }
+            for _ in range(min(BATCH, interactions - start))
+        ])
+        db.commit()
+    db.commit()
+    return contact_ids
+
+def timed(label: str, repeat: int, fn):
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - started)
+    print(f"{label:<24} {best * 1000:9.1f} ms  ({len(result)} hits)")
+    return result
+
+def main(interactions: int, contacts: int, repeat: int):
+    Base.metadata.create_all(bind=engine)
+    db = SessionLocal()
+    try:
+        started = time.perf_counter()
+        seed(db, contacts, interactions)
+        print(f"seeded {interactions} interactions in {time.perf_counter() - started:.1f} s")
+        
+        if use_fallback_index():
+            started = time.perf_counter()
+            search_index.load(db)
+            print(f"in-process index loaded in {time.perf_counter() - started:.1f} s")
+        
+        timed("prefix", repeat, lambda: search(db, "torref"))
+        timed("two words", repeat, lambda: search(db, "amostra santos"))
+        timed("contact name", repeat, lambda: search(db, f"{TAG} 123", types=["contact"]))
+        timed("misspelled", repeat, lambda: search(db, "cerficado", types=["contact", "proposal"]))
+    finally:
+        db.rollback()
+        contact_ids = select(CrmContact.id).where(CrmContact.contact_name == TAG)
+        db.execute(delete(CrmInteraction).where(CrmInteraction.contact_id.in_(contact_ids)))
+        db.execute(delete(CommercialProposal).where(CommercialProposal.contact_id.in_(contact_ids)))
+        db.execute(delete(CrmContact).where(CrmContact.contact_name == TAG))
+        db.commit()
+        db.close()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--interactions", type=int, default=1000000)
+    parser.add_argument("--contacts", type=int, default=10000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+    main(args.interactions, args.contacts, args.repeat)
@@ -0,0 +1,52 @@
+"""
+Cold start time of the API process.
+
+Imports app.main in fresh interpreters and reports the wall time, so the
+cost of work done at import (clients, bucket checks, table creation) is
+visible. --importtime lists the slowest modules of one run:
+
+    python benchmarks/bench_startup.py --runs 10 --importtime 15
+"""
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+def cold_import(module: str) -> float:
+    started = time.perf_counter()
+    subprocess.run([sys.executable, "-c", f"import {module}"], cwd=BACKEND_DIR, check=True)
+    return time.perf_counter() - started
+
+def slowest_imports(module: str, top: int):
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=BACKEND_DIR, check=True, capture_output=True, text=True
+    )
+    rows = []
+    for line in result.stderr.splitlines():
+        # import time: self [us] | cumulative | imported package
+        parts = line.split("|")
+        if len(parts) == 3 and parts[1].strip().isdigit():
+            rows.append((int(parts[1]), parts[2].rstrip()))
+    for cumulative, name in sorted(rows, reverse=True)[:top]:
+        print(f"{cumulative / 1000:9.1f} ms {name}")
+
+def main(module: str, runs: int, importtime: int):
+    timings = [cold_import(module) for _ in range(runs)]
+    print(f"import {module}: median {statistics.median(timings) * 1000:.0f} ms, "
+          f"min {min(timings) * 1000:.0f} ms, max {max(timings) * 1000:.0f} ms ({runs} runs)")
+    if importtime:
+        slowest_imports(module, importtime)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--module", default="app.main")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--importtime", type=int, default=0, help="show the N slowest imports")
+    args = parser.parse_args()
+    main(args.module, args.runs, args.importtime)
@@ -0,0 +1,267 @@
+"""
+Regression check: every list endpoint of the CRM and financial routers
+must run a constant number of queries, however many rows it returns.
+Seeds synthetic rows (tagged so they can be removed), requests each
+endpoint with the largest page size, seeds nine times as many rows again
+and requests it once more. Any endpoint whose query count grew (an N+1
+lazy load) is listed and the script exits non-zero. The response cache
+is bypassed so every request reaches the database. Run against a
+database migrated to head, ideally a scratch one so the seeded rows fill
+the pages:
+
+    python benchmarks/check_query_counts.py --rows 20
+"""
+
+import argparse
+import os
+import random
+import sys
+import uuid
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import delete, insert
+
+from app.api import crm, financial
+from app.api.auth import get_current_user, require_admin
+from app.core.cache import response_cache
+from app.core.database import Base, SessionLocal, count_queries, dialect_insert, engine
+from app.core.pagination import MAX_PAGE_SIZE
+from app.models.crm import (
+    CommercialProposal, ContactEventType, ContactStatus, CrmContact, CrmContactEvent, CrmInteraction,
+    CrmOpportunity, FunnelStage, InteractionType, ProposalStatus
+)
+from app.models.financial import (
+    AccContract, AccountsPayable, CashFlow, CashFlowOrigin, CashFlowType, CurrencyCode, ExchangeRate,
+    FinancialDocument, TransactionStatus
+)
+
+SEED_TAG = "query-count-check"
+# Old enough to sit before any real rate, so lookups for today still find it
+SEED_RATE_DATE = date(2000, 1, 3)
+
+def seed(db, rows: int, contact_id, reference_id):
+    """Add rows to every listed table; contact_id gets all the timeline events"""
+    today = date.today()
+    contacts = [
+        {
+            "id": uuid.uuid4(),
+            "company_name": f"{SEED_TAG} company {uuid.uuid4().hex}",
+            "contact_name": "contact",
+            "email": f"{SEED_TAG}-{uuid.uuid4().hex}@example.com",
+            "status": random.choice(list(ContactStatus)),
+            "general_notes": SEED_TAG
+        }
+        for _ in range(rows)
+    ]
+    db.execute(insert(CrmContact), contacts)
+    contact_ids = [contact["id"] for contact in contacts]
+    
+    db.execute(insert(CommercialProposal), [
+        {
+            "id": uuid.uuid4(),
+            "proposal_number": f"{SEED_TAG}-{uuid.uuid4().hex}",
+            "contact_id": random.choice(contact_ids),
+            "product_name": SEED_TAG,
+            "status": random.choice(list(ProposalStatus)),
+            "created_at": datetime.utcnow() - timedelta(minutes=random.randint(0, 500000))
+        }
+        for _ in range(rows)
+    ])
+    db.execute(insert(CrmOpportunity), [
+        {
+            "id": uuid.uuid4(),
+            "contact_id": random.choice(contact_ids),
+            "title": SEED_TAG,
+            "estimated_value": Decimal("1000"),
+            "stage": random.choice(list(FunnelStage)),
+            "expected_close_date": today + timedelta(days=random.randint(0, 180))
+        }
+        for _ in range(rows)
+    ])
+    db.execute(insert(CrmInteraction), [
+        {
+            "id": uuid.uuid4(),
+            "contact_id": random.choice(contact_ids),
+            "interaction_type": random.choice(list(InteractionType)),
+            "feedback": SEED_TAG
+        }
+        for _ in range(rows)
+    ])
+    db.execute(insert(CrmContactEvent), [
+        {
+            "id": uuid.uuid4(),
+            "contact_id": contact_id,
+            "occurred_at": datetime.utcnow() - timedelta(minutes=random.randint(0, 500000)),
+            "event_type": random.choice(list(ContactEventType)),
+            "reference_id": uuid.uuid4(),
+            "title": SEED_TAG
+        }
+        for _ in range(rows)
+    ])
+    
+    db.execute(insert(AccountsPayable), [
+        {
+            "id": uuid.uuid4(),
+            "supplier_name": SEED_TAG,
+            "issue_date": today,
+            "due_date": today + timedelta(days=random.randint(0, 30)),
+            "amount": Decimal("100"),
+            "status": TransactionStatus.PREVISTO
+        }
+        for _ in range(rows)
+    ])
+    db.execute(insert(CashFlow), [
+        {
+            "id": uuid.uuid4(),
+            "flow_date": today + timedelta(days=random.randint(0, 30)),
+            "flow_type": random.choice(list(CashFlowType)),
+            "origin": CashFlowOrigin.OUTROS,
+            "amount": Decimal("100"),
+            "currency": random.choice(["BRL", "USD"]),
+            "description": SEED_TAG,
+            "status": TransactionStatus.PREVISTO,
+            "reference_id": uuid.uuid4(),
+            "reference_type": SEED_TAG
+        }
+        for _ in range(rows)
+    ])
+    db.execute(insert(FinancialDocument), [
+        {
+            "id": uuid.uuid4(),
+            "document_type": SEED_TAG,
+            "file_name": "file",
+            "file_path": "file",
+            "reference_id": reference_id,
+            "reference_type": SEED_TAG
+        }
+        for _ in range(rows)
+    ])
+    db.execute(insert(AccContract), [
+        {
+            "id": uuid.uuid4(),
+            "contract_number": f"{SEED_TAG}-{uuid.uuid4().hex}",
+            "bank_name": SEED_TAG,
+            "contract_date": today - timedelta(days=30),
+            "maturity_date": today + timedelta(days=random.randint(1, 180)),
+            "amount_usd": Decimal("10000"),
+            "exchange_rate": Decimal("5"),
+            "advance_percentage": Decimal("100"),
+            "interest_rate": Decimal("6"),
+            "iof_rate": Decimal("0.38")
+        }
+        for _ in range(rows)
+    ])
+    db.commit()
+
+def seed_fixtures(db):
+    """The timeline contact and a USD rate for the ACC valuation; returns the contact id"""
+    contact_id = uuid.uuid4()
+    db.execute(insert(CrmContact), [{
+        "id": contact_id, "company_name": f"{SEED_TAG} timeline", "contact_name": "contact",
+        "email": f"{SEED_TAG}-{contact_id.hex}@example.com", "general_notes": SEED_TAG
+    }])
+    db.execute(
+        dialect_insert(db)(ExchangeRate)
+        .values(currency=CurrencyCode.USD, rate_date=SEED_RATE_DATE, rate=Decimal("5"), source=SEED_TAG)
+        .on_conflict_do_nothing()
+    )
+    db.commit()
+    return contact_id
+
+def cleanup(db):
+    db.execute(delete(CrmContactEvent).where(CrmContactEvent.title == SEED_TAG))
+    db.execute(delete(CrmInteraction).where(CrmInteraction.feedback == SEED_TAG))
+    db.execute(delete(CrmOpportunity).where(CrmOpportunity.title == SEED_TAG))
+    db.execute(delete(CommercialProposal).where(CommercialProposal.product_name == SEED_TAG))
+    db.execute(delete(CrmContact).where(CrmContact.general_notes == SEED_TAG))
+    db.execute(delete(FinancialDocument).where(FinancialDocument.document_type == SEED_TAG))
+    db.execute(delete(CashFlow).where(CashFlow.description == SEED_TAG))
+    db.execute(delete(AccountsPayable).where(AccountsPayable.supplier_name == SEED_TAG))
+    db.execute(delete(AccContract).where(AccContract.bank_name == SEED_TAG))
+    db.execute(delete(ExchangeRate).where(ExchangeRate.source == SEED_TAG))
+    db.commit()
+
+def list_endpoints(contact_id, reference_id) -> dict:
+    """Every list endpoint of the two routers, at the largest page size"""
+    page = {"limit": MAX_PAGE_SIZE}
+    return {
+        "contacts": ("/crm/contacts", page),
+        "contact timeline": (f"/crm/contacts/{contact_id}/timeline", page),
+        "opportunities": ("/crm/opportunities", page),
+        "funnel": ("/crm/funnel", {}),
+        "search": ("/crm/search", {"q": SEED_TAG.split("-")[0], "limit": 100}),
+        "proposals": ("/crm/proposals", page),
+        "accounts payable": ("/financial/accounts-payable", page),
+        "cash flow": ("/financial/cash-flow", page),
+        "cash flow projection": (
+            "/financial/cash-flow-projection", {"days_ahead": 30, "revalue": True, "include_acc": True}
+        ),
+        "exchange rates": ("/financial/exchange-rates", {}),
+        "ACC contracts": ("/financial/acc-contracts", page),
+        "ACC valuation": ("/financial/acc-contracts/valuation", {}),
+        "ACC exposure": ("/financial/acc-contracts/exposure", {}),
+        "documents": ("/financial/documents", {"reference_id": str(reference_id)})
+    }
+
+def build_client() -> TestClient:
+    # Cached responses would skip the database entirely
+    response_cache.backend = None
+    app = FastAPI()
+    app.include_router(crm.router)
+    app.include_router(financial.router)
+    app.dependency_overrides[get_current_user] = lambda: None
+    app.dependency_overrides[require_admin] = lambda: None
+    # A lazy load on the async session raises; report it as a failed endpoint
+    return TestClient(app, raise_server_exceptions=False)
+
+def measure(client: TestClient, endpoints: dict) -> dict:
+    """Query count per endpoint, or the error status of a failed request"""
+    counts = {}
+    for name, (path, params) in endpoints.items():
+        with count_queries() as counter:
+            response = client.get(path, params=params)
+        counts[name] = counter.count if response.status_code == 200 else f"HTTP {response.status_code}"
+    return counts
+
+def describe(count) -> str:
+    return f"{count} queries" if isinstance(count, int) else count
+
+def main(rows: int, keep: bool):
+    Base.metadata.create_all(bind=engine)
+    client = build_client()
+    db = SessionLocal()
+    try:
+        contact_id = seed_fixtures(db)
+        reference_id = uuid.uuid4()
+        endpoints = list_endpoints(contact_id, reference_id)
+        
+        seed(db, rows, contact_id, reference_id)
+        # The first request fills the process-level caches (rates, search index)
+        measure(client, endpoints)
+        small = measure(client, endpoints)
+        seed(db, rows * 9, contact_id, reference_id)
+        large = measure(client, endpoints)
+        
+        failures = 0
+        for name in endpoints:
+            failed = not isinstance(small[name], int) or small[name] != large[name]
+            failures += failed
+            print(f"{'FAIL' if failed else 'ok':>4}  {name}: {describe(small[name])} at {rows} rows, "
+                  f"{describe(large[name])} at {rows * 10}")
+    finally:
+        if not keep:
+            cleanup(db)
+        db.close()
+    sys.exit(1 if failures else 0)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=20, help="rows per table in the first round")
+    parser.add_argument("--keep", action="store_true", help="keep the seeded rows")
+    args = parser.parse_args()
+    main(args.rows, args.keep)
@@ -0,0 +1,198 @@
+"""
+Regression check: the hot list/filter queries must not fall back to
+sequential scans. Seeds synthetic rows (tagged so they can be removed),
+refreshes planner statistics and EXPLAINs each query shape the API uses.
+Exits non-zero listing the offending queries. Run against a database
+migrated to head, PostgreSQL for meaningful plans:
+
+    python benchmarks/check_query_plans.py --rows 50000
+"""
+
+import argparse
+import os
+import random
+import sys
+import uuid
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import delete, insert, select, text
+
+from app.core.database import Base, SessionLocal, engine, sequential_scans
+from app.core.pagination import DEFAULT_PAGE_SIZE, keyset_order
+from app.models.crm import (
+    CommercialProposal, ContactEventType, ContactStatus, CrmContact, CrmContactEvent, CrmInteraction,
+    InteractionType, ProposalStatus
+)
+from app.models.financial import (
+    AccountsPayable, CashFlow, CashFlowOrigin, CashFlowType, FinancialDocument, TransactionStatus
+)
+
+SEED_TAG = "plan-check"
+
+def seed(db, rows: int):
+    today = date.today()
+    contacts = [
+        {
+            "id": uuid.uuid4(),
+            "company_name": f"{SEED_TAG} company {i:06d}",
+            "contact_name": "contact",
+            "email": f"{SEED_TAG}-{uuid.uuid4().hex}@example.com",
+            "status": random.choice(list(ContactStatus)),
+            "general_notes": SEED_TAG
+        }
+        for i in range(max(rows // 10, 1))
+    ]
+    db.execute(insert(CrmContact), contacts)
+    contact_ids = [contact["id"] for contact in contacts]
+    
+    db.execute(insert(AccountsPayable), [
+        {
+            "id": uuid.uuid4(),
+            "supplier_name": SEED_TAG,
+            "issue_date": today,
+            "due_date": today + timedelta(days=random.randint(-365, 365)),
+            "amount": Decimal("100"),
+            "status": random.choice(list(TransactionStatus))
+        }
+        for _ in range(rows)
+    ])
+    db.execute(insert(CashFlow), [
+        {
+            "id": uuid.uuid4(),
+            "flow_date": today + timedelta(days=random.randint(-365, 365)),
+            "flow_type": random.choice(list(CashFlowType)),
+            "origin": CashFlowOrigin.OUTROS,
+            "amount": Decimal("100"),
+            "description": SEED_TAG,
+            "status": random.choice(list(TransactionStatus)),
+            "reference_id": uuid.uuid4(),
+            "reference_type": SEED_TAG
+        }
+        for _ in range(rows)
+    ])
+    db.execute(insert(FinancialDocument), [
+        {
+            "id": uuid.uuid4(),
+            "document_type": SEED_TAG,
+            "file_name": "file",
+            "file_path": "file",
+            "reference_id": uuid.uuid4(),
+            "reference_type": SEED_TAG
+        }
+        for _ in range(rows)
+    ])
+    db.execute(insert(CommercialProposal), [
+        {
+            "id": uuid.uuid4(),
+            "proposal_number": f"{SEED_TAG}-{uuid.uuid4().hex}",
+            "contact_id": random.choice(contact_ids),
+            "product_name": SEED_TAG,
+            "status": random.choice(list(ProposalStatus)),
+            "created_at": datetime.utcnow() - timedelta(minutes=random.randint(0, 500000))
+        }
+        for _ in range(rows)
+    ])
+    db.execute(insert(CrmInteraction), [
+        {
+            "id": uuid.uuid4(),
+            "contact_id": random.choice(contact_ids),
+            "interaction_type": random.choice(list(InteractionType)),
+            "feedback": SEED_TAG
+        }
+        for _ in range(rows)
+    ])
+    db.execute(insert(CrmContactEvent), [
+        {
+            "id": uuid.uuid4(),
+            "contact_id": random.choice(contact_ids),
+            "occurred_at": datetime.utcnow() - timedelta(minutes=random.randint(0, 500000)),
+            "event_type": random.choice(list(ContactEventType)),
+            "reference_id": uuid.uuid4(),
+            "title": SEED_TAG
+        }
+        for _ in range(rows)
+    ])
+    db.commit()
+    
+    for table in ("accounts_payable", "cash_flow", "financial_documents", "crm_contacts",
+                  "commercial_proposals", "crm_interactions", "crm_contact_events"):
+        db.execute(text(f"ANALYZE {table}"))
+    db.commit()
+    return contact_ids[0]
+
+def cleanup(db):
+    db.execute(delete(CrmContactEvent).where(CrmContactEvent.title == SEED_TAG))
+    db.execute(delete(CrmInteraction).where(CrmInteraction.feedback == SEED_TAG))
+    db.execute(delete(CommercialProposal).where(CommercialProposal.product_name == SEED_TAG))
+    db.execute(delete(CrmContact).where(CrmContact.general_notes == SEED_TAG))
+    db.execute(delete(FinancialDocument).where(FinancialDocument.document_type == SEED_TAG))
+    db.execute(delete(CashFlow).where(CashFlow.description == SEED_TAG))
+    db.execute(delete(AccountsPayable).where(AccountsPayable.supplier_name == SEED_TAG))
+    db.commit()
+
+def hot_queries(contact_id):
+    today = date.today()
+    page = DEFAULT_PAGE_SIZE + 1
+    return {
+        "payables page": keyset_order(select(AccountsPayable), AccountsPayable.due_date, AccountsPayable.id).limit(page),
+        "open payables due soon": keyset_order(
+            select(AccountsPayable).where(
+                AccountsPayable.status == TransactionStatus.PREVISTO,
+                AccountsPayable.due_date <= today + timedelta(days=30)
+            ),
+            AccountsPayable.due_date, AccountsPayable.id
+        ).limit(page),
+        "cash flow range": keyset_order(
+            select(CashFlow).where(CashFlow.flow_date >= today, CashFlow.flow_date <= today + timedelta(days=30)),
+            CashFlow.flow_date, CashFlow.id
+        ).limit(page),
+        "cash flow by type": keyset_order(
+            select(CashFlow).where(CashFlow.flow_type == CashFlowType.SAIDA, CashFlow.flow_date >= today),
+            CashFlow.flow_date, CashFlow.id
+        ).limit(page),
+        "cash flow by reference": select(CashFlow).where(CashFlow.reference_id == uuid.uuid4()),
+        "documents by reference": select(FinancialDocument)
+            .where(FinancialDocument.reference_id == uuid.uuid4())
+            .order_by(FinancialDocument.uploaded_at),
+        "contacts page": keyset_order(select(CrmContact), CrmContact.company_name, CrmContact.id).limit(page),
+        "proposals page": keyset_order(
+            select(CommercialProposal), CommercialProposal.created_at, CommercialProposal.id, descending=True
+        ).limit(page),
+        "proposals of contact": keyset_order(
+            select(CommercialProposal).where(CommercialProposal.contact_id == contact_id),
+            CommercialProposal.created_at, CommercialProposal.id, descending=True
+        ).limit(page),
+        "interactions of contact": select(CrmInteraction)
+            .where(CrmInteraction.contact_id == contact_id)
+            .order_by(CrmInteraction.interaction_date.desc()),
+        "timeline of contact": keyset_order(
+            select(CrmContactEvent).where(CrmContactEvent.contact_id == contact_id),
+            CrmContactEvent.occurred_at, CrmContactEvent.id, descending=True
+        ).limit(page),
+    }
+
+def main(rows: int, keep: bool):
+    Base.metadata.create_all(bind=engine)
+    db = SessionLocal()
+    try:
+        contact_id = seed(db, rows)
+        failures = 0
+        for name, stmt in hot_queries(contact_id).items():
+            scans = sequential_scans(db, stmt)
+            failures += bool(scans)
+            print(f"{'FAIL' if scans else 'ok':>4}  {name}" + (f" (seq scan on {', '.join(scans)})" if scans else ""))
+    finally:
+        if not keep:
+            cleanup(db)
+        db.close()
+    sys.exit(1 if failures else 0)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=50000, help="seeded rows per table")
+    parser.add_argument("--keep", action="store_true", help="keep the seeded rows")
+    args = parser.parse_args()
+    main(args.rows, args.keep)
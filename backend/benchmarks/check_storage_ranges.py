@@ -0,0 +1,206 @@
+"""
+Regression check for the storage routes: byte-range downloads (full,
+bounded, suffix, open-ended and unsatisfiable ranges, If-Range) and
+streamed uploads of unknown or malformed length. Runs the storage
+router against an in-memory MinIO stand-in, so no server is needed.
+Small part and chunk sizes make the transfers span several of each.
+Exits non-zero listing the failing cases:
+
+    python benchmarks/check_storage_ranges.py
+"""
+
+import hashlib
+import os
+import sys
+from types import SimpleNamespace
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("STORAGE_PART_SIZE", str(64 * 1024))
+os.environ.setdefault("STORAGE_DOWNLOAD_CHUNK_SIZE", str(4 * 1024))
+os.environ.setdefault("PRESIGNED_URL_CACHE_BACKEND", "memory")
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from minio.error import S3Error
+
+from app.api import storage as storage_api
+from app.api.auth import get_current_user
+from app.core.config import settings
+from app.services.storage_service import BLOB_BUCKET, StorageService, get_storage_service
+
+BUCKET = "financial-documents"
+OBJECT = "check/ranges.bin"
+SIZE = 200 * 1024
+
+class FakeObject:
+    def __init__(self, data: bytes):
+        self.data = data
+    
+    def stream(self, amount: int):
+        for start in range(0, len(self.data), amount):
+            yield self.data[start:start + amount]
+    
+    def close(self):
+        pass
+    
+    def release_conn(self):
+        pass
+
+class FakeMinio:
+    """The subset of the MinIO client StorageService uses, kept in memory"""
+    def __init__(self):
+        self.objects = {}
+        self.parts = {}
+    
+    def list_buckets(self):
+        return []
+    
+    def make_bucket(self, bucket: str):
+        pass
+    
+    def put_object(self, bucket, object_name, data, length, content_type, part_size, **kwargs):
+        if length < 0:
+            # Unknown length: read part by part until the stream ends, as multipart uploads do
+            chunks = []
+            while True:
+                chunk = data.read(part_size)
+                chunks.append(chunk)
+                if len(chunk) < part_size:
+                    break
+            self.parts[(bucket, object_name)] = len(chunks)
+            body = b"".join(chunks)
+        else:
+            body = data.read(length)
+            if len(body) != length:
+                raise ValueError(f"short read: {len(body)} of {length} bytes")
+        self.objects[(bucket, object_name)] = (body, content_type)
+        return SimpleNamespace(etag=hashlib.md5(body).hexdigest())
+    
+    def stat_object(self, bucket, object_name):
+        if (bucket, object_name) not in self.objects:
+            raise S3Error("NoSuchKey", "Object does not exist", object_name, "request", "host", None)
+        body, content_type = self.objects[(bucket, object_name)]
+        return SimpleNamespace(size=len(body), etag=hashlib.md5(body).hexdigest(), content_type=content_type)
+    
+    def get_object(self, bucket, object_name, offset=0, length=0):
+        body = self.objects[(bucket, object_name)][0]
+        return FakeObject(body[offset:offset + length] if length else body[offset:])
+
+class FakeStorageService(StorageService):
+    def __init__(self, client: FakeMinio):
+        super().__init__()
+        self._client = client
+    
+    @property
+    def client(self) -> FakeMinio:
+        return self._client
+
+def build_client(minio: FakeMinio) -> TestClient:
+    app = FastAPI()
+    app.include_router(storage_api.router)
+    app.dependency_overrides[get_current_user] = lambda: None
+    service = FakeStorageService(minio)
+    app.dependency_overrides[get_storage_service] = lambda: service
+    # Server errors count as failed cases rather than aborting the run
+    return TestClient(app, raise_server_exceptions=False)
+
+def range_cases(data: bytes, etag: str):
+    """(name, request headers, expected status, expected body, expected Content-Range)"""
+    size = len(data)
+    return [
+        ("full download", {}, 200, data, None),
+        ("bounded range", {"Range": "bytes=10-19"}, 206, data[10:20], f"bytes 10-19/{size}"),
+        ("range end past the object", {"Range": f"bytes={size - 5}-{size + 100}"}, 206, data[-5:],
+         f"bytes {size - 5}-{size - 1}/{size}"),
+        ("open-ended range", {"Range": f"bytes={size - 5000}-"}, 206, data[-5000:],
+         f"bytes {size - 5000}-{size - 1}/{size}"),
+        ("suffix range", {"Range": "bytes=-500"}, 206, data[-500:], f"bytes {size - 500}-{size - 1}/{size}"),
+        ("suffix longer than the object", {"Range": f"bytes=-{size * 2}"}, 206, data, f"bytes 0-{size - 1}/{size}"),
+        ("range starting past the object", {"Range": f"bytes={size}-"}, 416, None, f"bytes */{size}"),
+        ("reversed range", {"Range": "bytes=20-10"}, 416, None, f"bytes */{size}"),
+        ("malformed range", {"Range": "bytes=a-b"}, 416, None, f"bytes */{size}"),
+        ("multi-range served in full", {"Range": "bytes=0-1,5-6"}, 200, data, None),
+        ("other unit served in full", {"Range": "items=0-1"}, 200, data, None),
+        ("matching If-Range", {"Range": "bytes=0-9", "If-Range": f'"{etag}"'}, 206, data[:10],
+         f"bytes 0-9/{size}"),
+        ("stale If-Range served in full", {"Range": "bytes=0-9", "If-Range": '"stale"'}, 200, data, None)
+    ]
+
+def check_ranges(client: TestClient, minio: FakeMinio) -> list:
+    data = os.urandom(SIZE)
+    minio.objects[(BUCKET, OBJECT)] = (data, "application/octet-stream")
+    etag = hashlib.md5(data).hexdigest()
+    
+    results = []
+    for name, headers, status, body, content_range in range_cases(data, etag):
+        response = client.get(f"/storage/{BUCKET}/objects/{OBJECT}", headers=headers)
+        problems = []
+        if response.status_code != status:
+            problems.append(f"status {response.status_code}, expected {status}")
+        if body is not None and response.content != body:
+            problems.append(f"{len(response.content)} bytes, expected {len(body)}")
+        if body is not None and response.headers.get("content-length") != str(len(body)):
+            problems.append(f"Content-Length {response.headers.get('content-length')}")
+        if response.headers.get("content-range") != content_range:
+            problems.append(f"Content-Range {response.headers.get('content-range')}, expected {content_range}")
+        results.append((name, problems))
+    
+    response = client.get(f"/storage/{BUCKET}/objects/check/missing.bin")
+    results.append(("missing object", [] if response.status_code == 404 else [f"status {response.status_code}"]))
+    return results
+
+def check_uploads(client: TestClient, minio: FakeMinio) -> list:
+    data = os.urandom(SIZE + 123)
+    part_size = settings.STORAGE_PART_SIZE
+    
+    def chunked():
+        for start in range(0, len(data), 7000):
+            yield data[start:start + 7000]
+    
+    results = []
+    for name, content in (("upload of unknown length", chunked()), ("upload with Content-Length", data)):
+        object_name = f"check/{name.replace(' ', '-')}.bin"
+        response = client.put(
+            f"/storage/{BUCKET}/objects/{object_name}", content=content,
+            headers={"Content-Type": "application/x-check"}
+        )
+        problems = []
+        if response.status_code != 200:
+            problems.append(f"status {response.status_code}: {response.text}")
+        else:
+            result = response.json()
+            stored, content_type = minio.objects.get((BUCKET, object_name), (b"", None))
+            if stored != data:
+                problems.append(f"stored {len(stored)} bytes, expected {len(data)}")
+            if result["size"] != len(data) or result["sha256"] != hashlib.sha256(data).hexdigest():
+                problems.append(f"reported size {result['size']} / sha256 {result['sha256'][:12]}")
+            if content_type != "application/x-check":
+                problems.append(f"content type {content_type}")
+            if isinstance(content, bytes) == ((BUCKET, object_name) in minio.parts):
+                problems.append("wrong upload path for the body length")
+            elif (BUCKET, object_name) in minio.parts and minio.parts[(BUCKET, object_name)] < len(data) // part_size:
+                problems.append(f"only {minio.parts[(BUCKET, object_name)]} parts")
+        results.append((name, problems))
+    
+    response = client.put(f"/storage/{BLOB_BUCKET}/objects/check/blob.bin", content=b"x")
+    problems = [] if response.status_code == 403 else [f"status {response.status_code}"]
+    results.append(("blob bucket is read-only", problems))
+    
+    response = client.put(
+        f"/storage/{BUCKET}/objects/check/bad-length.bin", content=b"x", headers={"Content-Length": "x"}
+    )
+    problems = [] if response.status_code == 400 else [f"status {response.status_code}"]
+    results.append(("malformed Content-Length", problems))
+    return results
+
+def main():
+    minio = FakeMinio()
+    client = build_client(minio)
+    failures = 0
+    for name, problems in check_ranges(client, minio) + check_uploads(client, minio):
+        failures += bool(problems)
+        print(f"{'FAIL' if problems else 'ok':>4}  {name}" + (f" ({'; '.join(problems)})" if problems else ""))
+    sys.exit(1 if failures else 0)
+
+if __name__ == "__main__":
+    main()